@@ -0,0 +1,343 @@
+"""
+End-to-end benchmark of the collectors against the local mock site.
+
+Each collector mode (the YouTube and Twitch collectors in their sampling
+modes, the asyncio YouTube collector and the sharded launcher) runs in
+its own worker process against benchmarks/mock_site.py (headless
+Chromium), and is measured for throughput (videos/hour), achieved sample
+rate, share of samples that returned stats, sample lateness, Python CPU
+per sample (the collector's own Python processes, excluding the resource
+monitor thread), browser CPU, Playwright driver CPU and peak memory of
+the whole process tree. Results are compared with a saved
+baseline and any metric that got worse by more than the tolerance is
+flagged; the exit status is 1 when something regressed.
+
+Usage:
+    python3 benchmarks/collector_bench.py [--modes youtube-poll twitch-buffered ...]
+        [--videos 3] [--duration 20] [--rate 10] [--baseline FILE] [--save-baseline]
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import psutil
+except ImportError:  # Optional: falls back to /proc on Linux
+    psutil = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mock_site import MockSite
+from youtube_parser import iter_videos
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "collector_baseline.json"
+
+# Mode name -> (collector, runner, settings); "rate" is replaced by --rate. The runner is
+# "single" (youtube1_gen / twitch1_gen), "async" (youtube_async_collector) or "sharded"
+# (sharded_collector, one worker process per shard)
+MODES = {
+    "youtube-poll": ("youtube", "single", {"sample_mode": "poll", "sample_rate_hz": 1.0}),
+    "youtube-panel": ("youtube", "single", {"sample_mode": "panel", "sample_rate_hz": "rate"}),
+    "youtube-player": ("youtube", "single", {"sample_mode": "player", "sample_rate_hz": "rate"}),
+    "youtube-async": ("youtube", "async", {"sample_mode": "panel", "sample_rate_hz": "rate", "concurrency": 3}),
+    "youtube-sharded": ("youtube", "sharded", {"workers": 2}),
+    "twitch-polled": ("twitch", "single", {"buffered": False, "sample_rate_hz": 1.0}),
+    "twitch-buffered": ("twitch", "single", {"buffered": True, "sample_rate_hz": "rate"}),
+    "twitch-sharded": ("twitch", "sharded", {"workers": 2}),
+}
+
+# Metric -> True when higher is better
+METRICS = {
+    "videos_per_hour": True,
+    "achieved_hz": True,
+    "valid_sample_pct": True,
+    "mean_lateness_ms": False,
+    "python_cpu_ms_per_sample": False,
+    "browser_cpu_pct": False,
+    "driver_cpu_pct": False,
+    "peak_rss_mb": False,
+}
+
+def _tree_usage(pid):
+    """Return {pid: (cpu seconds, rss bytes)} for every descendant of pid."""
+    usage = {}
+    if psutil is not None:
+        for child in psutil.Process(pid).children(recursive=True):
+            try:
+                cpu = child.cpu_times()
+                usage[child.pid] = (cpu.user + cpu.system, child.memory_info().rss)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return usage
+    if not os.path.isdir("/proc"):
+        return usage
+    children, stats = {}, {}
+    ticks, page_size = os.sysconf("SC_CLK_TCK"), os.sysconf("SC_PAGE_SIZE")
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                fields = f.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        stats[int(entry)] = ((int(fields[11]) + int(fields[12])) / ticks, int(fields[21]) * page_size)
+    stack = list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        if child in stats:
+            usage[child] = stats[child]
+        stack.extend(children.get(child, []))
+    return usage
+
+def _is_driver(pid):
+    """Whether pid is a Playwright driver (the node process between Python and the browsers)."""
+    try:
+        if psutil is not None:
+            return "run-driver" in psutil.Process(pid).cmdline()
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return b"run-driver" in f.read().split(b"\0")
+    except Exception:  # Gone already, or not ours to inspect
+        return False
+
+class ResourceMonitor:
+    """
+    Samples the CPU time and memory of this process's descendants (the
+    Playwright drivers, browsers and any worker processes) from a
+    background thread. A process's CPU is its last observed total, so
+    processes that exit mid-run (e.g. a recycled browser) still count up to
+    their last sample. Drivers are told apart by their command line; the
+    monitor thread's own CPU time is kept in own_cpu_s so it can be left out
+    of the Python figure.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.cpu_by_pid = {}
+        self.driver_pids = set()
+        self.peak_rss = 0
+        self.own_cpu_s = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        usage = _tree_usage(os.getpid())
+        for pid, (cpu, _) in usage.items():
+            if pid not in self.cpu_by_pid and _is_driver(pid):
+                self.driver_pids.add(pid)
+            self.cpu_by_pid[pid] = max(cpu, self.cpu_by_pid.get(pid, 0.0))
+        self.peak_rss = max(self.peak_rss, sum(rss for _, rss in usage.values()))
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+        self._sample()  # Final totals, taken after the collector finished
+        self.own_cpu_s = time.thread_time()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def cpu_s(self, pids=None, exclude=()) -> float:
+        """CPU seconds of the given descendants (all by default), minus those in exclude."""
+        pids = self.cpu_by_pid if pids is None else pids
+        return sum(self.cpu_by_pid.get(pid, 0.0) for pid in pids if pid not in exclude)
+
+def _python_rss():
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+def _run_collector(collector, runner, settings, videos, output, urls, seed):
+    """Run one mode; returns the pids of any Python worker processes it started."""
+    if runner == "sharded":
+        from sharded_collector import run_sharded
+
+        results = run_sharded(collector, videos, settings["workers"], output, seed=seed, headless=True,
+                              collection_seconds=urls["collection_seconds"], browser_executable=None,
+                              youtube_urls=urls["youtube"], twitch_url=urls["twitch"])
+        return [result["pid"] for result in results if result["pid"]]
+    if runner == "async":
+        import asyncio
+        from generated_test.youtube_async_collector import AsyncYouTubeCollector
+
+        collector = AsyncYouTubeCollector(headless=True, browser_type="chromium", **settings)
+        collector.BASE_URL, collector.SEARCH_URL_TEMPLATE = urls["youtube"]
+        asyncio.run(collector.run(videos, output_filename=output))
+    elif collector == "youtube":
+        from generated_test.youtube1_gen import YouTubeVideoPlayerTest
+
+        youtube = YouTubeVideoPlayerTest(headless=True, browser_type="chromium", **settings)
+        youtube.BASE_URL, youtube.SEARCH_URL_TEMPLATE = urls["youtube"]
+        youtube.run_tests(videos, browser_type="chromium", headless=True, output_filename=output, seed=seed)
+    else:
+        from generated_test.twitch1_gen import run_twitch_test
+
+        run_twitch_test(videos, urls["collection_seconds"], output_filename=output, seed=seed,
+                        start_url=urls["twitch"], headless=True, browser_executable=None, **settings)
+    return []
+
+def summarize_output(collector, output, collection_seconds=None) -> dict:
+    """Videos, errors, samples, watched seconds, valid samples and total lateness from an output file."""
+    totals = {"videos": 0, "errors": 0, "samples": 0, "watched_s": 0.0, "valid": 0, "lateness_s": 0.0}
+    if not os.path.exists(output):
+        return totals
+    for record in iter_videos(output):
+        if "error" in record:
+            totals["errors"] += 1
+            continue
+        if collector == "youtube":
+            entries = record.get("stats_collections")
+            if entries is None:
+                continue  # Skipped before watching (no results, bad link)
+            totals["watched_s"] += record.get("watched", 0.0)
+            totals["valid"] += sum(1 for e in entries if e.get("stats") not in (None, "", "Not Available"))
+            totals["lateness_s"] += sum(e.get("lateness") or 0.0 for e in entries)
+        else:
+            entries = record.get("stats_samples")
+            if entries is None:
+                continue  # Offline channel or ad
+            totals["watched_s"] += collection_seconds
+            totals["valid"] += sum(1 for e in entries if e)
+            totals["lateness_s"] += record.get("sampling", {}).get("mean_lateness_s", 0.0) * len(entries)
+        totals["videos"] += 1
+        totals["samples"] += len(entries)
+    return totals
+
+def run_mode(mode, settings, videos, output_dir, urls, seed=0) -> dict:
+    """Worker process: run one collector mode and return its metrics."""
+    collector, runner = MODES[mode][:2]
+    output = os.path.join(output_dir, f"{mode}.ndjson")
+    for stale in (output, output + ".journal", output + ".partial"):
+        if os.path.exists(stale):
+            os.remove(stale)
+    log_path = os.path.join(output_dir, f"{mode}.log")
+    started_cpu, started = time.process_time(), time.monotonic()
+    with open(log_path, "w", encoding="utf-8") as log, contextlib.redirect_stdout(log), \
+            ResourceMonitor() as monitor:
+        workers = _run_collector(collector, runner, settings, videos, output, urls, seed)
+        python_rss = _python_rss()
+    wall_s = time.monotonic() - started
+    # The collector's Python: this process minus the monitor thread, plus any shard workers
+    python_cpu_s = time.process_time() - started_cpu - monitor.own_cpu_s + monitor.cpu_s(workers)
+    driver_cpu_s = monitor.cpu_s(monitor.driver_pids)
+    browser_cpu_s = monitor.cpu_s(exclude=set(workers) | monitor.driver_pids)
+
+    totals = summarize_output(collector, output, urls["collection_seconds"])
+    samples = totals["samples"]
+    return {
+        "mode": mode,
+        "settings": settings,
+        "videos": totals["videos"],
+        "errors": totals["errors"],
+        "samples": samples,
+        "wall_s": round(wall_s, 1),
+        "videos_per_hour": round(totals["videos"] / wall_s * 3600, 1) if wall_s else 0.0,
+        "achieved_hz": round(samples / totals["watched_s"], 3) if totals["watched_s"] else 0.0,
+        "valid_sample_pct": round(100 * totals["valid"] / samples, 1) if samples else 0.0,
+        "mean_lateness_ms": round(1000 * totals["lateness_s"] / samples, 2) if samples else None,
+        "python_cpu_ms_per_sample": round(1000 * python_cpu_s / samples, 3) if samples else None,
+        "browser_cpu_pct": round(100 * browser_cpu_s / wall_s, 1) if wall_s else None,
+        "driver_cpu_pct": round(100 * driver_cpu_s / wall_s, 1) if wall_s else None,
+        "peak_rss_mb": round((monitor.peak_rss + python_rss) / 2 ** 20, 1),
+        "log": log_path,
+    }
+
+def compare(results, baseline, tolerance) -> list:
+    """Return (mode, metric, baseline, current, change) for every metric worse than tolerance."""
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["mode"])
+        if not previous:
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = previous.get(metric), result.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / abs(old)
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append((result["mode"], metric, old, new, change))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the collectors end to end against a local mock site.")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--videos", type=int, default=3, help="Videos per mode.")
+    parser.add_argument("--duration", type=float, default=20.0,
+                        help="Mock video length in seconds (YouTube watches 5s..90%% of it).")
+    parser.add_argument("--collection-seconds", type=int, default=10, help="Twitch stats seconds per video.")
+    parser.add_argument("--rate", type=float, default=10.0, help="Sample rate of the in-page modes.")
+    parser.add_argument("--bitrate-kbps", type=int, default=2500)
+    parser.add_argument("--output-dir", default="benchmark_runs")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline.")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Relative change in the bad direction that counts as a regression.")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    results = []
+    with MockSite(duration_s=args.duration, bitrate_kbps=args.bitrate_kbps) as site:
+        urls = {"youtube": site.youtube_urls(), "twitch": site.twitch_url,
+                "collection_seconds": args.collection_seconds}
+        for mode in args.modes:
+            settings = {k: (args.rate if v == "rate" else v) for k, v in MODES[mode][2].items()}
+            print(f"▶️ {mode} ({settings}), {args.videos} videos...")
+            # A fresh process per mode keeps CPU and memory accounting separate
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_mode, mode, settings, args.videos, args.output_dir, urls).result()
+            results.append(result)
+        served = dict(site.stats)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    flagged = {(mode, metric) for mode, metric, *_ in regressions}
+
+    print(f"\n{'mode':<16} {'videos':>6} {'err':>4} " + " ".join(f"{m:>24}" for m in METRICS))
+    for result in results:
+        cells = []
+        for metric in METRICS:
+            value = result[metric]
+            text = "-" if value is None else f"{value:g}"
+            cells.append(f"{text + (' ⚠️' if (result['mode'], metric) in flagged else ''):>24}")
+        print(f"{result['mode']:<16} {result['videos']:>6} {result['errors']:>4} " + " ".join(cells))
+    print(f"\nMock site served {served['pages']} pages and {served['media_requests']} media requests "
+          f"({served['media_bytes'] / 2 ** 20:.1f} MB).")
+
+    with open(os.path.join(args.output_dir, "results.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    if args.save_baseline:
+        baseline.update({r["mode"]: {m: r[m] for m in METRICS} for r in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+        for mode, metric, old, new, change in regressions:
+            print(f"  {mode}: {metric} {old:g} -> {new:g} ({change:+.1%})")
+        sys.exit(1)
+    if baseline:
+        print("\n✅ No regressions against the baseline.")
+
+if __name__ == "__main__":
+    main()
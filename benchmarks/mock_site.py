@@ -0,0 +1,433 @@
+"""
+Local stand-in for the pages the YouTube and Twitch collectors drive.
+
+Serves a YouTube-like search page (a#video-title results), a watch page
+with #player / #movie_player, a right-click menu whose "Stats for nerds"
+entry opens an .html5-video-info-panel, and a Twitch-like random channel
+page whose player iframe has Settings -> Advanced -> Video Stats and the
+stats overlay table. Players play a silent WAV and fetch synthetic media
+(/videoplayback for YouTube, .m3u8/.ts for Twitch) at a fixed bitrate, and
+the stats they display are computed from that traffic, so runs are
+reproducible and free of ads, consent dialogs and live content.
+
+Usage:
+    python3 benchmarks/mock_site.py [--port 8000] [--duration 20] [--bitrate-kbps 2500]
+"""
+import argparse
+import hashlib
+import io
+import json
+import re
+import threading
+import wave
+from base64 import urlsafe_b64encode
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlparse
+
+_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>%s</title>
+<style>body { font-family: sans-serif; margin: 0; } %s</style></head>
+<body>%s</body></html>"""
+
+_SEARCH_BODY = """<div id="contents">%s</div>"""
+_SEARCH_RESULT = """<div class="ytd-video-renderer">
+<a id="video-title" href="/watch?v=%s" title="%s">%s</a></div>"""
+
+_WATCH_STYLE = """
+#player { width: 960px; height: 540px; background: #000; position: relative; }
+#movie_player { width: 100%; height: 100%; }
+#movie_player video { width: 100%; height: 100%; }
+.ytp-contextmenu { display: none; position: absolute; background: #222; color: #fff; padding: 4px 0; }
+.ytp-menuitem { padding: 6px 16px; cursor: pointer; }
+.html5-video-info-panel { display: none; position: absolute; top: 10px; left: 10px;
+    background: rgba(0,0,0,.7); color: #fff; font-size: 12px; white-space: pre; padding: 8px; }
+"""
+
+_WATCH_BODY = """
+<div id="player">
+  <div id="movie_player" tabindex="0">
+    <video src="/media/silence.wav" autoplay muted preload="auto"></video>
+  </div>
+  <div class="ytp-popup ytp-contextmenu"><div class="ytp-menuitem" id="nerds">Stats for nerds</div></div>
+  <div class="html5-video-info-panel"></div>
+</div>
+<script>
+const CONFIG = %s;
+const player = document.getElementById('movie_player');
+const video = document.querySelector('video');
+const menu = document.querySelector('.ytp-contextmenu');
+const panel = document.querySelector('.html5-video-info-panel');
+const state = { bufferEnd: 0, sq: 0, offset: 0, bytes: 0, recent: [], kbps: 0, frames: 0 };
+
+document.getElementById('player').addEventListener('contextmenu', (e) => {
+    e.preventDefault();
+    menu.style.left = e.offsetX + 'px';
+    menu.style.top = e.offsetY + 'px';
+    menu.style.display = 'block';
+});
+document.getElementById('nerds').addEventListener('click', () => {
+    menu.style.display = 'none';
+    panel.style.display = 'block';
+    render();
+});
+player.addEventListener('click', () => player.focus());
+document.addEventListener('keydown', (e) => {
+    if (e.key === 'k') { video.paused ? video.play() : video.pause(); }
+    if (e.key === 'l') { video.currentTime = Math.min(video.duration || 0, video.currentTime + 10); }
+    if (e.key === 'j') { video.currentTime = Math.max(0, video.currentTime - 10); }
+});
+video.addEventListener('seeking', () => {
+    // Seeking outside the buffer discards it, like a real player
+    if (video.currentTime > state.bufferEnd || video.currentTime < state.bufferEnd - CONFIG.bufferTarget) {
+        state.bufferEnd = video.currentTime;
+    }
+});
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+async function fetchLoop() {
+    const segmentBytes = Math.round(CONFIG.bitrateKbps * 1000 / 8 * CONFIG.segmentS);
+    while (true) {
+        const duration = video.duration || CONFIG.duration;
+        if (state.bufferEnd - video.currentTime >= CONFIG.bufferTarget || state.bufferEnd >= duration) {
+            await sleep(250);
+            continue;
+        }
+        const start = state.offset, end = start + segmentBytes - 1;
+        const started = performance.now();
+        try {
+            const response = await fetch(`/videoplayback?id=${CONFIG.videoId}&itag=247&mime=video%%2Fwebm` +
+                                         `&sq=${state.sq}&range=${start}-${end}&rn=${state.sq + 1}`);
+            const body = await response.arrayBuffer();
+            const seconds = Math.max(0.001, (performance.now() - started) / 1000);
+            state.kbps = Math.round(body.byteLength * 8 / 1000 / seconds);
+            state.bytes += body.byteLength;
+            state.recent.push([performance.now(), body.byteLength]);
+        } catch (e) {
+            await sleep(1000);
+            continue;
+        }
+        state.sq += 1;
+        state.offset = end + 1;
+        state.bufferEnd = Math.min(duration, Math.max(state.bufferEnd, video.currentTime) + CONFIG.segmentS);
+    }
+}
+
+function stats() {
+    const now = performance.now();
+    state.recent = state.recent.filter(([t]) => now - t < 1000);
+    const quality = video.getVideoPlaybackQuality ? video.getVideoPlaybackQuality() : null;
+    return {
+        video_id: CONFIG.videoId,
+        bandwidth_kbps: state.kbps,
+        network_activity_bytes: state.recent.reduce((total, [, b]) => total + b, 0),
+        buffer_health_seconds: Math.max(0, state.bufferEnd - video.currentTime),
+        resolution: '1280x720@30',
+        codecs: 'vp09.00.51.08.01.01.01.01.00 (247) / opus (251)',
+        dropped_frames: quality ? quality.droppedVideoFrames : 0,
+        total_frames: quality ? quality.totalVideoFrames : Math.round(video.currentTime * 30),
+    };
+}
+player.getStatsForNerds = stats;
+
+function render() {
+    if (panel.style.display !== 'block') return;
+    const s = stats();
+    panel.innerText = [
+        '[X]',
+        `Video ID / sCPN ${s.video_id} / MOCK 0000 0000 0000 0000`,
+        `Viewport / Frames 960x540*1.00 / ${s.dropped_frames} dropped of ${s.total_frames}`,
+        `Current / Optimal Res ${s.resolution} / ${s.resolution}`,
+        'Volume / Normalized 100%% / 100%% (content loudness 0.0dB)',
+        `Codecs ${s.codecs}`,
+        `Connection Speed ${s.bandwidth_kbps} Kbps`,
+        `Network Activity ${Math.round(s.network_activity_bytes / 1024)} KB`,
+        `Buffer Health ${s.buffer_health_seconds.toFixed(2)} s`,
+        `Mystery Text s:4 t:${video.currentTime.toFixed(2)} b:0.000-${state.bufferEnd.toFixed(3)}`,
+        `Date ${new Date().toString()}`,
+    ].join('\\n');
+}
+setInterval(render, 250);
+fetchLoop();
+</script>
+"""
+
+_CHANNELS_BODY = """<h1>Random channel previews</h1>
+<iframe src="/twitch/player?channel=%s" width="1280" height="720" allow="autoplay"></iframe>"""
+
+_TWITCH_STYLE = """
+video { width: 100%; height: 400px; background: #000; }
+[role=menu] { display: none; border: 1px solid #999; padding: 4px; width: 200px; }
+.stats-overlay { display: none; }
+"""
+
+_TWITCH_BODY = """
+<video src="/media/silence.wav" autoplay muted loop></video>
+<button aria-label="Settings" id="settings">⚙</button>
+<div role="menu" id="main-menu"><div role="menuitem" id="advanced" tabindex="0">Advanced</div></div>
+<div role="menu" id="advanced-menu">
+  <label><input type="checkbox" id="video-stats"> Video Stats</label>
+</div>
+<div class="stats-overlay">
+  <button aria-label="Close video stats" id="close-stats">✕</button>
+  <table><tbody class="tw-table-body"></tbody></table>
+</div>
+<script>
+const CONFIG = %s;
+const state = { sq: 0, bytes: 0, kbps: 0, bufferS: 0, lastFetch: performance.now() };
+const show = (id, on) => { document.getElementById(id).style.display = on ? 'block' : 'none'; };
+document.getElementById('settings').addEventListener('click', () => show('main-menu', true));
+document.getElementById('advanced').addEventListener('click', () => {
+    show('main-menu', false);
+    show('advanced-menu', true);
+});
+const checkbox = document.getElementById('video-stats');
+const overlay = document.querySelector('.stats-overlay');
+checkbox.addEventListener('change', () => { overlay.style.display = checkbox.checked ? 'block' : 'none'; });
+document.getElementById('close-stats').addEventListener('click', () => {
+    checkbox.checked = false;
+    overlay.style.display = 'none';
+});
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+async function fetchLoop() {
+    const segmentBytes = Math.round(CONFIG.bitrateKbps * 1000 / 8 * CONFIG.segmentS);
+    while (true) {
+        try {
+            await (await fetch(`/twitch/${CONFIG.channel}/index.m3u8`)).text();
+            const started = performance.now();
+            const body = await (await fetch(`/twitch/${CONFIG.channel}/${state.sq}.ts?size=${segmentBytes}`)).arrayBuffer();
+            state.kbps = Math.round(body.byteLength * 8 / 1000 / Math.max(0.001, (performance.now() - started) / 1000));
+            state.bytes += body.byteLength;
+            state.sq += 1;
+            state.bufferS = CONFIG.segmentS;
+            state.lastFetch = performance.now();
+        } catch (e) { /* Retry on the next segment */ }
+        await sleep(CONFIG.segmentS * 1000);
+    }
+}
+
+function render() {
+    if (overlay.style.display !== 'block') return;
+    const buffer = Math.max(0, state.bufferS - (performance.now() - state.lastFetch) / 1000 + CONFIG.segmentS);
+    const rows = {
+        'Download Resolution': '1920x1080',
+        'Render Resolution': '1920x1080',
+        'Viewport Resolution': '1265x655',
+        'Download Bitrate': `${CONFIG.bitrateKbps} Kbps`,
+        'Bandwidth Estimate': `${(state.kbps / 1000).toFixed(0)} Mbps`,
+        'FPS': '30',
+        'Skipped Frames': '0',
+        'Buffer Size': `${buffer.toFixed(2)} sec.`,
+        'Latency To Broadcaster': `${(buffer + 0.5).toFixed(2)} sec.`,
+        'Codecs': 'avc1.4D0428,mp4a.40.2',
+        'Protocol': 'HLS',
+        'Latency Mode': 'Low Latency',
+        'Play Session ID': CONFIG.channel,
+    };
+    document.querySelector('tbody.tw-table-body').innerHTML = Object.entries(rows).map(([label, value]) =>
+        `<tr data-a-target="player-overlay-video-stats-row"><td><p>${label}</p></td><td><p>${value}</p></td></tr>`
+    ).join('');
+}
+setInterval(render, 250);
+fetchLoop();
+</script>
+"""
+
+def _video_ids(query, count):
+    """Deterministic 11-character video ids for a query's results."""
+    ids = []
+    for i in range(count):
+        digest = hashlib.sha1(f"{query}:{i}".encode("utf-8")).digest()
+        ids.append(urlsafe_b64encode(digest).decode("ascii")[:11])
+    return ids
+
+def _silence_wav(duration_s, rate=8000):
+    """An 8 kHz mono 8-bit silent WAV of duration_s seconds."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(1)
+        w.setframerate(rate)
+        w.writeframes(b"\x80" * int(duration_s * rate))
+    return buffer.getvalue()
+
+class MockSite:
+    """
+    Threaded HTTP server for the stand-in pages, for benchmarks and loopback tests.
+
+    youtube_urls() gives the base and search URLs to point
+    YouTubeVideoPlayerTest at; twitch_url is the start page for
+    run_twitch_test. Request and byte counts are kept in `stats`.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, duration_s: float = 20.0,
+                 bitrate_kbps: int = 2500, results: int = 20, segment_s: float = 2.0,
+                 buffer_target_s: float = 30.0):
+        """
+        :param port: Port to listen on (0 picks a free one).
+        :param duration_s: Length of every mock video (the collectors watch up to 90% of it).
+        :param bitrate_kbps: Bitrate of the synthetic media the players fetch.
+        :param results: Search results per query.
+        :param segment_s: Media seconds per fetched segment.
+        :param buffer_target_s: Seconds the YouTube player buffers ahead before pausing fetches.
+        """
+        self.duration_s = duration_s
+        self.bitrate_kbps = bitrate_kbps
+        self.results = results
+        self.segment_s = segment_s
+        self.buffer_target_s = buffer_target_s
+        self.stats = {"pages": 0, "media_requests": 0, "media_bytes": 0}
+        self._lock = threading.Lock()
+        self._wav = _silence_wav(duration_s)
+        self._zeros = bytes(1 << 16)
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def youtube_urls(self):
+        """(BASE_URL, SEARCH_URL_TEMPLATE) for YouTubeVideoPlayerTest."""
+        return self.url + "/", self.url + "/results?search_query={}"
+
+    @property
+    def twitch_url(self) -> str:
+        return self.url + "/random_channel_previews.php"
+
+    def start(self):
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _handler_class(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                # Collectors join BASE_URL and "/watch?v=..." into "//watch"
+                path = "/" + url.path.lstrip("/")
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                if path == "/results":
+                    return self._page("Search", "", site._search_body(params.get("search_query", "")))
+                if path == "/watch":
+                    return self._page("Watch", _WATCH_STYLE, site._watch_body(params.get("v", "mock")))
+                if path == "/videoplayback":
+                    start, end = (int(x) for x in params.get("range", "0-65535").split("-"))
+                    return self._media(end - start + 1, "video/webm")
+                if path == "/media/silence.wav":
+                    return self._wav()
+                if path == "/random_channel_previews.php":
+                    channel = _video_ids(str(site.stats["pages"]), 1)[0]
+                    return self._page("Random channel", "", _CHANNELS_BODY % channel)
+                if path == "/twitch/player":
+                    return self._page("Player", _TWITCH_STYLE, site._twitch_body(params.get("channel", "mock")))
+                if path.startswith("/twitch/") and path.endswith(".m3u8"):
+                    return self._send(200, "application/vnd.apple.mpegurl", site._playlist().encode("utf-8"))
+                if path.startswith("/twitch/") and path.endswith(".ts"):
+                    return self._media(int(params.get("size", "65536")), "video/mp2t")
+                if path == "/":
+                    return self._page("Home", "", '<form action="/results"><input name="search_query"></form>')
+                self._send(404, "text/plain", b"Not found")
+
+            def _send(self, status, content_type, body, headers=()):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _page(self, title, style, body):
+                site._count("pages")
+                self._send(200, "text/html; charset=utf-8", (_PAGE % (title, style, body)).encode("utf-8"))
+
+            def _media(self, size, content_type):
+                site._count("media_requests")
+                site._count("media_bytes", size)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(size))
+                self.end_headers()
+                while size > 0:
+                    chunk = site._zeros[:min(size, len(site._zeros))]
+                    self.wfile.write(chunk)
+                    size -= len(chunk)
+
+            def _wav(self):
+                # Single byte ranges, so the browser can seek within the audio
+                data = site._wav
+                match = re.match(r"bytes=(\d*)-(\d*)", self.headers.get("Range", ""))
+                if not match:
+                    return self._send(200, "audio/wav", data, [("Accept-Ranges", "bytes")])
+                start = int(match.group(1) or 0)
+                end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+                self._send(206, "audio/wav", data[start:end + 1],
+                           [("Accept-Ranges", "bytes"), ("Content-Range", f"bytes {start}-{end}/{len(data)}")])
+
+        return Handler
+
+    def _search_body(self, query):
+        results = "".join(_SEARCH_RESULT % (vid, f"{query} {i}", f"{query} video {i}")
+                          for i, vid in enumerate(_video_ids(query, self.results)))
+        return _SEARCH_BODY % results
+
+    def _player_config(self, **extra):
+        return json.dumps({"duration": self.duration_s, "bitrateKbps": self.bitrate_kbps,
+                           "segmentS": self.segment_s, "bufferTarget": self.buffer_target_s, **extra})
+
+    def _watch_body(self, video_id):
+        return _WATCH_BODY % self._player_config(videoId=video_id)
+
+    def _twitch_body(self, channel):
+        return _TWITCH_BODY % self._player_config(channel=quote(channel))
+
+    def _playlist(self):
+        return (f"#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:{self.segment_s:g}\n"
+                f"#EXTINF:{self.segment_s:g},\nsegment.ts\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the local stand-in YouTube/Twitch pages.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per mock video.")
+    parser.add_argument("--bitrate-kbps", type=int, default=2500)
+    args = parser.parse_args()
+
+    site = MockSite(port=args.port, duration_s=args.duration, bitrate_kbps=args.bitrate_kbps)
+    base_url, search_url = site.youtube_urls()
+    print(f"YouTube search: {search_url.format('test')}")
+    print(f"Twitch start:   {site.twitch_url}")
+    try:
+        site._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site._server.server_close()
+    print(f"Served {site.stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Micro-benchmark: single-pass parse_stats_block vs. the legacy multi-regex parser.
+
+Usage:
+    python3 benchmarks/parser_bench.py [telemetry.json] [--repeat N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from youtube_parser import iter_videos, parse_stats_block, parse_stats_block_legacy
+
+DEFAULT_INPUT = "generated_test/youtube_telemetry.json"
+
+def load_samples(filepath):
+    """
+    Collect every raw stats string from a telemetry file: the collectors'
+    "stats_collections" entries, or the prototype's plain "stats" list.
+    """
+    samples = []
+    for video in iter_videos(filepath):
+        if "stats_collections" in video:
+            samples.extend(entry.get("stats", "") for entry in video["stats_collections"])
+        else:
+            samples.extend(stats for stats in video.get("stats", []) if isinstance(stats, str))
+    return samples
+
+def time_parser(parser, samples, repeat):
+    """Return the best-of-three seconds per sample for parser."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for stats in samples:
+                parser(stats)
+        best = min(best, time.perf_counter() - start)
+    return best / (repeat * len(samples))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YouTube stats parsing.")
+    parser.add_argument("input", nargs="?", default=DEFAULT_INPUT)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    samples = load_samples(args.input)
+    if not samples:
+        print(f"No stats samples found in {args.input}")
+        return
+
+    mismatches = sum(parse_stats_block(s) != parse_stats_block_legacy(s) for s in samples)
+    legacy = time_parser(parse_stats_block_legacy, samples, args.repeat)
+    single_pass = time_parser(parse_stats_block, samples, args.repeat)
+
+    print(f"Samples:      {len(samples)} x {args.repeat} from {args.input}")
+    print(f"Mismatches:   {mismatches}")
+    print(f"Legacy:       {legacy * 1e6:8.2f} µs/sample ({1 / legacy:,.0f} samples/s)")
+    print(f"Single-pass:  {single_pass * 1e6:8.2f} µs/sample ({1 / single_pass:,.0f} samples/s)")
+    print(f"Speedup:      {legacy / single_pass:.2f}x")
+
+if __name__ == "__main__":
+    main()
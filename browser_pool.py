@@ -0,0 +1,204 @@
+import os
+import time
+
+try:
+    import psutil
+except ImportError:  # Optional: falls back to /proc on Linux
+    psutil = None
+
+# Chromium exposes the page's JS heap; Firefox and WebKit return null, so the
+# per-context heap is only measured on Chromium.
+_JS_HEAP_JS = "() => (performance.memory ? performance.memory.usedJSHeapSize : null)"
+
+def _is_driver(cmdline):
+    """Whether a command line (list of arguments) is a Playwright driver's."""
+    return "run-driver" in cmdline
+
+def process_tree_rss(pid=None):
+    """
+    Return the resident memory in bytes of the browsers started by pid's
+    Playwright drivers (default: this process), i.e. every descendant of a
+    driver child, but neither the driver itself nor other children such as
+    tcpdump. Returns None when no memory source is available.
+    """
+    pid = pid or os.getpid()
+    if psutil is not None:
+        total = 0
+        for child in psutil.Process(pid).children():
+            try:
+                if not _is_driver(child.cmdline()):
+                    continue
+                for browser in child.children(recursive=True):
+                    total += browser.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total
+    if not os.path.isdir("/proc"):
+        return None
+
+    children, rss_pages = {}, {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "rb") as f:
+                # The command name may contain spaces, so split after its closing ')'
+                fields = f.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+
+    drivers = []
+    for child in children.get(pid, []):
+        try:
+            with open(f"/proc/{child}/cmdline", "rb") as f:
+                cmdline = f.read().decode(errors="replace").split("\0")
+        except OSError:
+            continue
+        if _is_driver(cmdline):
+            drivers.append(child)
+    total, stack = 0, [browser for driver in drivers for browser in children.get(driver, [])]
+    while stack:
+        child = stack.pop()
+        total += rss_pages.get(child, 0)
+        stack.extend(children.get(child, []))
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+class PooledContext:
+    """A warm browser context and page handed out by BrowserPool."""
+
+    def __init__(self, browser, context, page):
+        self.browser = browser
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+class BrowserPool:
+    """
+    Keeps pre-launched browsers and contexts warm and hands one out per video.
+
+    acquire() returns an idle PooledContext (a hit) or launches one on demand
+    (a miss). release() recycles a context after max_uses videos, and
+    relaunches its whole browser when the browsers' combined RSS per browser
+    crosses max_rss_mb, replacing it immediately so the next acquire() is
+    warm again. report() summarises hit rate, launch latency and memory.
+
+    Memory figures are approximate. The per-context heap is the page's JS
+    heap, so it misses DOM, media buffers and GPU memory and is only
+    available on Chromium. RSS covers the browser processes of this
+    process's Playwright drivers, not the driver or other subprocesses; it
+    cannot be split between browsers, so the per-browser figure is the
+    total divided by the number of open browsers.
+    """
+
+    def __init__(self, playwright, browser_type: str = "chromium", headless: bool = False,
+                 size: int = 1, max_uses: int = 10, max_rss_mb: float = None, launch_options: dict = None):
+        """
+        :param playwright: The sync Playwright instance.
+        :param browser_type: Type of browser to use (chromium, firefox, webkit).
+        :param size: Number of browsers (each with one warm context) to keep ready.
+        :param max_uses: Videos served by a context before it is replaced.
+        :param max_rss_mb: Per-browser resident memory (browsers' total RSS / open browsers)
+                           that triggers a browser relaunch.
+        :param launch_options: Extra keyword arguments for browser_type.launch().
+        """
+        self.launcher = getattr(playwright, browser_type)
+        self.headless = headless
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.launch_options = launch_options or {}
+        self.idle = []
+        self.browsers = []
+        self.stats = {
+            "hits": 0, "misses": 0,
+            "context_recycles": 0, "browser_recycles": 0,
+            "browser_launch_s": [], "context_launch_s": [],
+            "context_heap_mb": [], "rss_mb": [],
+        }
+        for _ in range(size):
+            self.idle.append(self._new_context(self._launch_browser()))
+
+    def _launch_browser(self):
+        started = time.perf_counter()
+        browser = self.launcher.launch(headless=self.headless, **self.launch_options)
+        self.stats["browser_launch_s"].append(time.perf_counter() - started)
+        self.browsers.append(browser)
+        return browser
+
+    def _new_context(self, browser):
+        started = time.perf_counter()
+        context = browser.new_context()
+        page = context.new_page()
+        self.stats["context_launch_s"].append(time.perf_counter() - started)
+        return PooledContext(browser, context, page)
+
+    def _close_browser(self, browser):
+        self.browsers.remove(browser)
+        # Drop any other idle contexts that still point at this browser
+        self.idle = [slot for slot in self.idle if slot.browser is not browser]
+        browser.close()
+
+    def acquire(self) -> PooledContext:
+        """Return a warm context for one video, launching one if none is idle."""
+        if self.idle:
+            self.stats["hits"] += 1
+            return self.idle.pop()
+        self.stats["misses"] += 1
+        browser = self.browsers[0] if len(self.browsers) >= self.size else self._launch_browser()
+        return self._new_context(browser)
+
+    def release(self, slot: PooledContext, discard: bool = False):
+        """
+        Return a context after a video; recycles it when worn out.
+        :param discard: Replace the context regardless of its use count (e.g. after an error).
+        """
+        slot.uses += 1
+        try:
+            heap = slot.page.evaluate(_JS_HEAP_JS)
+        except Exception:
+            heap = None
+        if heap:
+            self.stats["context_heap_mb"].append(heap / 2 ** 20)
+
+        rss = process_tree_rss()
+        rss_per_browser_mb = rss / 2 ** 20 / max(1, len(self.browsers)) if rss is not None else None
+        if rss_per_browser_mb is not None:
+            self.stats["rss_mb"].append(rss_per_browser_mb)
+
+        if self.max_rss_mb and rss_per_browser_mb and rss_per_browser_mb > self.max_rss_mb:
+            self.stats["browser_recycles"] += 1
+            self._close_browser(slot.browser)
+            self.idle.append(self._new_context(self._launch_browser()))
+        elif discard or slot.uses >= self.max_uses:
+            self.stats["context_recycles"] += 1
+            slot.context.close()
+            self.idle.append(self._new_context(slot.browser))
+        else:
+            self.idle.append(slot)
+
+    def report(self) -> dict:
+        """Hit rate, average launch latencies and memory observations."""
+        def mean(values):
+            return round(sum(values) / len(values), 3) if values else None
+
+        requests = self.stats["hits"] + self.stats["misses"]
+        return {
+            "hit_rate": round(self.stats["hits"] / requests, 3) if requests else None,
+            "hits": self.stats["hits"],
+            "misses": self.stats["misses"],
+            "context_recycles": self.stats["context_recycles"],
+            "browser_recycles": self.stats["browser_recycles"],
+            "avg_browser_launch_s": mean(self.stats["browser_launch_s"]),
+            "avg_context_launch_s": mean(self.stats["context_launch_s"]),
+            "avg_context_heap_mb": mean(self.stats["context_heap_mb"]),
+            "peak_rss_per_browser_mb": round(max(self.stats["rss_mb"]), 1) if self.stats["rss_mb"] else None,
+        }
+
+    def close(self):
+        """Close every browser in the pool."""
+        for browser in list(self.browsers):
+            browser.close()
+        self.browsers.clear()
+        self.idle.clear()
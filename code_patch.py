@@ -0,0 +1,63 @@
+import re
+
+SEARCH, DIVIDER, REPLACE = "<<<<<<< SEARCH", "=======", ">>>>>>> REPLACE"
+NO_CHANGES = "NO_CHANGES"
+
+_BLOCK = re.compile(r"^<<<<<<< SEARCH[ \t]*\n(.*?)^=======[ \t]*\n(.*?)^>>>>>>> REPLACE[ \t]*$",
+                    re.MULTILINE | re.DOTALL)
+
+class PatchError(ValueError):
+    """A model's edit blocks could not be applied to the script."""
+
+def parse_edit_blocks(text: str) -> list:
+    """
+    Parse a response made of search/replace blocks:
+
+        <<<<<<< SEARCH
+        lines copied from the current script
+        =======
+        the lines to put in their place
+        >>>>>>> REPLACE
+
+    Text outside the blocks (code fences, remarks) is ignored. Returns a list
+    of (search, replace) pairs; empty when the response is NO_CHANGES.
+    Raises PatchError when the response holds neither.
+    """
+    blocks = [(search, replace) for search, replace in _BLOCK.findall(text)]
+    if not blocks and text.strip().strip("`").strip() != NO_CHANGES:
+        raise PatchError("response contains no SEARCH/REPLACE blocks")
+    return blocks
+
+def _locate(code, search):
+    """Offsets of the single occurrence of search in code, tolerating trailing whitespace."""
+    if code.count(search) == 1:
+        start = code.index(search)
+        return start, start + len(search)
+    if code.count(search) > 1:
+        raise PatchError(f"search text matches {code.count(search)} places:\n{search}")
+    # Models often drop trailing spaces; match line by line ignoring them instead
+    lines = code.splitlines(keepends=True)
+    wanted = [line.rstrip() for line in search.splitlines()]
+    matches = [i for i in range(len(lines) - len(wanted) + 1)
+               if [line.rstrip() for line in lines[i:i + len(wanted)]] == wanted]
+    if len(matches) != 1:
+        raise PatchError(f"search text matches {len(matches)} places:\n{search}")
+    start = sum(len(line) for line in lines[:matches[0]])
+    end = start + sum(len(line) for line in lines[matches[0]:matches[0] + len(wanted)])
+    return start, end
+
+def apply_edit_blocks(code: str, blocks: list) -> str:
+    """
+    Apply (search, replace) pairs in order. Each search text must occur exactly
+    once in the script as edited so far; otherwise PatchError is raised and
+    nothing is applied. An empty search text appends the replacement.
+    """
+    for search, replace in blocks:
+        if not search.strip():
+            code = code.rstrip("\n") + "\n" + replace
+            continue
+        start, end = _locate(code, search)
+        if code[start:end].endswith("\n") and not replace.endswith("\n"):
+            replace += "\n"
+        code = code[:start] + replace + code[end:]
+    return code
@@ -0,0 +1,66 @@
+FENCE = "```"
+
+class CodeFenceExtractor:
+    """
+    Incrementally extracts the code block from a streamed model response.
+
+    feed() takes response chunks as they arrive and returns the code lines
+    completed so far, so they can be written out before the response ends.
+    Only whole lines are returned, since a chunk can end in the middle of a
+    fence. States:
+      before - skipping blank lines until the first content line;
+      code   - inside the ```python (or ```) block: lines are code until
+               the closing fence;
+      raw    - the response did not start with a fence: every line is code;
+      after  - past the closing fence: the rest (explanations) is dropped.
+    """
+
+    def __init__(self):
+        self.state = "before"
+        self._partial = ""
+        self._pending_blank = []  # Blank lines held back until more code follows
+        self._emitted = False
+
+    def feed(self, chunk: str) -> list:
+        """Consume one chunk; returns the code lines it completed (without newlines)."""
+        text = self._partial + chunk
+        *lines, self._partial = text.split("\n")
+        code = []
+        for line in lines:
+            code.extend(self._line(line))
+        return code
+
+    def finish(self) -> list:
+        """Consume the end of the response; returns the remaining code lines."""
+        code = self._line(self._partial) if self._partial else []
+        self._partial = ""
+        self._pending_blank = []  # Trailing blank lines are dropped, as with strip()
+        return code
+
+    def _line(self, line):
+        if self.state == "after":
+            return []
+        stripped = line.strip()
+        if self.state == "before":
+            if not stripped:
+                return []
+            if stripped.startswith(FENCE):
+                self.state = "code"
+                return []
+            self.state = "raw"
+        elif stripped.startswith(FENCE):
+            self.state = "after"
+            return []
+        if not stripped:
+            if self._emitted:  # Leading blank lines are dropped, as with strip()
+                self._pending_blank.append(line)
+            return []
+        code, self._pending_blank = self._pending_blank + [line], []
+        self._emitted = True
+        return code
+
+    @classmethod
+    def extract(cls, text: str) -> str:
+        """Code block of a complete response (same result as streaming it)."""
+        extractor = cls()
+        return "\n".join(extractor.feed(text) + extractor.finish())
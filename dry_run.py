@@ -0,0 +1,146 @@
+"""
+Headless dry run of a generated collector script against the local stand-in site.
+
+dry_run() starts a fresh benchmarks/mock_site.py server and runs the script
+in a subprocess through this module's harness, which patches Playwright so
+that every browser it launches is headless and every request to YouTube or
+the Twitch random-channel page is answered by the stand-in (other external
+requests are blocked). Its input() prompts are answered with
+script_runner.SCRIPTED_ANSWER, so candidates that ask for a video count run
+unattended and side by side. The script itself is not modified. A dry run
+passes when the script parses, exits 0 or is still running at the time limit
+(collectors loop over videos), and has loaded a stand-in page and fetched
+media through it.
+
+Usage (harness side, normally started by dry_run()):
+    python3 dry_run.py --mock-url http://127.0.0.1:8000 generated_test/youtube1_gen.py
+"""
+import argparse
+import ast
+import builtins
+import os
+import runpy
+import sys
+import tempfile
+import time
+from pathlib import Path
+from script_runner import SCRIPTED_ANSWER, run_script, scripted_input
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "benchmarks"))
+
+# Hosts whose pages the stand-in serves
+MOCKED_HOSTS = ("youtube.com", "www.youtube.com", "m.youtube.com", "twitch-tools.rootonline.de")
+
+def _install_routing(mock_url):
+    """Patch Playwright's browser launch and context creation to run headless against mock_url."""
+    from urllib.parse import urlsplit
+    from playwright.sync_api import Browser, BrowserType
+
+    local = urlsplit(mock_url).netloc
+
+    def handle(route):
+        url = urlsplit(route.request.url)
+        if url.netloc == local:
+            return route.continue_()
+        if url.hostname in MOCKED_HOSTS:
+            target = mock_url + (url.path or "/") + (f"?{url.query}" if url.query else "")
+            return route.fulfill(response=route.fetch(url=target))
+        route.abort()
+
+    def headless(kwargs):
+        kwargs["headless"] = True
+        # The bundled browser, as on a machine without Chrome installed
+        kwargs.pop("channel", None)
+        kwargs.pop("executable_path", None)
+        return kwargs
+
+    launch, launch_persistent = BrowserType.launch, BrowserType.launch_persistent_context
+    new_context, new_page = Browser.new_context, Browser.new_page
+
+    def routed_context(context):
+        context.route("**/*", handle)
+        return context
+
+    BrowserType.launch = lambda self, **kwargs: launch(self, **headless(kwargs))
+    BrowserType.launch_persistent_context = lambda self, user_data_dir, **kwargs: routed_context(
+        launch_persistent(self, user_data_dir, **headless(kwargs)))
+    Browser.new_context = lambda self, **kwargs: routed_context(new_context(self, **kwargs))
+
+    def routed_page(self, **kwargs):
+        page = new_page(self, **kwargs)
+        routed_context(page.context)
+        return page
+
+    Browser.new_page = routed_page
+
+def _answer_prompts():
+    """Answer every input() with SCRIPTED_ANSWER, echoing it like a user typing it."""
+    def scripted(prompt=""):
+        print(f"{prompt}{SCRIPTED_ANSWER}", flush=True)
+        return SCRIPTED_ANSWER
+
+    builtins.input = scripted
+
+def dry_run(script: str, timeout_s: float = 60.0, require_media: bool = True, stop=None,
+            work_dir: str = None, video_duration_s: float = 20.0) -> dict:
+    """
+    Dry-run script headless against a fresh stand-in site.
+    :param timeout_s: Wall-clock limit; a script still running then has not failed.
+    :param require_media: Also require media fetched through the stand-in (a player was driven).
+    :param stop: threading.Event; when set, the run is ended early and does not pass.
+    :param work_dir: Working directory for the script's output files (a new temporary one by default).
+    :return: passed, reason, seconds, exit_code, timed_out, pages, media_requests,
+             log (script output), traceback (the last one the script printed)
+    """
+    started = time.monotonic()
+    result = {"script": script, "passed": False, "reason": "", "seconds": 0.0, "exit_code": None,
+              "timed_out": False, "pages": 0, "media_requests": 0, "log": None, "traceback": ""}
+    try:
+        with open(script, "r", encoding="utf-8") as f:
+            ast.parse(f.read())
+    except (OSError, SyntaxError) as e:
+        result["reason"] = f"does not parse: {e}"
+        return result
+
+    from mock_site import MockSite
+    work_dir = work_dir or tempfile.mkdtemp(prefix="dry_run_")
+    result["log"] = os.path.join(work_dir, "dry_run.log")
+    with MockSite(duration_s=video_duration_s) as site:
+        run = run_script(os.path.abspath(__file__), ["--mock-url", site.url, os.path.abspath(script)],
+                         timeout_s=timeout_s, cwd=work_dir, echo=False, log_path=result["log"], stop=stop,
+                         input_text=scripted_input())
+    result.update(exit_code=run["exit_code"], timed_out=run["timed_out"], traceback=run["traceback"],
+                  pages=site.stats["pages"], media_requests=site.stats["media_requests"],
+                  seconds=round(time.monotonic() - started, 1))
+    if run["stopped"]:
+        result["reason"] = "stopped"
+        return result
+    if result["exit_code"] not in (None, 0):
+        # The exception line, the first unindented one after the frames
+        error = next((line for line in result["traceback"].splitlines()[1:] if not line.startswith(" ")), "")
+        result["reason"] = f"exited with code {result['exit_code']}" + (f": {error}" if error else "")
+    elif not result["pages"]:
+        result["reason"] = "loaded no stand-in page"
+    elif require_media and not result["media_requests"]:
+        result["reason"] = "fetched no media"
+    else:
+        result["passed"] = True
+        result["reason"] = "still running at time limit" if result["timed_out"] else "exited 0"
+    return result
+
+def main():
+    """Harness side: run a script with Playwright routed to the stand-in site."""
+    parser = argparse.ArgumentParser(description="Run a Playwright script headless against the stand-in site.")
+    parser.add_argument("--mock-url", required=True)
+    parser.add_argument("script")
+    args, script_args = parser.parse_known_args()
+
+    _install_routing(args.mock_url.rstrip("/"))
+    _answer_prompts()
+    # Run as `python3 script` would: its own directory importable, its own argv
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    sys.argv = [args.script] + script_args
+    runpy.run_path(args.script, run_name="__main__")
+
+if __name__ == "__main__":
+    main()
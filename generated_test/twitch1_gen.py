@@ -1,33 +1,155 @@
 import re
-from playwright.sync_api import Playwright, sync_playwright, expect
+import sys
+from pathlib import Path
+from playwright.sync_api import sync_playwright, expect
 import time
 import random
-import json
 
-def run_twitch_test(num_videos: int, collection_seconds: int):
-    telemetry = []
+# Shared collector helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from page_sampler import PageSampler, TWITCH_STATS_TABLE_JS
+from browser_pool import BrowserPool
+from sample_scheduler import SampleScheduler
+from telemetry_sink import TelemetrySink
+from run_journal import RunJournal, unfinished_run
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            executable_path='/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
-            headless=False
-        )
-        context = browser.new_context()
-        page = context.new_page()
+CHROME_PATH = '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'
+RANDOM_CHANNEL_URL = "https://twitch-tools.rootonline.de/random_channel_previews.php"
+
+def get_stats_frame(iframe_locator):
+    """Return the player iframe's Frame, which (unlike a FrameLocator) can evaluate JS."""
+    handle = iframe_locator.element_handle()
+    frame = handle.content_frame() if handle else None
+    if not frame:
+        raise RuntimeError("Iframe content frame not found.")
+    return frame
+
+def collect_stats_polled(frame, collection_seconds: int, sample_rate_hz: float, on_sample=None):
+    """
+    Read the whole stats table with one evaluate() per sample, on fixed monotonic deadlines.
+    on_sample(t, sample) is called as each sample is taken.
+    """
+    samples, sample_times = [], []
+
+    def take_sample(tick):
+        sample = frame.evaluate(TWITCH_STATS_TABLE_JS) or {}
+        samples.append(sample)
+        sample_times.append(round(tick["actual"], 3))
+        if on_sample:
+            on_sample(sample_times[-1], sample)
+
+    # Deadlines rather than a fixed sleep, so the time spent reading the
+    # table does not push every later sample back
+    scheduler = SampleScheduler()
+    scheduler.every(1.0 / sample_rate_hz, take_sample, "sample")
+    scheduler.run(collection_seconds)
+    schedule = scheduler.report()["sample"]
+    report = {
+        "mode": "polled",
+        "requested_hz": sample_rate_hz,
+        "achieved_hz": round(len(samples) / collection_seconds, 3),
+        "samples": len(samples),
+        "skipped": schedule["skipped"],
+        "mean_lateness_s": schedule["mean_lateness_s"],
+        "max_lateness_s": schedule["max_lateness_s"],
+    }
+    return samples, sample_times, report
+
+def collect_stats_buffered(frame, collection_seconds: int, sample_rate_hz: float, on_sample=None):
+    """
+    Sample the stats table from a timer inside the iframe, draining once per second.
+    on_sample(t, sample) is called for each sample as its batch is drained.
+    """
+    sampler = PageSampler(frame, TWITCH_STATS_TABLE_JS, rate_hz=sample_rate_hz)
+    sampler.start()
+    samples, sample_times = [], []
+
+    def take_batch(batch):
+        for sample in batch:
+            samples.append(sample["value"] or {})
+            sample_times.append(round(sample["t"], 3))
+            if on_sample:
+                on_sample(sample_times[-1], samples[-1])
+
+    end = time.monotonic() + collection_seconds
+    while time.monotonic() < end:
+        time.sleep(min(1.0, max(0.0, end - time.monotonic())))
+        take_batch(sampler.drain())
+    take_batch(sampler.stop())
+    return samples, sample_times, {"mode": "buffered", **sampler.report()}
+
+def run_twitch_test(num_videos: int, collection_seconds: int, sample_rate_hz: float = 1.0,
+                    buffered: bool = False, output_filename: str = "twitch_telemetry.ndjson",
+                    recycle_after: int = 10, max_rss_mb: float = None, seed: int = None, resume: bool = False,
+                    start_url: str = RANDOM_CHANNEL_URL, headless: bool = False,
+                    browser_executable: str = CHROME_PATH):
+    """
+    Collect Twitch video stats for num_videos random channels.
+    :param sample_rate_hz: Requested stats samples per second.
+    :param buffered: Sample inside the player iframe and drain in batches instead of
+                     one evaluate() round trip per sample.
+    :param output_filename: NDJSON file receiving one record per video as it completes.
+    :param recycle_after: Videos watched in one browser context before it is replaced.
+    :param max_rss_mb: Browser memory (RSS) above which the whole browser is relaunched.
+    :param seed: RNG seed for the run (random when None); iteration n is seeded with "<seed>:<n>".
+    :param resume: Continue the interrupted run journaled next to output_filename, with its
+                   original settings and seed, skipping the iterations it already finished.
+    :param start_url: Random channel page whose iframe holds the player (e.g. a local mock site).
+    :param headless: Whether to run the browser in headless mode.
+    :param browser_executable: Chrome binary to launch (None uses Playwright's Chromium).
+    """
+    config = {"num_videos": num_videos, "collection_seconds": collection_seconds,
+              "sample_rate_hz": sample_rate_hz, "buffered": buffered,
+              "recycle_after": recycle_after, "max_rss_mb": max_rss_mb,
+              "start_url": start_url, "headless": headless, "browser_executable": browser_executable}
+    journal = RunJournal.begin(output_filename, config, seed=seed, resume=resume)
+    if journal.resumed:
+        config = journal.config
+        num_videos, collection_seconds = config["num_videos"], config["collection_seconds"]
+        sample_rate_hz, buffered = config["sample_rate_hz"], config["buffered"]
+        recycle_after, max_rss_mb = config["recycle_after"], config["max_rss_mb"]
+        start_url = config.get("start_url", RANDOM_CHANNEL_URL)
+        headless = config.get("headless", False)
+        browser_executable = config.get("browser_executable", CHROME_PATH)
+        print(f"⏩ Resuming run (seed {journal.seed}): {len(journal.completed)}/{num_videos} videos already done.")
+    # Records are appended as each video finishes, so nothing accumulates in memory
+    sink = TelemetrySink(output_filename, append=journal.resumed, truncate_to=journal.output_size)
+    total_videos = num_videos
+
+    def record_video(record):
+        sink.write_video(record["iteration"], record)
+        journal.record(record["iteration"], sink.size)
+        print(f"  💾 {sink.progress(record['iteration'], total_videos)}")
+
+    # Keep the samples of an iteration the interrupted run was in the middle of
+    for iteration, entries in sorted(sink.recovered.items()):
+        if iteration not in journal.completed:
+            record_video({"iteration": iteration, "stats_samples": [e["stats"] for e in entries],
+                          "sample_times": [e["t"] for e in entries], "error": "Interrupted"})
+
+    with sink, sync_playwright() as p:
+        # Warm browser/context pool: each video takes a page and hands it back
+        launch_options = {"executable_path": browser_executable} if browser_executable else None
+        pool = BrowserPool(p, "chromium", headless=headless, max_uses=recycle_after,
+                           max_rss_mb=max_rss_mb, launch_options=launch_options)
 
         print(f"Starting Twitch video stats collection for {num_videos} videos, "
               f"{collection_seconds}s per video sample...")
 
         for i in range(num_videos):
+            if i + 1 in journal.completed:
+                continue
+            # Each iteration's random choices depend only on the seed, so resuming repeats them
+            journal.seed_video(i + 1)
             print(f"\n--- Processing Video {i+1}/{num_videos} ---")
             current_video_data = {"iteration": i + 1}
+            slot = pool.acquire()
+            page = slot.page
+            failed = False
 
             try:
                 # 1. Navigate to random channel preview
-                page.goto(
-                    "https://twitch-tools.rootonline.de/random_channel_previews.php",
-                    wait_until="load"
-                )
+                page.goto(start_url, wait_until="load")
                 print("  Navigated to random channel preview page.")
 
                 # 2. Locate iframe
@@ -51,7 +173,7 @@ def run_twitch_test(num_videos: int, collection_seconds: int):
                 )
                 if offline_label.count() and offline_label.first.is_visible(timeout=2000):
                     print("  ⚠️ Streamer is offline. Skipping this video.")
-                    telemetry.append(current_video_data)
+                    record_video(current_video_data)
                     num_videos -= 1
                     continue
 
@@ -63,7 +185,7 @@ def run_twitch_test(num_videos: int, collection_seconds: int):
                 )
                 if ad_banner.count() and ad_banner.first.is_visible(timeout=2000):
                     print("  ⚠️ Advertisement detected. Skipping this video.")
-                    telemetry.append(current_video_data)
+                    record_video(current_video_data)
                     num_videos -= 1
                     continue
 
@@ -75,24 +197,22 @@ def run_twitch_test(num_videos: int, collection_seconds: int):
                     chk.check()
                 print("  'Video Stats' enabled.")
 
-                # 9. Collect stats once per second for collection_seconds
-                print(f"  Collecting stats for {collection_seconds} seconds (1 sample/sec)...")
-                stats_samples = []
-                for sec in range(collection_seconds):
-                    time.sleep(1)
-                    sample = {}
-                    rows = iframe_frame.locator(
-                        "tbody.tw-table-body tr[data-a-target='player-overlay-video-stats-row']"
-                    )
-                    for j in range(rows.count()):
-                        row = rows.nth(j)
-                        label = row.locator("td").nth(0).locator("p").inner_text().strip()
-                        value = row.locator("td").nth(1).locator("p").inner_text().strip()
-                        sample[label] = value
-                    stats_samples.append(sample)
-                    print(f"    [Sample {sec+1}] {sample}")
+                # 9. Collect stats for collection_seconds at the requested rate, reading
+                #    the whole stats table in one evaluation per sample (or per batch)
+                mode = "buffered" if buffered else "polled"
+                print(f"  Collecting stats for {collection_seconds} seconds "
+                      f"({sample_rate_hz:g} samples/sec, {mode})...")
+                stats_frame = get_stats_frame(iframe_locator)
+                collect = collect_stats_buffered if buffered else collect_stats_polled
+                stats_samples, sample_times, sampling = collect(
+                    stats_frame, collection_seconds, sample_rate_hz,
+                    on_sample=lambda t, sample: sink.write_sample(i + 1, {"t": t, "stats": sample}))
+                print(f"  Achieved {sampling['achieved_hz']:.2f} Hz of {sample_rate_hz:g} Hz requested "
+                      f"({sampling['samples']} samples).")
 
                 current_video_data["stats_samples"] = stats_samples
+                current_video_data["sample_times"] = sample_times
+                current_video_data["sampling"] = sampling
                 current_video_data["source_page_url"] = page.url
 
                 # 10. Close stats panel if present
@@ -100,8 +220,7 @@ def run_twitch_test(num_videos: int, collection_seconds: int):
                 if close_btn.is_visible(timeout=3000):
                     close_btn.click()
 
-                telemetry.append(current_video_data)
-                print(f"  Telemetry collected for video {i+1}.")
+                record_video(current_video_data)
 
                 # 11. Random pause before next iteration
                 time.sleep(random.uniform(2, 5))
@@ -110,28 +229,36 @@ def run_twitch_test(num_videos: int, collection_seconds: int):
                 print(f"  ❌ Error on iteration {i+1}: {e}")
                 current_video_data["error"] = str(e)
                 current_video_data.setdefault("stats_samples", [])
-                telemetry.append(current_video_data)
+                record_video(current_video_data)
+                failed = True
                 time.sleep(random.uniform(5, 10))
+            finally:
+                # A context that hit an error is replaced rather than reused
+                pool.release(slot, discard=failed)
 
-        context.close()
-        browser.close()
+        print(f"\n🧰 Browser pool: {pool.report()}")
+        pool.close()
         print("\n--- Test Finished ---")
+    journal.close(finished=len(journal.completed) >= total_videos)
+
+    # Output is already on disk; only the summary is printed
+    print(f"\n💾 {sink.progress(total_videos, total_videos)}")
 
-    # Output & save
-    print(f"\n💾 Collected telemetry for {len(telemetry)} videos:")
-    print(json.dumps(telemetry, indent=2, ensure_ascii=False))
-    with open("twitch_telemetry.json", "w", encoding="utf-8") as f:
-        json.dump(telemetry, f, indent=2, ensure_ascii=False)
-    print("Telemetry saved to twitch_telemetry.json")
-    
 if __name__ == "__main__":
     try:
+        pending = unfinished_run("twitch_telemetry.ndjson")
+        if pending and input(f"Resume the interrupted run ({pending[0]}/{pending[1]} videos done)? [Y/n] ").strip().lower() != "n":
+            run_twitch_test(0, 0, resume=True)
+            exit()
         num_videos_to_process = int(input("How many random Twitch videos should I process? "))
         duration_seconds = int(input("How many seconds of stats to collect per video? "))
-        if num_videos_to_process <= 0 or duration_seconds <= 0:
-            print("Please enter positive numbers for both inputs.")
+        rate_input = input("How many samples per second? (Enter for 1) ").strip()
+        sample_rate = float(rate_input) if rate_input else 1.0
+        if num_videos_to_process <= 0 or duration_seconds <= 0 or sample_rate <= 0:
+            print("Please enter positive numbers for all inputs.")
         else:
-            run_twitch_test(num_videos_to_process, duration_seconds)
+            # Above 1 sample/sec, sample inside the page and drain in batches
+            run_twitch_test(num_videos_to_process, duration_seconds, sample_rate, buffered=sample_rate > 1)
     except ValueError:
         print("Invalid input. Please enter numerical values.")
     except KeyboardInterrupt:
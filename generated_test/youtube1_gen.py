@@ -1,59 +1,78 @@
 import re
+import sys
 import time
 import random
-import json
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
 from playwright.sync_api import Playwright, sync_playwright, expect, Error
 
-# Your existing list of nouns…
-nouns = [
-    # English
-    "time", "year", "people", "way", "day", "man", "thing", "woman", "life", "child",
-    "world", "school", "state", "family", "student", "group", "country", "problem", "hand", "part",
-
-    # Spanish
-    "tiempo", "año", "día", "persona", "hombre", "mujer", "mano", "parte", "país", "lugar",
-    "trabajo", "vida", "momento", "forma", "caso", "grupo", "problema", "punto", "gobierno", "empresa",
-
-    # French
-    "temps", "homme", "façon", "gens", "vie", "jour", "travail", "appel", "nuit", "maison",
-    "pensée", "argent", "nom", "père", "mec", "place", "femme", "enfant", "monde", "école",
-
-    # Chinese (Simplified)
-    "人", "事", "时间", "朋友", "孩子", "中国", "家", "学生", "问题", "男人",
-    "女人", "学校", "工作", "钱", "世界", "书", "生活", "水", "国家", "老师",
-
-    # Japanese
-    "人", "子供", "大人", "男", "女", "生活", "友達", "家族", "学生", "先生",
-    "社員", "学校", "会社", "駅", "空港", "家", "アパート", "車", "電車", "時間",
-
-    # Hindi
-    "नाम", "घर", "समय", "मनुष्य", "पुस्तक", "दिन", "रात", "सप्ताह", "महीना", "साल",
-    "शहर", "गांव", "देश", "जल", "अन्न", "आदमी", "औरat", "बच्चा", "पिता", "माता",
-
-    # Korean
-    "사람", "것", "시간", "날", "집", "눈", "생각", "아이", "년", "사랑",
-    "친구", "말", "학교", "일", "몸", "마음", "세상", "문제", "엄마", "아빠",
-
-    # Russian
-    "человек", "друг", "ребёнок", "женщина", "мужчина", "время", "год", "день", "дело", "рука",
-    "глаз", "жизнь", "голова", "дом", "слово", "место", "лицо", "сторона", "нога", "работа",
-
-    # Arabic
-    "الله", "كتاب", "رجل", "امرأة", "طفل", "عين", "يد", "رأس", "قدم", "سماء",
-    "أرض", "بحر", "نار", "شمس", "قمر", "نجم", "بيت", "مدينة", "شارع", "سيارة",
-
-    # German
-    "Zeit", "Jahr", "Mensch", "Tag", "Mann", "Frau", "Kind", "Hand", "Auge", "Weg",
-    "Freund", "Haus", "Auto", "Arbeit", "Stadt", "Leben", "Problem", "Moment", "Land", "Platz",
-
-    # Portuguese
-    "coisa", "tempo", "vida", "dia", "mão", "ano", "olho", "vez", "homem", "parte",
-    "mulher", "lugar", "trabalho", "semana", "problema", "ponto", "hora", "pessoa", "forma", "caso",
-
-    # Italian
-    "anno", "giorno", "uomo", "volta", "vita", "mano", "occhio", "donna", "casa", "mondo",
-    "tempo", "modo", "parte", "amico", "persona", "problema", "notte", "punto", "cuore", "padre"
-]
+# Shared collector helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from page_sampler import PageSampler, YOUTUBE_PANEL_JS, YOUTUBE_PLAYER_JS
+from browser_pool import BrowserPool
+from request_profile import InterceptionProfile
+from sample_scheduler import SampleScheduler
+from telemetry_sink import TelemetrySink
+from run_journal import RunJournal, unfinished_run
+from search_cache import SearchCache
+from video_sampler import VideoSampler
+from network_capture import NetworkCapture
+from packet_capture import PacketCapture
+
+# Your existing list of nouns, grouped by language…
+NOUNS_BY_LANGUAGE = {
+    "English": [
+        "time", "year", "people", "way", "day", "man", "thing", "woman", "life", "child",
+        "world", "school", "state", "family", "student", "group", "country", "problem", "hand", "part"
+    ],
+    "Spanish": [
+        "tiempo", "año", "día", "persona", "hombre", "mujer", "mano", "parte", "país", "lugar",
+        "trabajo", "vida", "momento", "forma", "caso", "grupo", "problema", "punto", "gobierno", "empresa"
+    ],
+    "French": [
+        "temps", "homme", "façon", "gens", "vie", "jour", "travail", "appel", "nuit", "maison",
+        "pensée", "argent", "nom", "père", "mec", "place", "femme", "enfant", "monde", "école"
+    ],
+    "Chinese (Simplified)": [
+        "人", "事", "时间", "朋友", "孩子", "中国", "家", "学生", "问题", "男人",
+        "女人", "学校", "工作", "钱", "世界", "书", "生活", "水", "国家", "老师"
+    ],
+    "Japanese": [
+        "人", "子供", "大人", "男", "女", "生活", "友達", "家族", "学生", "先生",
+        "社員", "学校", "会社", "駅", "空港", "家", "アパート", "車", "電車", "時間"
+    ],
+    "Hindi": [
+        "नाम", "घर", "समय", "मनुष्य", "पुस्तक", "दिन", "रात", "सप्ताह", "महीना", "साल",
+        "शहर", "गांव", "देश", "जल", "अन्न", "आदमी", "औरat", "बच्चा", "पिता", "माता"
+    ],
+    "Korean": [
+        "사람", "것", "시간", "날", "집", "눈", "생각", "아이", "년", "사랑",
+        "친구", "말", "학교", "일", "몸", "마음", "세상", "문제", "엄마", "아빠"
+    ],
+    "Russian": [
+        "человек", "друг", "ребёнок", "женщина", "мужчина", "время", "год", "день", "дело", "рука",
+        "глаз", "жизнь", "голова", "дом", "слово", "место", "лицо", "сторона", "нога", "работа"
+    ],
+    "Arabic": [
+        "الله", "كتاب", "رجل", "امرأة", "طفل", "عين", "يد", "رأس", "قدم", "سماء",
+        "أرض", "بحر", "نار", "شمس", "قمر", "نجم", "بيت", "مدينة", "شارع", "سيارة"
+    ],
+    "German": [
+        "Zeit", "Jahr", "Mensch", "Tag", "Mann", "Frau", "Kind", "Hand", "Auge", "Weg",
+        "Freund", "Haus", "Auto", "Arbeit", "Stadt", "Leben", "Problem", "Moment", "Land", "Platz"
+    ],
+    "Portuguese": [
+        "coisa", "tempo", "vida", "dia", "mão", "ano", "olho", "vez", "homem", "parte",
+        "mulher", "lugar", "trabalho", "semana", "problema", "ponto", "hora", "pessoa", "forma", "caso"
+    ],
+    "Italian": [
+        "anno", "giorno", "uomo", "volta", "vita", "mano", "occhio", "donna", "casa", "mondo",
+        "tempo", "modo", "parte", "amico", "persona", "problema", "notte", "punto", "cuore", "padre"
+    ],
+}
+
+# Flat list (with the original duplicates) for callers that want plain words
+nouns = [noun for words in NOUNS_BY_LANGUAGE.values() for noun in words]
 
 class YouTubeVideoPlayerTest:
     """
@@ -66,47 +85,97 @@ class YouTubeVideoPlayerTest:
     DEFAULT_TIMEOUT = 15000  # Default timeout for Playwright operations
     SHORT_TIMEOUT = 5000     # Shorter timeout for specific elements
     AD_CHECK_TIMEOUT = 2000  # Timeout for checking ad elements
+    ACTION_CLICK_TIMEOUT = 300  # Player click of a random action in "poll" mode, well inside a sample interval
+
+    SAMPLE_MODES = ("poll", "panel", "player")
 
-    def __init__(self, headless: bool = False, browser_type: str = "firefox"):
+    def __init__(self, headless: bool = False, browser_type: str = "firefox",
+                 sample_mode: str = "poll", sample_rate_hz: float = 1.0, queries=None,
+                 recycle_after: int = 10, max_rss_mb: float = None, intercept: bool = False,
+                 search_cache: str = None, language_weights: dict = None, seen_videos: str = None,
+                 network_capture: str = None, packet_capture: str = None, capture_interface: str = "any"):
         """
         Initializes the test with browser settings.
         :param headless: Whether to run the browser in headless mode.
         :param browser_type: Type of browser to use (chromium, firefox, webkit).
+        :param sample_mode: "poll" reads the stats panel from Python once per interval;
+                            "panel" / "player" sample the panel text / the player's stats
+                            object from a timer inside the page, drained in batches.
+                            In "poll" mode random player actions run between samples with
+                            a short click timeout, so they do not delay samples.
+        :param sample_rate_hz: Requested in-page sampling rate for "panel" / "player".
+        :param queries: Search terms to draw from, as a list or {language: [words]}
+                        (defaults to NOUNS_BY_LANGUAGE).
+        :param recycle_after: Videos watched in one browser context before it is replaced.
+        :param max_rss_mb: Browser memory (RSS) above which the whole browser is relaunched.
+        :param intercept: Block images, fonts and ad/analytics requests on the search page
+                          (the watch page is never filtered) and report the savings.
+        :param search_cache: JSON file caching every result of each search between runs; later
+                             picks of the same query use the next cached result without searching.
+        :param language_weights: {language: weight} for drawing queries from NOUNS_BY_LANGUAGE;
+                                 unlisted languages weigh 1.
+        :param seen_videos: File persisting the set of collected video ids between runs, so
+                            videos that were already collected are skipped before watching.
+        :param network_capture: NDJSON file receiving every media request of each watch page
+                                (timing, bytes, protocol); per-sample media bytes are added
+                                to stats_collections and a per-video summary under "network".
+        :param packet_capture: pcap file for a tcpdump capture of the whole run; each video's
+                               window is tagged, and the capture is split into per-video pcaps
+                               of its media flows when the run ends.
+        :param capture_interface: Interface tcpdump captures on.
         """
+        if sample_mode not in self.SAMPLE_MODES:
+            raise ValueError(f"sample_mode must be one of {self.SAMPLE_MODES}, got '{sample_mode}'")
         self.headless = headless
         self.browser_type = browser_type
-        self.telemetry = [] # To store collected data for all videos
+        self.sample_mode = sample_mode
+        self.sample_rate_hz = sample_rate_hz
+        # {language: [words]} keeps the language-weighted draw; a plain list is one language
+        self.queries = (dict(queries) if isinstance(queries, dict) else list(queries)) if queries else None
+        self.language_weights = language_weights
+        self.seen_videos = seen_videos
+        # Deduplicated, language-weighted queries and the seen-video filter
+        self.sampler = VideoSampler(self.queries or NOUNS_BY_LANGUAGE, language_weights, seen_videos)
+        self.recycle_after = recycle_after
+        self.max_rss_mb = max_rss_mb
+        self.interception = InterceptionProfile() if intercept else None
+        self.search_cache = SearchCache(search_cache) if search_cache else None
+        self.network_capture = network_capture
+        self.capture = None # Opened in run_tests when network_capture is set
+        self.packet_capture = packet_capture
+        self.capture_interface = capture_interface
+        self.packets = None # tcpdump subprocess, running during run_tests when packet_capture is set
+        self.sink = None # Written video by video during run_tests
 
     def _setup(self, playwright: Playwright):
         """
-        Sets up the browser and page for the test.
+        Sets up a warm browser/context pool; each video gets its page from the pool.
         :param playwright: The Playwright instance.
         """
         # Launch the specified browser type as per user guidelines
-        if self.browser_type == "chromium":
-            self.browser = playwright.chromium.launch(headless=self.headless)
-        elif self.browser_type == "webkit":
-            self.browser = playwright.webkit.launch(headless=self.headless)
-        else: # Default to firefox, as per recorded code example
-            self.browser = playwright.firefox.launch(headless=self.headless)
-
-        self.context = self.browser.new_context()
-        self.page = self.context.new_page()
+        # Default to firefox, as per recorded code example
+        browser_type = self.browser_type if self.browser_type in ("chromium", "webkit") else "firefox"
+        self.pool = BrowserPool(playwright, browser_type, headless=self.headless,
+                                max_uses=self.recycle_after, max_rss_mb=self.max_rss_mb)
 
     def _teardown(self):
         """
-        Closes the browser context and browser.
+        Closes every browser in the pool and prints its statistics.
         """
-        if hasattr(self, 'context'):
-            self.context.close()
-        if hasattr(self, 'browser'):
-            self.browser.close()
+        if hasattr(self, 'pool'):
+            print(f"\n🧰 Browser pool: {self.pool.report()}")
+            self.pool.close()
+        if self.interception:
+            print(f"🚦 Request interception: {self.interception.report()}")
 
-    def _perform_random_video_action(self, page):
+    def _perform_random_video_action(self, page, click_timeout: int = None):
         """
         Performs a random action on the video player (play/pause, seek forward/backward).
         Adjusted probabilities: 'seek_forward' is now more likely than 'play_pause' or 'seek_backward'.
+        Returns right after the key presses; the pause before the next action comes
+        from the action schedule rather than a sleep that would delay stats samples.
         :param page: The Playwright page object.
+        :param click_timeout: Milliseconds to wait for the player click (default SHORT_TIMEOUT).
         """
         # Adjusted probabilities to have less seek back and pause.
         # 'seek_forward' is 3 times more likely than 'play_pause' or 'seek_backward'.
@@ -117,7 +186,7 @@ class YouTubeVideoPlayerTest:
         # Use a more specific locator like #player or #movie_player for robustness
         video_player_locator = page.locator("#movie_player")
         try:
-            video_player_locator.click(timeout=self.SHORT_TIMEOUT)
+            video_player_locator.click(timeout=click_timeout or self.SHORT_TIMEOUT)
         except Error:
             # Player might not be ready or clickable yet, skip action if not responsive
             print("      ⚠️ Could not click video player for action, skipping random action.")
@@ -126,21 +195,18 @@ class YouTubeVideoPlayerTest:
         if action == "play_pause":
             # Press 'k' to toggle play/pause
             page.keyboard.press("k")
-            time.sleep(random.uniform(0.5, 1.5)) # Small delay after action
             print("      • Action: Play/Pause toggled")
         elif action == "seek_forward":
             # Press 'l' multiple times to fast forward by 10 seconds per press
             presses = random.randint(1, 3) # Fast forward by 10-30 seconds
             for _ in range(presses):
                 page.keyboard.press("l")
-            time.sleep(random.uniform(0.5, 1.5))
             print(f"      • Action: Seek forward by {presses * 10} seconds")
         elif action == "seek_backward":
             # Press 'j' multiple times to rewind by 10 seconds per press
             presses = random.randint(1, 3) # Rewind by 10-30 seconds
             for _ in range(presses):
                 page.keyboard.press("j")
-            time.sleep(random.uniform(0.5, 1.5))
             print(f"      • Action: Seek backward by {presses * 10} seconds")
 
     def _get_video_stats(self, page) -> str:
@@ -157,6 +223,135 @@ class YouTubeVideoPlayerTest:
         except Error:
             return "" # Return empty string if panel is not visible or an error occurs
 
+    def _maybe_perform_action(self, click_timeout: int = None):
+        """
+        Action tick of the watch schedule: performs a random action with a 30% chance.
+        :param click_timeout: Milliseconds to wait for the player click (default SHORT_TIMEOUT).
+        """
+        if random.random() < 0.3:
+            self._perform_random_video_action(self.page, click_timeout)
+
+    def _poll_stats(self, tick, video_telemetry):
+        """
+        Sample tick of the watch schedule in "poll" mode: reads the stats panel once.
+        :param tick: Scheduler tick with scheduled/actual times and lateness in seconds.
+        :param video_telemetry: The telemetry dict of the current video.
+        """
+        current_stats = self._get_video_stats(self.page)
+        self._add_sample(video_telemetry, {
+            "timestamp_watched": tick["actual"],
+            "scheduled": tick["scheduled"],
+            "lateness": tick["lateness"],
+            "stats": current_stats.strip() if current_stats else "Not Available"
+        })
+        if current_stats:
+            print(f"    • Stats collected at {tick['actual']:.1f}s.")
+            # Print only the first line of stats for brevity
+            print("      " + current_stats.strip().split('\n')[0] + "...")
+        else:
+            print(f"    • Stats not available at {tick['actual']:.1f}s.")
+
+    def _add_sample(self, video_telemetry, entry):
+        """
+        Appends one stats entry to the current video and to the sink's partial samples.
+        :param video_telemetry: The telemetry dict of the current video.
+        :param entry: The stats_collections entry.
+        """
+        video_telemetry["stats_collections"].append(entry)
+        self.sink.write_sample(self.video_index, entry)
+
+    def _record_video(self, record, num_videos):
+        """
+        Writes and checkpoints one finished (or failed) video record, then prints a
+        one-line progress summary.
+        :param record: The video's telemetry dict.
+        :param num_videos: Number of videos in this run.
+        """
+        self.sink.write_video(self.video_index, record)
+        self.journal.record(self.video_index, self.sink.size)
+        print(f"  💾 {self.sink.progress(self.video_index + 1, num_videos)}")
+
+    def _start_page_sampler(self):
+        """
+        Installs the in-page sampler for the configured sample mode.
+        :return: The started PageSampler, or None when polling from Python.
+        """
+        if self.sample_mode == "poll":
+            return None
+        capture_js = YOUTUBE_PLAYER_JS if self.sample_mode == "player" else YOUTUBE_PANEL_JS
+        sampler = PageSampler(self.page, capture_js, rate_hz=self.sample_rate_hz)
+        sampler.start()
+        return sampler
+
+    def _append_sampled_stats(self, samples, video_telemetry):
+        """
+        Appends a drained batch of in-page samples to the video's stats_collections.
+        :param samples: List of {"t", "value"} dicts from PageSampler.drain().
+        :param video_telemetry: The telemetry dict of the current video.
+        """
+        for sample in samples:
+            value = sample["value"]
+            if isinstance(value, str):
+                value = value.strip()
+            self._add_sample(video_telemetry, {
+                "timestamp_watched": sample["t"],
+                "scheduled": sample["scheduled"],
+                "lateness": round(sample["t"] - sample["scheduled"], 4),
+                "stats": value or "Not Available"
+            })
+        if samples:
+            print(f"    • {len(samples)} stats samples drained up to {samples[-1]['t']:.1f}s.")
+
+    def _search_first_result(self, query, video_telemetry):
+        """
+        Loads the search page for query and returns the first result whose video has not
+        been collected yet, caching the results after it for later iterations when the
+        search cache is enabled.
+        :return: The href, or None when the page has no (unseen) results.
+        """
+        print(f"  🔍 Searching for: '{query}'")
+        search_started = time.monotonic()
+        search_url = self.SEARCH_URL_TEMPLATE.format(query)
+        with self._measure_navigation("search", search_url, video_telemetry):
+            self.page.goto(search_url, timeout=self.DEFAULT_TIMEOUT)
+            # Wait for network to be idle, indicating page content has likely loaded
+            self.page.wait_for_load_state("networkidle", timeout=self.DEFAULT_TIMEOUT)
+
+        first_video_locator = self.page.locator("a#video-title").first
+        try:
+            # Wait for the video title link to be attached to the DOM
+            first_video_locator.wait_for(state="attached", timeout=self.SHORT_TIMEOUT)
+            hrefs = self.page.eval_on_selector_all("a#video-title", "links => links.map(a => a.getAttribute('href'))")
+        except Error:
+            print(f"  ⚠️ No video results found for '{query}', skipping this video.")
+            return None
+        hrefs = [h for h in hrefs if h]
+        if not hrefs:
+            print(f"  ⚠️ No result for '{query}' has a link, skipping this video.")
+            return None
+        href = self.sampler.first_unseen(hrefs)
+        if href is None:
+            print(f"  ⚠️ Every result for '{query}' was collected before, skipping this video.")
+            return None
+        if self.search_cache:
+            rest = hrefs[hrefs.index(href) + 1:]
+            candidates = [h for h in rest if h.startswith("/watch?v=")]
+            self.search_cache.put(query, candidates, time.monotonic() - search_started)
+        return href
+
+    @contextmanager
+    def _measure_navigation(self, phase, url, video_telemetry):
+        """
+        Wraps one navigation: applies the interception profile for phase and
+        stores the navigation record in video_telemetry["navigation"].
+        """
+        if not self.interception:
+            yield
+            return
+        with self.interception.measure(self.page, phase, url) as record:
+            video_telemetry.setdefault("navigation", {})[phase] = record
+            yield
+
     def _skip_ads_if_present(self):
         """
         Attempts to skip YouTube ads if present.
@@ -195,42 +390,125 @@ class YouTubeVideoPlayerTest:
             print(f"    ⚠️ An unexpected error occurred during ad check: {e}")
             return False
 
-    def run_tests(self, num_videos: int, browser_type: str = "firefox", headless: bool = False):
+    def _run_config(self, num_videos: int) -> dict:
+        """
+        Returns the settings that define a run, as stored in its journal.
+        :param num_videos: Number of videos in the run.
+        """
+        return {
+            "num_videos": num_videos,
+            "browser_type": self.browser_type,
+            "headless": self.headless,
+            "sample_mode": self.sample_mode,
+            "sample_rate_hz": self.sample_rate_hz,
+            "queries": self.queries,
+            "language_weights": self.language_weights,
+            "seen_videos": self.seen_videos,
+            "network_capture": self.network_capture,
+            "packet_capture": self.packet_capture,
+            "capture_interface": self.capture_interface,
+            "recycle_after": self.recycle_after,
+            "max_rss_mb": self.max_rss_mb,
+            "intercept": self.interception is not None,
+            "search_cache": self.search_cache.path if self.search_cache else None,
+        }
+
+    def _apply_run_config(self, config: dict):
+        """
+        Restores the settings of a journaled run so a resumed run behaves like the original.
+        :param config: Config from the run's journal.
+        """
+        self.browser_type = config["browser_type"]
+        self.headless = config["headless"]
+        self.sample_mode = config["sample_mode"]
+        self.sample_rate_hz = config["sample_rate_hz"]
+        self.queries = config["queries"]
+        self.language_weights = config.get("language_weights")
+        self.seen_videos = config.get("seen_videos")
+        self.network_capture = config.get("network_capture")
+        self.packet_capture = config.get("packet_capture")
+        self.capture_interface = config.get("capture_interface", "any")
+        self.sampler = VideoSampler(self.queries or NOUNS_BY_LANGUAGE, self.language_weights, self.seen_videos)
+        self.recycle_after = config["recycle_after"]
+        self.max_rss_mb = config["max_rss_mb"]
+        self.interception = InterceptionProfile() if config["intercept"] else None
+        self.search_cache = SearchCache(config["search_cache"]) if config.get("search_cache") else None
+
+    def _record_interrupted(self, journal, num_videos):
+        """
+        Writes the samples of videos that were in progress when a resumed run stopped
+        as records marked with an "Interrupted" error, so they are kept but not repeated.
+        :param journal: The resumed run's journal.
+        :param num_videos: Number of videos in the run.
+        """
+        for video, entries in sorted(self.sink.recovered.items()):
+            if video in journal.completed:
+                continue
+            self.video_index = video
+            self._record_video({"video_url": "N/A", "query": "N/A", "stats_collections": entries,
+                                "error": "Interrupted"}, num_videos)
+
+    def run_tests(self, num_videos: int, browser_type: str = "firefox", headless: bool = False,
+                  output_filename: str = "youtube_telemetry.ndjson", seed: int = None, resume: bool = False):
         """
         Executes the YouTube video playback test for a specified number of videos.
         :param num_videos: Number of random videos to process.
         :param browser_type: Type of browser to use (chromium, firefox, webkit).
         :param headless: Whether to run the browser in headless mode.
+        :param output_filename: NDJSON file receiving one record per video as it completes.
+        :param seed: RNG seed for the run (random when None); video i is seeded with "<seed>:<i>".
+        :param resume: Continue the interrupted run journaled next to output_filename, with its
+                       original settings and seed, skipping the videos it already finished.
         """
         self.browser_type = browser_type
         self.headless = headless
-
-        # Use sync_playwright context manager to manage Playwright resources
-        with sync_playwright() as p:
+        self.journal = journal = RunJournal.begin(output_filename, self._run_config(num_videos),
+                                                  seed=seed, resume=resume)
+        if journal.resumed:
+            self._apply_run_config(journal.config)
+            num_videos = journal.config["num_videos"]
+            print(f"⏩ Resuming run (seed {journal.seed}): {len(journal.completed)}/{num_videos} videos already done.")
+        # Records are appended as each video finishes, so nothing accumulates in memory
+        self.sink = TelemetrySink(output_filename, append=journal.resumed, truncate_to=journal.output_size)
+        self.capture = NetworkCapture(self.network_capture) if self.network_capture else None
+        # A resumed run captures into the next free "<name>.<n>.pcap" with the same tags file
+        self.packets = PacketCapture(self.packet_capture, interface=self.capture_interface,
+                                     append=journal.resumed) if self.packet_capture else None
+        if journal.resumed:
+            self._record_interrupted(journal, num_videos)
+
+        # Use sync_playwright context manager to manage Playwright resources;
+        # tcpdump (if enabled) runs for the whole run and is stopped even on Ctrl+C
+        with self.sink, sync_playwright() as p, (self.packets or nullcontext()):
             self._setup(p) # Setup browser and page before starting tests
 
             for i in range(num_videos):
+                if i in journal.completed:
+                    continue
                 print(f"\n▶️ Processing Video {i+1}/{num_videos}")
+                self.video_index = i
+                # Each video's random choices depend only on the seed and i, so resuming repeats them
+                journal.seed_video(i)
                 video_telemetry = {} # Data for the current video iteration
+                # Take a warm context for this video; it is recycled after enough videos
+                slot = self.pool.acquire()
+                self.page = slot.page
+                failed = False
+                checkpoint = True # Cleared when the run itself is interrupted mid-video
 
                 try:
-                    # 1) Pick and search a random noun
-                    query = random.choice(nouns)
-                    print(f"  🔍 Searching for: '{query}'")
-                    self.page.goto(self.SEARCH_URL_TEMPLATE.format(query), timeout=self.DEFAULT_TIMEOUT)
-                    # Wait for network to be idle, indicating page content has likely loaded
-                    self.page.wait_for_load_state("networkidle", timeout=self.DEFAULT_TIMEOUT)
-
-                    # 2) Click the first video result
-                    first_video_locator = self.page.locator("a#video-title").first
-                    href = None
-                    try:
-                        # Wait for the video title link to be attached to the DOM
-                        first_video_locator.wait_for(state="attached", timeout=self.SHORT_TIMEOUT)
-                        href = first_video_locator.get_attribute("href")
-                    except Error:
-                        print(f"  ⚠️ No video results found for '{query}', skipping this video.")
-                        continue # Skip to next video if no result element is found
+                    # 1) Pick a random noun; take its next cached result, or search it
+                    query = self.sampler.query()
+                    href = self.search_cache.take(query) if self.search_cache else None
+                    while href and self.sampler.is_seen(href):
+                        href = self.search_cache.take(query) # Already collected; try the next result
+                    if href:
+                        print(f"  ⚡ Using cached search results for: '{query}'")
+                    else:
+                        # 2) Search and take the first video result
+                        href = self._search_first_result(query, video_telemetry)
+                        if href is None:
+                            continue # Skip to next video if no result element is found
 
                     if not href or not href.startswith("/watch?v="):
                         print(f"  ⚠️ Invalid video link found for '{query}' (href: {href}), skipping.")
@@ -238,7 +516,13 @@ class YouTubeVideoPlayerTest:
 
                     video_url = self.BASE_URL + href
                     print(f"  🎬 Navigating to: {video_url}")
-                    self.page.goto(video_url, timeout=self.DEFAULT_TIMEOUT)
+                    if self.capture:
+                        # Capture from the watch navigation on, so the first segments are included
+                        self.capture.start(self.page, i)
+                    if self.packets:
+                        self.packets.begin(i) # Packets from here to end() belong to this video
+                    with self._measure_navigation("watch", video_url, video_telemetry):
+                        self.page.goto(video_url, timeout=self.DEFAULT_TIMEOUT)
 
                     # 3) Skip ads if any
                     self._skip_ads_if_present()
@@ -287,55 +571,50 @@ class YouTubeVideoPlayerTest:
                         # but stats_collections will contain "Not Available" entries.
                         pass
 
-                    # 7) Loop to collect stats and perform random actions
-                    # Collect stats approximately once per second and perform random actions intermittently.
-                    
-                    start_watching_time = time.time()
-                    STAT_COLLECTION_INTERVAL = 1.0 # Target interval for collecting stats in seconds
-
-                    while (time.time() - start_watching_time) < watch_time:
-                        current_interval_start = time.time()
-                        
-                        # Decide if a random user action should be performed in this interval (e.g., 30% chance)
-                        if random.random() < 0.3:
-                            self._perform_random_video_action(self.page)
-                        
-                        # Calculate time spent on actions (including their internal sleep) within this interval
-                        time_spent_on_actions = time.time() - current_interval_start
-                        
-                        # Determine how much more to sleep to reach the target STAT_COLLECTION_INTERVAL
-                        # Ensure we don't sleep past the total target watch_time
-                        remaining_sleep_needed = STAT_COLLECTION_INTERVAL - time_spent_on_actions
-                        
-                        # Only sleep if remaining time is positive and doesn't exceed total remaining watch time
-                        if remaining_sleep_needed > 0:
-                            max_total_sleep_allowed = watch_time - (time.time() - start_watching_time)
-                            actual_sleep_duration = min(remaining_sleep_needed, max_total_sleep_allowed)
-                            if actual_sleep_duration > 0:
-                                time.sleep(actual_sleep_duration)
-                        
-                        # Collect stats at the current point in time
-                        current_stats = self._get_video_stats(self.page)
-                        timestamp_since_start = time.time() - start_watching_time
-                        
-                        if current_stats:
-                            video_telemetry["stats_collections"].append({
-                                "timestamp_watched": timestamp_since_start,
-                                "stats": current_stats.strip()
-                            })
-                            print(f"    • Stats collected at {timestamp_since_start:.1f}s.")
-                            # Print only the first line of stats for brevity
-                            print("      " + current_stats.strip().split('\n')[0] + "...")
-                        else:
-                            print(f"    • Stats not available at {timestamp_since_start:.1f}s.")
-                            video_telemetry["stats_collections"].append({
-                                "timestamp_watched": timestamp_since_start,
-                                "stats": "Not Available"
-                            })
-                        
-                        # If the total elapsed time has reached or exceeded `watch_time` after this iteration, break
-                        if (time.time() - start_watching_time) >= watch_time:
-                            break
+                    # 7) Collect stats and perform random actions on fixed monotonic deadlines.
+                    # Samples (or drains of the in-page sampler in "panel"/"player" mode) fire
+                    # every STAT_COLLECTION_INTERVAL. With the in-page sampler, samples are taken
+                    # on the page's own clock, so a slow action delays a drain but no sample. In
+                    # "poll" mode every sample is a Playwright call on this same thread (the sync
+                    # API cannot be used from another one), so actions run halfway between samples
+                    # and give up on the player click after ACTION_CLICK_TIMEOUT, finishing before
+                    # the next sample is due.
+                    sampler = self._start_page_sampler()
+                    STAT_COLLECTION_INTERVAL = 1.0 # Target interval for collecting (or draining) stats in seconds
+                    ACTION_INTERVAL = 1.0 # Each action tick performs a random action with 30% chance
+                    scheduler = SampleScheduler()
+                    if sampler:
+                        # One round trip fetches every sample taken since the last drain
+                        scheduler.every(STAT_COLLECTION_INTERVAL,
+                                        lambda tick: self._append_sampled_stats(sampler.drain(), video_telemetry),
+                                        "drain")
+                    else:
+                        scheduler.every(STAT_COLLECTION_INTERVAL,
+                                        lambda tick: self._poll_stats(tick, video_telemetry), "sample")
+                    if sampler:
+                        scheduler.every(ACTION_INTERVAL, lambda tick: self._maybe_perform_action(), "action",
+                                        priority=1)
+                    else:
+                        scheduler.every(ACTION_INTERVAL,
+                                        lambda tick: self._maybe_perform_action(self.ACTION_CLICK_TIMEOUT),
+                                        "action", priority=1, first=ACTION_INTERVAL * 1.5)
+                    if self.capture:
+                        self.capture.align() # Network times become relative to the stats timeline
+                    # Returns once watch_time has elapsed, so no catch-up sleep is needed
+                    scheduler.run(watch_time)
+
+                    if sampler:
+                        self._append_sampled_stats(sampler.stop(), video_telemetry)
+                        video_telemetry["sampling"] = sampler.report()
+                        print(f"  📈 Sampled at {video_telemetry['sampling']['achieved_hz']:.2f} Hz "
+                              f"(requested {self.sample_rate_hz:.2f} Hz, {sampler.drains} drains).")
+                    video_telemetry["schedule"] = scheduler.report()
+                    if self.capture:
+                        video_telemetry["network"] = self.capture.stop()
+                        self.capture.correlate(video_telemetry["stats_collections"])
+                        print(f"  🌐 {video_telemetry['network']['requests']} media requests, "
+                              f"{video_telemetry['network']['bytes'] / 2 ** 20:.1f} MB "
+                              f"(capture overhead {video_telemetry['network']['overhead_pct']:.2f}%).")
 
                     # Ensure video is playing at the end of the loop if it was paused
                     try:
@@ -346,16 +625,8 @@ class YouTubeVideoPlayerTest:
                     except Error:
                         print("  ⚠️ Could not verify video playing state.")
 
-                    # Ensure total watched time approximately matches the target watch_time
-                    # This final sleep ensures we hit the target watch_time if the loop ended slightly early
-                    time_elapsed_actual = time.time() - start_watching_time
-                    if time_elapsed_actual < watch_time:
-                         remaining_total_sleep = watch_time - time_elapsed_actual
-                         if remaining_total_sleep > 0:
-                            print(f"  ⏳ Waiting for remaining {remaining_total_sleep:.1f}s to reach target watch time.")
-                            time.sleep(remaining_total_sleep)
-
-                    self.telemetry.append(video_telemetry)
+                    self._record_video(video_telemetry, num_videos)
+                    self.sampler.mark_seen(video_url)
                     time.sleep(random.uniform(1, 3)) # Optional small pause between videos
 
                 except Error as e:
@@ -365,7 +636,8 @@ class YouTubeVideoPlayerTest:
                     if "video_url" not in video_telemetry:
                         video_telemetry["video_url"] = "N/A"
                         video_telemetry["query"] = query if 'query' in locals() else "N/A"
-                    self.telemetry.append({**video_telemetry, "error": f"Playwright Error: {str(e)}"})
+                    self._record_video({**video_telemetry, "error": f"Playwright Error: {str(e)}"}, num_videos)
+                    failed = True
                     time.sleep(random.uniform(1, 2)) # Small pause before next iteration
                 except Exception as e:
                     print(f"  ❌ An unexpected error occurred processing video '{query}': {e}")
@@ -374,30 +646,64 @@ class YouTubeVideoPlayerTest:
                     if "video_url" not in video_telemetry:
                         video_telemetry["video_url"] = "N/A"
                         video_telemetry["query"] = query if 'query' in locals() else "N/A"
-                    self.telemetry.append({**video_telemetry, "error": f"Unexpected Error: {str(e)}"})
+                    self._record_video({**video_telemetry, "error": f"Unexpected Error: {str(e)}"}, num_videos)
+                    failed = True
                     time.sleep(random.uniform(1, 2))
+                except BaseException:
+                    # e.g. Ctrl+C: leave this video for a resumed run
+                    checkpoint = False
+                    raise
+                finally:
+                    if self.capture:
+                        self.capture.stop() # No-op unless the video ended early
+                    if self.packets:
+                        self.packets.end() # Closes this video's packet window
+                    # A context that hit an error is replaced rather than reused
+                    self.pool.release(slot, discard=failed)
+                    # Skipped videos (no results, bad link) count as done too
+                    if checkpoint and i not in journal.completed:
+                        journal.record(i, self.sink.size)
 
             self._teardown() # Teardown browser and page after all videos are processed
+        journal.close(finished=len(journal.completed) >= num_videos)
+        if self.capture:
+            self.capture.close()
+        # Split the finished capture into one pcap per video, keeping its media flows
+        slices = self.packets.slice() if self.packets else None
 
-        # 8) Output results
+        # 8) Output results (already on disk; only the summary is printed)
         print("\n\n=== Test Summary ===")
-        print(f"💾 Collected telemetry for {len(self.telemetry)} videos.")
-        # Print results to console
-        print(json.dumps(self.telemetry, indent=2, ensure_ascii=False))
-
-        # Write results to a JSON file
-        output_filename = "youtube_telemetry.json"
-        try:
-            with open(output_filename, "w", encoding="utf-8") as f:
-                json.dump(self.telemetry, f, indent=2, ensure_ascii=False)
-            print(f"Results saved to {output_filename}")
-        except IOError as e:
-            print(f"Error saving results to file '{output_filename}': {e}")
+        print(f"💾 {self.sink.progress(num_videos, num_videos)}")
+        if self.capture:
+            network = self.capture.report()
+            print(f"🌐 Network capture: {network['requests']} media requests, "
+                  f"{network['bytes'] / 2 ** 20:.1f} MB, {network['events']} events handled in "
+                  f"{network['handler_s']}s -> {self.network_capture}")
+        if self.packets:
+            stats = self.packets.stats
+            sliced = [s for s in slices.values() if s["path"]]
+            print(f"📦 Packet capture: {stats['captured']} packets captured "
+                  f"({stats['dropped_by_kernel']} dropped by kernel) -> {stats['pcap']}; "
+                  f"{len(sliced)} per-video slices, "
+                  f"{sum(s['bytes'] for s in sliced) / 2 ** 20:.1f} MB in media flows.")
+        yield_report = self.sampler.report()
+        print(f"🎯 Unique videos: {yield_report['unique_videos']} "
+              f"({yield_report['unique_per_hour']:.1f}/hour), {yield_report['duplicates_skipped']} "
+              f"already-collected videos skipped, {yield_report['seen_total']} seen in total.")
+        if self.search_cache:
+            cache = self.search_cache.report()
+            print(f"⚡ Search cache: {cache['hits']} hits / {cache['misses']} misses "
+                  f"(hit rate {cache['hit_rate']}), {cache['search_s_saved']}s of searching saved, "
+                  f"{cache['entries']} queries cached ({cache['expired']} expired, {cache['evicted']} evicted).")
 
 
 # Main execution block
 if __name__ == "__main__":
     # Get number of videos to process from user input
+    pending = unfinished_run("youtube_telemetry.ndjson")
+    if pending and input(f"Resume the interrupted run ({pending[0]}/{pending[1]} videos done)? [Y/n] ").strip().lower() != "n":
+        YouTubeVideoPlayerTest().run_tests(0, resume=True)
+        exit()
     try:
         num_videos_to_process = int(input("How many random videos should I process? "))
         if num_videos_to_process <= 0:
@@ -411,5 +717,7 @@ if __name__ == "__main__":
     # Set headless=True for running without opening a browser GUI.
     # Set browser_type to "chromium", "firefox", or "webkit".
     # Default is "firefox" to match the original recorded code.
+    # Set sample_mode="panel" or "player" (e.g. with sample_rate_hz=10) to sample
+    # inside the page and drain samples in batches instead of polling once per second.
     test_runner = YouTubeVideoPlayerTest(headless=False, browser_type="firefox")
     test_runner.run_tests(num_videos_to_process)
\ No newline at end of file
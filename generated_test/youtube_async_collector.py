@@ -0,0 +1,280 @@
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+from playwright.async_api import async_playwright, Error
+
+# Shared collector helpers live at the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from page_sampler import AsyncPageSampler, YOUTUBE_PANEL_JS, YOUTUBE_PLAYER_JS
+from generated_test.youtube1_gen import NOUNS_BY_LANGUAGE, YouTubeVideoPlayerTest
+from telemetry_sink import TelemetrySink
+from video_sampler import VideoSampler, video_id
+
+class AsyncYouTubeCollector:
+    """
+    Watches several YouTube videos at once from a single browser.
+
+    Each video runs as an asyncio task in its own isolated browser context and
+    page, with at most `concurrency` tasks active at a time. Stats are sampled
+    inside each page (see page_sampler) so a watching task costs almost no
+    Python time and the event loop can serve the other pages while it sleeps.
+    """
+
+    BASE_URL = YouTubeVideoPlayerTest.BASE_URL
+    SEARCH_URL_TEMPLATE = YouTubeVideoPlayerTest.SEARCH_URL_TEMPLATE
+    DEFAULT_TIMEOUT = YouTubeVideoPlayerTest.DEFAULT_TIMEOUT
+    SHORT_TIMEOUT = YouTubeVideoPlayerTest.SHORT_TIMEOUT
+    AD_CHECK_TIMEOUT = YouTubeVideoPlayerTest.AD_CHECK_TIMEOUT
+    STAT_DRAIN_INTERVAL = 1.0  # Seconds between drains of the in-page sample buffer
+
+    def __init__(self, concurrency: int = 4, headless: bool = True, browser_type: str = "chromium",
+                 sample_mode: str = "panel", sample_rate_hz: float = 1.0, language_weights: dict = None,
+                 seen_videos: str = None):
+        """
+        :param concurrency: Maximum number of videos watched at the same time.
+        :param headless: Whether to run the browser in headless mode.
+        :param browser_type: Type of browser to use (chromium, firefox, webkit).
+        :param sample_mode: "panel" samples the Stats for Nerds text, "player" the player's stats object.
+        :param sample_rate_hz: Requested in-page sampling rate.
+        :param language_weights: {language: weight} for drawing queries; unlisted languages weigh 1.
+        :param seen_videos: File persisting collected video ids, so they are skipped in later runs.
+        """
+        if sample_mode not in ("panel", "player"):
+            raise ValueError(f"sample_mode must be 'panel' or 'player', got '{sample_mode}'")
+        self.concurrency = concurrency
+        self.headless = headless
+        self.browser_type = browser_type
+        self.sample_mode = sample_mode
+        self.sample_rate_hz = sample_rate_hz
+        self.sampler = VideoSampler(NOUNS_BY_LANGUAGE, language_weights, seen_videos)
+        self.sink = None
+        self._claimed = set()  # Ids of the videos tasks are watching, so no two pick the same one
+        self._finished = {}  # index -> record (None if skipped) of videos done ahead of _next_index
+        self._next_index = 0
+
+    async def _perform_random_video_action(self, page, tag):
+        """Async counterpart of YouTubeVideoPlayerTest._perform_random_video_action."""
+        action = random.choice(["seek_forward"] * 3 + ["play_pause"] + ["seek_backward"])
+        try:
+            await page.locator("#movie_player").click(timeout=self.SHORT_TIMEOUT)
+        except Error:
+            print(f"{tag}      ⚠️ Could not click video player for action, skipping random action.")
+            return
+        if action == "play_pause":
+            await page.keyboard.press("k")
+            print(f"{tag}      • Action: Play/Pause toggled")
+        else:
+            key = "l" if action == "seek_forward" else "j"
+            presses = random.randint(1, 3)
+            for _ in range(presses):
+                await page.keyboard.press(key)
+            direction = "forward" if action == "seek_forward" else "backward"
+            print(f"{tag}      • Action: Seek {direction} by {presses * 10} seconds")
+
+    async def _skip_ads_if_present(self, page, tag):
+        """Clicks YouTube's 'Skip Ad' button if one shows up."""
+        try:
+            await page.wait_for_timeout(1000)
+            for locator in (page.locator("button.ytp-ad-skip-button"), page.get_by_text("Skip Ad")):
+                if await locator.is_visible():
+                    await locator.click(timeout=self.AD_CHECK_TIMEOUT)
+                    print(f"{tag}    ✅ Skipped ad.")
+                    await page.wait_for_timeout(500)
+                    return True
+        except Error as e:
+            print(f"{tag}    ⚠️ Error checking for ads: {e}")
+        return False
+
+    async def _open_stats_panel(self, page, tag):
+        """Right-clicks the player and opens the 'Stats for nerds' panel."""
+        try:
+            player = page.locator("#player")
+            await player.wait_for(state="visible", timeout=self.SHORT_TIMEOUT)
+            box = await player.bounding_box()
+            if box:
+                await page.mouse.click(box["x"] + box["width"] / 2, box["y"] + box["height"] / 2, button="right")
+                await asyncio.sleep(1)
+            nerds_option = page.get_by_text("Stats for nerds")
+            await nerds_option.wait_for(state="visible", timeout=self.SHORT_TIMEOUT)
+            await nerds_option.click()
+            await page.locator(".html5-video-info-panel").wait_for(state="visible", timeout=self.SHORT_TIMEOUT)
+            print(f"{tag}  📊 'Stats for nerds' panel opened.")
+        except Error as e:
+            print(f"{tag}  ⚠️ Could not open 'Stats for nerds': {e}")
+
+    async def _watch(self, page, video_telemetry, watch_time, tag, index):
+        """Samples stats in the page for watch_time seconds while performing random actions."""
+        capture_js = YOUTUBE_PLAYER_JS if self.sample_mode == "player" else YOUTUBE_PANEL_JS
+        sampler = AsyncPageSampler(page, capture_js, rate_hz=self.sample_rate_hz)
+        await sampler.start()
+        start = time.monotonic()
+
+        def append(samples):
+            for sample in samples:
+                value = sample["value"]
+                if isinstance(value, str):
+                    value = value.strip()
+                entry = {
+                    "timestamp_watched": sample["t"],
+                    "scheduled": sample["scheduled"],
+                    "lateness": round(sample["t"] - sample["scheduled"], 4),
+                    "stats": value or "Not Available"
+                }
+                video_telemetry["stats_collections"].append(entry)
+                self.sink.write_sample(index, entry)
+
+        while time.monotonic() - start < watch_time:
+            if random.random() < 0.3:
+                await self._perform_random_video_action(page, tag)
+            remaining = watch_time - (time.monotonic() - start)
+            await asyncio.sleep(min(self.STAT_DRAIN_INTERVAL, max(0.0, remaining)))
+            append(await sampler.drain())
+        append(await sampler.stop())
+        video_telemetry["sampling"] = sampler.report()
+        print(f"{tag}  📈 {sampler.collected} samples at {video_telemetry['sampling']['achieved_hz']:.2f} Hz.")
+
+    async def _collect_one(self, page, index, num_videos):
+        """Searches a random noun, watches the first result, and returns its telemetry record."""
+        tag = f"[{index + 1}/{num_videos}]"
+        query = self.sampler.query()
+        claimed = None
+        video_telemetry = {"video_url": "N/A", "query": query}
+        try:
+            print(f"{tag}  🔍 Searching for: '{query}'")
+            await page.goto(self.SEARCH_URL_TEMPLATE.format(query), timeout=self.DEFAULT_TIMEOUT)
+            await page.wait_for_load_state("networkidle", timeout=self.DEFAULT_TIMEOUT)
+
+            first_video = page.locator("a#video-title").first
+            try:
+                await first_video.wait_for(state="attached", timeout=self.SHORT_TIMEOUT)
+                hrefs = await page.eval_on_selector_all("a#video-title", "links => links.map(a => a.getAttribute('href'))")
+            except Error:
+                print(f"{tag}  ⚠️ No video results found for '{query}', skipping this video.")
+                return None
+            hrefs = [h for h in hrefs if h]
+            if not hrefs:
+                print(f"{tag}  ⚠️ No result for '{query}' has a link, skipping this video.")
+                return None
+            # Picked and claimed with no await in between, so no other task can take it meanwhile
+            href = self.sampler.first_unseen(hrefs, exclude=self._claimed)
+            if href is None:
+                print(f"{tag}  ⚠️ Every result for '{query}' was collected before or is being watched, "
+                      f"skipping this video.")
+                return None
+            if not href.startswith("/watch?v="):
+                print(f"{tag}  ⚠️ Invalid video link found for '{query}' (href: {href}), skipping.")
+                return None
+            claimed = video_id(href)
+            self._claimed.add(claimed)
+
+            video_url = self.BASE_URL + href
+            print(f"{tag}  🎬 Navigating to: {video_url}")
+            await page.goto(video_url, timeout=self.DEFAULT_TIMEOUT)
+            await self._skip_ads_if_present(page, tag)
+            await page.wait_for_selector("video", state="attached", timeout=self.DEFAULT_TIMEOUT)
+            await page.locator("#movie_player").wait_for(state="visible", timeout=self.DEFAULT_TIMEOUT)
+
+            duration = await page.evaluate("() => document.querySelector('video').duration")
+            if not isinstance(duration, (int, float)) or duration <= 0:
+                print(f"{tag}  ⚠️ Could not get valid video duration for '{query}', skipping.")
+                return None
+            watch_time = random.uniform(5, min(duration * 0.9, 120))
+            print(f"{tag}  ⏱ Watching for {watch_time:.1f}s out of {duration:.1f}s")
+
+            video_telemetry.update({
+                "video_url": video_url,
+                "duration": duration,
+                "watched": watch_time,
+                "stats_collections": [],
+            })
+            await self._open_stats_panel(page, tag)
+            await self._watch(page, video_telemetry, watch_time, tag, index)
+            self.sampler.mark_seen(video_url)
+            return video_telemetry
+        except Error as e:
+            print(f"{tag}  ❌ Playwright error occurred processing video '{query}': {e}")
+            return {**video_telemetry, "error": f"Playwright Error: {str(e)}"}
+        except Exception as e:
+            print(f"{tag}  ❌ An unexpected error occurred processing video '{query}': {e}")
+            return {**video_telemetry, "error": f"Unexpected Error: {str(e)}"}
+        finally:
+            # Seen once watched; a video that failed may be picked again
+            self._claimed.discard(claimed)
+
+    async def _run_task(self, browser, semaphore, index, num_videos):
+        """Runs one video in a fresh, isolated context once a concurrency slot is free."""
+        async with semaphore:
+            context = await browser.new_context()
+            try:
+                page = await context.new_page()
+                record = await self._collect_one(page, index, num_videos)
+            finally:
+                await context.close()
+        self._finished[index] = record
+        self._write_finished(num_videos)
+
+    def _write_finished(self, num_videos, everything=False):
+        """
+        Writes finished records in index (submission) order: each waits until every
+        earlier video has finished, so at most the videos overtaken by a slow one are
+        held. everything also writes the records left behind a video that never finished.
+        """
+        while self._finished:
+            if self._next_index not in self._finished:
+                if not everything:
+                    break
+                self._next_index = min(self._finished)
+            record = self._finished.pop(self._next_index)
+            if record is not None:
+                self.sink.write_video(self._next_index, record)
+                print(f"  💾 {self.sink.progress(self.sink.videos, num_videos)}")
+            self._next_index += 1
+
+    async def run(self, num_videos: int, output_filename: str = "youtube_telemetry.ndjson"):
+        """
+        Collects telemetry for num_videos random videos, `concurrency` at a time.
+        :param output_filename: NDJSON file receiving one record per video, in submission order.
+        :return: Achieved videos per hour.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = time.monotonic()
+        self.sink = TelemetrySink(output_filename)
+        self._finished, self._next_index = {}, 0
+        with self.sink:
+            try:
+                async with async_playwright() as p:
+                    browser = await getattr(p, self.browser_type).launch(headless=self.headless)
+                    try:
+                        await asyncio.gather(*(self._run_task(browser, semaphore, i, num_videos)
+                                               for i in range(num_videos)))
+                    finally:
+                        await browser.close()
+            finally:
+                self._write_finished(num_videos, everything=True)
+        elapsed = time.monotonic() - started
+
+        completed = self.sink.videos - self.sink.errors
+        videos_per_hour = completed / elapsed * 3600 if elapsed > 0 else 0.0
+        print("\n\n=== Test Summary ===")
+        print(f"💾 Collected telemetry for {self.sink.videos} videos "
+              f"({completed} complete) in {elapsed:.1f}s with concurrency {self.concurrency}: "
+              f"{videos_per_hour:.1f} videos/hour. Results in {output_filename}")
+        print(f"🎯 Unique videos: {self.sampler.report()}")
+        return videos_per_hour
+
+# Main execution block
+if __name__ == "__main__":
+    try:
+        num_videos_to_process = int(input("How many random videos should I process? "))
+        concurrency = int(input("How many videos should play at the same time? "))
+        if num_videos_to_process <= 0 or concurrency <= 0:
+            print("Please enter positive numbers for both inputs.")
+            exit()
+    except ValueError:
+        print("Invalid input. Please enter valid integer numbers.")
+        exit()
+
+    collector = AsyncYouTubeCollector(concurrency=concurrency, headless=True, browser_type="chromium")
+    asyncio.run(collector.run(num_videos_to_process))
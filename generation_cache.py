@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import time
+
+class GenerationCache:
+    """
+    Persistent, content-addressed cache of model responses.
+
+    Each response is stored as <directory>/<key>.json, where the key is the
+    SHA-256 of the model name, the prompt template's version and the exact
+    inputs, so byte-identical requests hit and any change to the model,
+    template or inputs misses. A file's mtime is its last use; entries older
+    than max_age_s are dropped, and beyond max_entries or max_bytes the
+    least recently used go first. Files are written atomically (temp file +
+    rename), so concurrent runs can share the directory.
+    """
+
+    def __init__(self, directory: str = "generation_cache", max_entries: int = 500,
+                 max_bytes: int = 64 * 2 ** 20, max_age_s: float = 30 * 24 * 3600):
+        """
+        :param directory: Directory holding one JSON file per cached response.
+        :param max_entries: Responses kept at most.
+        :param max_bytes: Total size of the cache files kept at most.
+        :param max_age_s: Seconds since last use after which a response is dropped.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_s = max_age_s
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "seconds_saved": 0.0}
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(model: str, template_version, inputs: dict) -> str:
+        """Content address of a request: hash of model, template version and inputs."""
+        payload = json.dumps({"model": model, "template": template_version, "inputs": inputs},
+                             sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key):
+        """Return the cached response text for key, or None on a miss."""
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_s:
+                os.remove(path)
+                self.stats["evicted"] += 1
+                raise FileNotFoundError(path)
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+        os.utime(path)  # Mark as recently used
+        self.stats["hits"] += 1
+        self.stats["seconds_saved"] += entry.get("seconds", 0.0)
+        return entry["text"]
+
+    def put(self, key, text: str, model: str, seconds: float):
+        """
+        Store a response and evict what no longer fits.
+        :param seconds: How long the model took, credited as saved on every later hit.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"model": model, "created": time.time(), "seconds": round(seconds, 2), "text": text},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.stats["stored"] += 1
+        self._evict()
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        entries.sort(reverse=True)  # Most recently used first
+        now, kept, total = time.time(), 0, 0
+        for mtime, size, name in entries:
+            if now - mtime <= self.max_age_s and kept < self.max_entries and total + size <= self.max_bytes:
+                kept += 1
+                total += size
+                continue
+            try:
+                os.remove(os.path.join(self.directory, name))
+                self.stats["evicted"] += 1
+            except OSError:
+                pass
+
+    def report(self) -> dict:
+        """Hits, misses, evictions and model time saved in this process."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            **self.stats,
+            "seconds_saved": round(self.stats["seconds_saved"], 1),
+        }
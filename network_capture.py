@@ -0,0 +1,227 @@
+import bisect
+import json
+import time
+from urllib.parse import parse_qs, urlparse
+
+# URL path markers identifying media traffic, checked in order. Markers starting
+# with "." are file extensions and must end the path (".ts" would otherwise match
+# "/app.tsx" or "/x.tstats"); others may appear anywhere in it. Requests that match
+# none of them are ignored, so page scripts and images cost nothing.
+MEDIA_URL_CLASSES = (
+    ("/videoplayback", "youtube_media"),
+    (".m3u8", "hls_playlist"),
+    (".ts", "hls_segment"),
+    (".m4s", "dash_segment"),
+    (".mp4", "progressive_media"),
+)
+
+# Query parameters worth keeping from a media URL (format, range, sequence).
+_KEPT_PARAMS = ("itag", "mime", "range", "rn", "rbuf", "sq", "clen")
+
+def classify_url(url):
+    """Return the media class of url, or None for non-media requests."""
+    path = urlparse(url).path
+    for marker, url_class in MEDIA_URL_CLASSES:
+        if path.endswith(marker) if marker.startswith(".") else marker in path:
+            return url_class
+    return None
+
+def _url_fields(url):
+    parsed = urlparse(url)
+    params = parse_qs(parsed.query)
+    fields = {"host": parsed.hostname}
+    for name in _KEPT_PARAMS:
+        if name in params:
+            fields[name] = params[name][0]
+    return fields
+
+def _timed(handler):
+    """Count a capture handler's calls and time towards its overhead."""
+    def wrapper(self, event):
+        started = time.perf_counter()
+        try:
+            handler(self, event)
+        finally:
+            self._video_stats["events"] += 1
+            self._video_stats["handler_s"] += time.perf_counter() - started
+    return wrapper
+
+class NetworkCapture:
+    """
+    Records every media request of a page to an NDJSON file.
+
+    On Chromium it listens to the DevTools protocol's Network domain through
+    a CDP session, which reports protocol, on-the-wire byte counts and
+    browser-side timestamps without any extra round trips. Other engines
+    fall back to Playwright's response events (Content-Length bytes, no
+    protocol). Times are seconds since start(), derived from the browser's
+    own timestamps, so they do not depend on when Python got to process the
+    event; align() marks where the stats timeline starts so correlate() can
+    attribute media bytes to stats samples. Time spent in the event handlers
+    is measured and reported as overhead.
+    """
+
+    def __init__(self, output_path, classify=classify_url, buffer_size: int = 1 << 16):
+        """
+        :param output_path: NDJSON file receiving one line per media request.
+        :param classify: Function mapping a URL to its class, or None to ignore it.
+        :param buffer_size: Write buffer in bytes.
+        """
+        self.output_path = output_path
+        self.classify = classify
+        self._out = open(output_path, "a", encoding="utf-8", buffering=buffer_size)
+        self._page = None
+        self._cdp = None
+        self._pending = {}
+        self._finished = []  # (t_finished, bytes) of the current video, for correlation
+        self.active = False
+        self.totals = {"requests": 0, "bytes": 0, "events": 0, "handler_s": 0.0}
+
+    def start(self, page, video):
+        """
+        Begin capturing page's media requests for one video.
+        :param video: Identifier written with every record of this video.
+        """
+        self._page = page
+        self._video = video
+        self.active = True
+        self._pending.clear()
+        self._finished = []
+        self._video_stats = {"requests": 0, "bytes": 0, "events": 0, "handler_s": 0.0, "by_class": {}}
+        self._wall_start = time.time()
+        self._wall_offset = None  # browser monotonic clock -> wall clock, from the first event
+        self._timeline_offset = 0.0
+        try:
+            self._cdp = page.context.new_cdp_session(page)
+        except Exception:
+            self._cdp = None  # Not Chromium
+        self._video_stats["source"] = "cdp" if self._cdp else "playwright"
+        if self._cdp:
+            self._cdp.send("Network.enable")
+            self._cdp.on("Network.requestWillBeSent", self._on_request)
+            self._cdp.on("Network.responseReceived", self._on_response)
+            self._cdp.on("Network.loadingFinished", self._on_finished)
+        else:
+            page.on("response", self._on_playwright_response)
+
+    def _rel(self, browser_ts):
+        return round(browser_ts + self._wall_offset - self._wall_start, 4)
+
+    @_timed
+    def _on_request(self, event):
+        url_class = self.classify(event["request"]["url"])
+        if url_class is None:
+            return
+        if self._wall_offset is None:
+            self._wall_offset = event["wallTime"] - event["timestamp"]
+        self._pending[event["requestId"]] = {
+            "video": self._video,
+            "class": url_class,
+            **_url_fields(event["request"]["url"]),
+            "t_request": self._rel(event["timestamp"]),
+        }
+
+    @_timed
+    def _on_response(self, event):
+        record = self._pending.get(event["requestId"])
+        if record is None:
+            return
+        response = event["response"]
+        record["t_response"] = self._rel(event["timestamp"])
+        record["status"] = response.get("status")
+        record["protocol"] = response.get("protocol")
+        record["from_cache"] = response.get("fromDiskCache", False)
+
+    @_timed
+    def _on_finished(self, event):
+        record = self._pending.pop(event["requestId"], None)
+        if record is None:
+            return
+        record["t_finished"] = self._rel(event["timestamp"])
+        record["bytes"] = int(event.get("encodedDataLength", 0))
+        self._write(record)
+
+    @_timed
+    def _on_playwright_response(self, response):
+        url_class = self.classify(response.url)
+        if url_class is None:
+            return
+        timing = response.request.timing
+        start_s = timing["startTime"] / 1000  # epoch milliseconds
+        length = response.headers.get("content-length")
+        record = {
+            "video": self._video,
+            "class": url_class,
+            **_url_fields(response.url),
+            "t_request": round(start_s - self._wall_start, 4),
+            "t_response": round(start_s + timing["responseStart"] / 1000 - self._wall_start, 4)
+                          if timing["responseStart"] >= 0 else None,
+            "status": response.status,
+            "protocol": None,
+            "bytes": int(length) if length and length.isdigit() else 0,
+        }
+        record["t_finished"] = record["t_response"]
+        self._write(record)
+
+    def _write(self, record):
+        self._out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stats = self._video_stats
+        stats["requests"] += 1
+        stats["bytes"] += record["bytes"]
+        by_class = stats["by_class"].setdefault(record["class"], {"requests": 0, "bytes": 0})
+        by_class["requests"] += 1
+        by_class["bytes"] += record["bytes"]
+        if record["t_finished"] is not None:
+            self._finished.append((record["t_finished"], record["bytes"]))
+
+    def stop(self) -> dict:
+        """Stop capturing; returns this video's summary including handler overhead."""
+        if not self.active:
+            return None
+        self.active = False
+        if self._cdp:
+            try:
+                self._cdp.detach()
+            except Exception:
+                pass  # The page may already be gone
+            self._cdp = None
+        elif self._page is not None:
+            self._page.remove_listener("response", self._on_playwright_response)
+        self._out.flush()
+        stats = self._video_stats
+        elapsed = time.time() - self._wall_start
+        stats["handler_s"] = round(stats["handler_s"], 4)
+        stats["overhead_pct"] = round(100 * stats["handler_s"] / elapsed, 3) if elapsed > 0 else 0.0
+        stats["timeline_offset_s"] = round(self._timeline_offset, 4)
+        for key in ("requests", "bytes", "events", "handler_s"):
+            self.totals[key] += stats[key]
+        return stats
+
+    def align(self):
+        """Mark now as time 0 of the stats timeline (call right before sampling starts)."""
+        self._timeline_offset = time.time() - self._wall_start
+
+    def correlate(self, stats_collections, time_key: str = "timestamp_watched"):
+        """
+        Annotate each stats entry with the media bytes and requests that finished
+        since the previous entry (the first entry counts everything before it).
+        """
+        finished = sorted((t - self._timeline_offset, b) for t, b in self._finished)
+        times = [t for t, _ in finished]
+        previous = 0
+        for entry in stats_collections:
+            t = entry.get(time_key)
+            if t is None:
+                continue
+            upto = bisect.bisect_right(times, t)
+            entry["media_requests"] = upto - previous
+            entry["media_bytes"] = sum(b for _, b in finished[previous:upto])
+            previous = upto
+
+    def report(self) -> dict:
+        """Totals over every captured video."""
+        return {**self.totals, "handler_s": round(self.totals["handler_s"], 3)}
+
+    def close(self):
+        """Close the output file."""
+        self._out.close()
@@ -0,0 +1,448 @@
+import argparse
+import bisect
+import json
+import os
+import select
+import shutil
+import signal
+import socket
+import struct
+import subprocess
+import time
+from pathlib import Path
+
+TAGS_SUFFIX = ".tags"
+
+# pcap file magic -> (struct byte order, timestamp fraction units per second)
+_PCAP_MAGICS = {
+    b"\xd4\xc3\xb2\xa1": ("<", 1_000_000),
+    b"\xa1\xb2\xc3\xd4": (">", 1_000_000),
+    b"\x4d\x3c\xb2\xa1": ("<", 1_000_000_000),
+    b"\xa1\xb2\x3c\x4d": (">", 1_000_000_000),
+}
+_PCAP_GLOBAL_HEADER_SIZE = 24
+_PCAP_RECORD_HEADER_SIZE = 16
+
+# Link-layer types tcpdump writes, and where the IP header starts for each
+_LINKTYPE_NULL = 0          # BSD loopback: 4-byte address family
+_LINKTYPE_ETHERNET = 1      # Also Linux loopback ("lo")
+_LINKTYPE_RAW = 101
+_LINKTYPE_LINUX_SLL = 113   # "-i any" on older tcpdump
+_LINKTYPE_IPV4 = 228
+_LINKTYPE_IPV6 = 229
+_LINKTYPE_LINUX_SLL2 = 276  # "-i any" on tcpdump >= 4.99
+_ETHERTYPE_IPV4, _ETHERTYPE_IPV6, _ETHERTYPE_VLAN = 0x0800, 0x86DD, 0x8100
+
+class PcapReader:
+    """
+    Streams the packets of a classic pcap file (what `tcpdump -w` writes)
+    one record at a time, so captures of any size are read in constant
+    memory. Iterating yields (timestamp, record header, packet bytes); the
+    header is kept as raw bytes so packets can be copied out unchanged.
+    """
+
+    def __init__(self, path, buffer_size: int = 1 << 20):
+        self.path = str(path)
+        self._f = open(self.path, "rb", buffering=buffer_size)
+        self.global_header = self._f.read(_PCAP_GLOBAL_HEADER_SIZE)
+        magic = self.global_header[:4]
+        if magic not in _PCAP_MAGICS:
+            self._f.close()
+            raise ValueError(f"{self.path} is not a pcap file (pcapng is not supported; "
+                             f"convert it with `editcap -F pcap`)")
+        byteorder, self._units = _PCAP_MAGICS[magic]
+        self._record = struct.Struct(byteorder + "IIII")
+        self.linktype = struct.unpack(byteorder + "I", self.global_header[20:24])[0] & 0x0FFFFFFF
+        self.truncated = False
+
+    def __iter__(self):
+        read, unpack, units = self._f.read, self._record.unpack, self._units
+        while True:
+            header = read(_PCAP_RECORD_HEADER_SIZE)
+            if len(header) < _PCAP_RECORD_HEADER_SIZE:
+                self.truncated = bool(header)
+                return
+            seconds, fraction, captured, _ = unpack(header)
+            data = read(captured)
+            if len(data) < captured:
+                self.truncated = True  # The capturer was killed mid-write
+                return
+            yield seconds + fraction / units, header, data
+
+    def wire_length(self, header) -> int:
+        """Original length of a packet on the wire (independent of the snap length)."""
+        return self._record.unpack(header)[3]
+
+    def close(self):
+        self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _ip_offset(linktype, data):
+    """Return where the IP header starts in a packet of the given link type, or None."""
+    if linktype == _LINKTYPE_ETHERNET:
+        offset, ethertype = 14, int.from_bytes(data[12:14], "big")
+        if ethertype == _ETHERTYPE_VLAN:
+            offset, ethertype = 18, int.from_bytes(data[16:18], "big")
+        return offset if ethertype in (_ETHERTYPE_IPV4, _ETHERTYPE_IPV6) else None
+    if linktype == _LINKTYPE_LINUX_SLL:
+        return 16 if int.from_bytes(data[14:16], "big") in (_ETHERTYPE_IPV4, _ETHERTYPE_IPV6) else None
+    if linktype == _LINKTYPE_LINUX_SLL2:
+        return 20 if int.from_bytes(data[0:2], "big") in (_ETHERTYPE_IPV4, _ETHERTYPE_IPV6) else None
+    if linktype == _LINKTYPE_NULL:
+        return 4
+    if linktype in (_LINKTYPE_RAW, _LINKTYPE_IPV4, _LINKTYPE_IPV6):
+        return 0
+    return None
+
+def flow_key(linktype, data):
+    """
+    Return the direction-independent flow of a packet as
+    (protocol, (address, port), (address, port)) with the endpoints sorted,
+    or None for non-IP packets. Addresses are packed bytes; see format_flow.
+    """
+    o = _ip_offset(linktype, data)
+    if o is None or len(data) < o + 20:
+        return None
+    version = data[o] >> 4
+    if version == 4:
+        header_length = (data[o] & 0x0F) * 4
+        protocol, src, dst = data[o + 9], data[o + 12:o + 16], data[o + 16:o + 20]
+        transport = o + header_length
+    elif version == 6 and len(data) >= o + 40:
+        # Extension headers are rare for media traffic; their ports read as 0
+        protocol, src, dst = data[o + 6], data[o + 8:o + 24], data[o + 24:o + 40]
+        transport = o + 40
+    else:
+        return None
+    src_port = dst_port = 0
+    if protocol in (6, 17) and len(data) >= transport + 4:
+        src_port = int.from_bytes(data[transport:transport + 2], "big")
+        dst_port = int.from_bytes(data[transport + 2:transport + 4], "big")
+    a, b = (src, src_port), (dst, dst_port)
+    return (protocol, a, b) if a <= b else (protocol, b, a)
+
+def format_flow(flow) -> str:
+    """Readable form of a flow_key, e.g. 'tcp 10.0.0.2:51514 <-> 142.250.1.1:443'."""
+    protocol, *endpoints = flow
+    name = {6: "tcp", 17: "udp"}.get(protocol, str(protocol))
+    parts = []
+    for address, port in endpoints:
+        text = socket.inet_ntop(socket.AF_INET if len(address) == 4 else socket.AF_INET6, address)
+        parts.append(f"[{text}]:{port}" if len(address) == 16 else f"{text}:{port}")
+    return f"{name} {parts[0]} <-> {parts[1]}"
+
+def load_windows(tags_path) -> dict:
+    """
+    Read a tags file into {pcap file name: [(start, end, video)]} sorted by start.
+    A video started but never ended (the run was interrupted) has no record
+    in the output and is left out.
+    """
+    windows, open_tags = {}, {}
+    with open(tags_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                tag = json.loads(line)
+            except ValueError:
+                break  # Cut short by a crash
+            key = (tag["pcap"], tag["video"])
+            if tag["event"] == "start":
+                open_tags[key] = tag["t"]
+            elif key in open_tags:
+                windows.setdefault(tag["pcap"], []).append((open_tags.pop(key), tag["t"], tag["video"]))
+    for pcap_windows in windows.values():
+        pcap_windows.sort()
+    return windows
+
+def slice_pcap(pcap_path, windows, output_dir, min_flow_bytes: int = 50_000, flow_filter=None) -> dict:
+    """
+    Split a capture into one pcap per video, keeping only that video's flows.
+
+    Both passes stream the capture: the first totals the bytes each flow
+    carried inside each video's window (memory grows with the number of
+    flows, not packets), the second copies the packets of the flows that
+    qualified. A flow qualifies for a video when it carried at least
+    min_flow_bytes on the wire during its window and flow_filter(flow), if
+    given, is true; this keeps the media connections and drops DNS, telemetry
+    beacons and other background chatter.
+    :param windows: [(start, end, video)] in epoch seconds, sorted by start and not overlapping.
+    :return: {video: {"path", "packets", "bytes", "flows", "dropped_flows"}}
+    """
+    starts = [start for start, _, _ in windows]
+
+    def window_of(ts):
+        i = bisect.bisect_right(starts, ts) - 1
+        return windows[i][2] if i >= 0 and ts <= windows[i][1] else None
+
+    flow_bytes = {}  # (video, flow) -> bytes on the wire
+    with PcapReader(pcap_path) as reader:
+        for ts, header, data in reader:
+            video = window_of(ts)
+            if video is None:
+                continue
+            flow = flow_key(reader.linktype, data)
+            if flow is not None:
+                key = (video, flow)
+                flow_bytes[key] = flow_bytes.get(key, 0) + reader.wire_length(header)
+
+    summary = {video: {"path": None, "packets": 0, "bytes": 0, "flows": [], "dropped_flows": 0}
+               for _, _, video in windows}
+    keep = set()
+    for (video, flow), total in flow_bytes.items():
+        if total >= min_flow_bytes and (flow_filter is None or flow_filter(flow)):
+            keep.add((video, flow))
+            summary[video]["flows"].append(format_flow(flow))
+        else:
+            summary[video]["dropped_flows"] += 1
+    del flow_bytes
+
+    os.makedirs(output_dir, exist_ok=True)
+    stem = Path(pcap_path).stem
+    writers = {}
+    try:
+        with PcapReader(pcap_path) as reader:
+            for ts, header, data in reader:
+                video = window_of(ts)
+                if video is None or (video, flow_key(reader.linktype, data)) not in keep:
+                    continue
+                out = writers.get(video)
+                if out is None:
+                    path = os.path.join(output_dir, f"{stem}_video{video}.pcap")
+                    out = writers[video] = open(path, "wb", buffering=1 << 20)
+                    out.write(reader.global_header)
+                    summary[video]["path"] = path
+                out.write(header)
+                out.write(data)
+                summary[video]["packets"] += 1
+                summary[video]["bytes"] += reader.wire_length(header)
+    finally:
+        for out in writers.values():
+            out.close()
+    return summary
+
+def slice_run(tags_path, output_dir=None, min_flow_bytes: int = 50_000, flow_filter=None) -> dict:
+    """
+    Slice every capture referenced by a tags file into per-video pcaps.
+    :param output_dir: Directory for the slices (default: "<tags file stem>_slices" next to it).
+    :return: {video: summary} as returned by slice_pcap, over all captures.
+    """
+    tags_path = Path(tags_path)
+    if output_dir is None:
+        output_dir = tags_path.with_name(tags_path.name.split(".")[0] + "_slices")
+    summary = {}
+    for pcap_name, windows in load_windows(tags_path).items():
+        pcap_path = tags_path.parent / pcap_name
+        if pcap_path.exists():
+            summary.update(slice_pcap(pcap_path, windows, output_dir, min_flow_bytes, flow_filter))
+    return summary
+
+class PacketCapture:
+    """
+    Runs tcpdump as a managed subprocess for the length of a collection run.
+
+    The capture is written to output_path as it happens (tcpdump -U), headers
+    only by default (snaplen), while original packet lengths are kept so byte
+    counts stay exact. begin()/end() append the wall-clock start and end of
+    each video to a tags file next to the capture; pcap timestamps are on the
+    same clock, so slice() (or slice_run on the tags file, e.g. after a
+    crash) can cut the capture into per-video files afterwards. Starting
+    again with an existing output_path writes to the next free
+    "<name>.<n>.pcap"; the tags file is started afresh unless append is set
+    (a resumed run), and a restart of the same capture keeps appending to it.
+    """
+
+    def __init__(self, output_path="capture.pcap", interface: str = "any",
+                 bpf_filter: str = "tcp port 443 or udp port 443", snaplen: int = 128,
+                 tcpdump: str = "tcpdump", append: bool = False):
+        """
+        :param output_path: pcap file receiving the capture.
+        :param interface: Interface to capture on ("any", "eth0", "lo", ...).
+        :param bpf_filter: Capture filter; the default keeps HTTPS and QUIC traffic.
+        :param snaplen: Bytes kept per packet (headers only by default); 0 keeps whole packets.
+        :param tcpdump: tcpdump executable.
+        :param append: Add to an existing tags file (a resumed run) instead of truncating it.
+        """
+        self.output_path = str(output_path)
+        self.tags_path = self.output_path + TAGS_SUFFIX
+        self.interface = interface
+        self.bpf_filter = bpf_filter
+        self.snaplen = snaplen
+        self.tcpdump = tcpdump
+        self.pcap_path = None
+        self._proc = None
+        self._tags = None
+        self._open_video = None
+        self._append = append
+        self.stats = None
+
+    def start(self, timeout: float = 10.0):
+        """Start tcpdump and wait until it is capturing."""
+        executable = shutil.which(self.tcpdump)
+        if executable is None:
+            raise RuntimeError(f"'{self.tcpdump}' not found; install tcpdump or disable packet capture")
+        self.pcap_path = self.output_path
+        root, ext = os.path.splitext(self.output_path)
+        n = 1
+        while os.path.exists(self.pcap_path):
+            self.pcap_path = f"{root}.{n}{ext or '.pcap'}"
+            n += 1
+        command = [executable, "-i", self.interface, "-w", self.pcap_path, "-U", "-n",
+                   "-s", str(self.snaplen)]
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            command += ["-Z", "root"]  # Keep write access to the output directory
+        if self.bpf_filter:
+            command.append(self.bpf_filter)
+        self._proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        # tcpdump reports "listening on <interface>" once packets are being captured. stderr is
+        # polled with select so a tcpdump that prints nothing cannot block past the deadline.
+        deadline = time.monotonic() + timeout
+        stderr, output = self._proc.stderr.fileno(), b""
+        while b"listening on" not in output:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.stop()
+                raise RuntimeError(f"tcpdump did not start capturing on '{self.interface}' within {timeout}s")
+            if not select.select([stderr], [], [], remaining)[0]:
+                continue
+            chunk = os.read(stderr, 4096)
+            if not chunk:
+                self._proc.wait()
+                self._proc = None
+                raise RuntimeError(f"tcpdump exited on start: {output.decode(errors='replace').strip()}")
+            output += chunk
+        self._tags = open(self.tags_path, "a" if self._append else "w", encoding="utf-8")
+        self._append = True  # A restart continues this run's tags
+
+    def _tag(self, video, event):
+        # The capture sits next to the tags file, so its name alone locates it
+        self._tags.write(json.dumps({"video": video, "event": event, "t": time.time(),
+                                     "pcap": os.path.basename(self.pcap_path)}) + "\n")
+        self._tags.flush()
+
+    def begin(self, video):
+        """Tag the start of a video's window."""
+        if self._proc is None:
+            return
+        self._tag(video, "start")
+        self._open_video = video
+
+    def end(self):
+        """Tag the end of the open video's window (no-op if none is open)."""
+        if self._proc is None or self._open_video is None:
+            return
+        self._tag(self._open_video, "end")
+        self._open_video = None
+
+    def stop(self, timeout: float = 10.0) -> dict:
+        """
+        Stop tcpdump, letting it flush the capture; returns its packet counts
+        (also kept in `stats`), or None if it was not running.
+        """
+        if self._proc is None:
+            return None
+        self.end()
+        proc, self._proc = self._proc, None
+        proc.send_signal(signal.SIGINT)
+        try:
+            _, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            _, stderr = proc.communicate()
+        if self._tags:
+            self._tags.close()
+            self._tags = None
+        stats = {"pcap": self.pcap_path, "captured": None, "dropped_by_kernel": None}
+        for line in stderr.splitlines():
+            count = line.split(" ", 1)[0]
+            if count.isdigit():
+                if "captured" in line:
+                    stats["captured"] = int(count)
+                elif "dropped by kernel" in line:
+                    stats["dropped_by_kernel"] = int(count)
+        self.stats = stats
+        return stats
+
+    def slice(self, output_dir=None, min_flow_bytes: int = 50_000, flow_filter=None) -> dict:
+        """Split the run's captures into per-video pcaps; see slice_run."""
+        return slice_run(self.tags_path, output_dir, min_flow_bytes, flow_filter)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def loopback_check(output_dir="loopback_check", videos: int = 2, interface: str = "lo"):
+    """
+    End-to-end check of capture and slicing without a browser: serves a
+    payload over HTTP on 127.0.0.1, captures loopback while fetching it once
+    per pretend video, then slices and verifies every video got exactly its
+    own connection. Needs tcpdump and capture permission on loopback.
+    """
+    import threading
+    import urllib.request
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    payload = os.urandom(256 * 1024)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port = server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.makedirs(output_dir, exist_ok=True)
+    capture = PacketCapture(os.path.join(output_dir, "loopback.pcap"), interface=interface,
+                            bpf_filter=f"tcp port {port}", snaplen=0)
+    try:
+        with capture:
+            for video in range(videos):
+                capture.begin(video)
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/video{video}").read()
+                capture.end()
+                time.sleep(0.2)  # Let the connection close inside the window
+    finally:
+        server.shutdown()
+    summary = capture.slice(os.path.join(output_dir, "slices"))
+    for video, result in sorted(summary.items()):
+        ok = len(result["flows"]) == 1 and result["bytes"] >= len(payload)
+        print(f"{'✅' if ok else '❌'} video {video}: {result['packets']} packets, {result['bytes']} bytes, "
+              f"flows {result['flows']} -> {result['path']}")
+    return summary
+
+def main():
+    """Command-line entry point: slice a run's captures, or run the loopback check."""
+    parser = argparse.ArgumentParser(description="Per-video packet capture slicing.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    slicer = commands.add_parser("slice", help="Split the captures of a tags file into per-video pcaps.")
+    slicer.add_argument("tags")
+    slicer.add_argument("--output-dir")
+    slicer.add_argument("--min-flow-bytes", type=int, default=50_000)
+    check = commands.add_parser("loopback-check", help="Capture and slice local HTTP fetches on loopback.")
+    check.add_argument("--output-dir", default="loopback_check")
+    check.add_argument("--interface", default="lo")
+    args = parser.parse_args()
+
+    if args.command == "loopback-check":
+        loopback_check(args.output_dir, interface=args.interface)
+        return
+    summary = slice_run(args.tags, args.output_dir, args.min_flow_bytes)
+    for video, result in summary.items():
+        print(f"video {video}: {result['packets']} packets, {result['bytes'] / 2 ** 20:.1f} MB in "
+              f"{len(result['flows'])} flows ({result['dropped_flows']} dropped) -> {result['path']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+# Capture functions run inside the page on every tick. Each one is a JS
+# function expression taking no arguments and returning a JSON-serialisable
+# value (or null when nothing is available yet).
+
+# Text of YouTube's Stats for Nerds panel, same as the panel's inner_text().
+YOUTUBE_PANEL_JS = """() => {
+    const panel = document.querySelector('.html5-video-info-panel');
+    if (!panel || panel.getClientRects().length === 0) return null;
+    return panel.innerText;
+}"""
+
+# The player's own stats object plus the standard <video> element counters.
+# Works without the panel being open and updates faster than the panel text.
+YOUTUBE_PLAYER_JS = """() => {
+    const player = document.getElementById('movie_player');
+    const video = document.querySelector('video');
+    if (!player || !video) return null;
+    const quality = video.getVideoPlaybackQuality ? video.getVideoPlaybackQuality() : null;
+    const buffered = video.buffered.length ? video.buffered.end(video.buffered.length - 1) : null;
+    return {
+        stats_for_nerds: player.getStatsForNerds ? player.getStatsForNerds() : null,
+        current_time: video.currentTime,
+        paused: video.paused,
+        buffered_end: buffered,
+        dropped_frames: quality ? quality.droppedVideoFrames : null,
+        total_frames: quality ? quality.totalVideoFrames : null,
+    };
+}"""
+
+# Every row of Twitch's video stats overlay as {label: value}, in one pass.
+TWITCH_STATS_TABLE_JS = """() => {
+    const rows = document.querySelectorAll(
+        "tbody.tw-table-body tr[data-a-target='player-overlay-video-stats-row']");
+    if (!rows.length) return null;
+    const sample = {};
+    for (const row of rows) {
+        const cells = row.querySelectorAll('td');
+        if (cells.length < 2) continue;
+        const label = (cells[0].querySelector('p') || cells[0]).innerText.trim();
+        sample[label] = (cells[1].querySelector('p') || cells[1]).innerText.trim();
+    }
+    return sample;
+}"""
+
+# Ticks are chained setTimeout calls aimed at fixed deadlines (k * interval),
+# so a slow capture or a throttled timer makes one sample late instead of
+# pushing every later sample back the way setInterval does. Deadlines that
+# are already a full interval overdue are skipped and counted.
+_INSTALL_JS = """([key, intervalMs, maxBuffer]) => {
+    const capture = %s;
+    const previous = window[key];
+    if (previous) clearTimeout(previous.timer);
+    const state = { buffer: [], dropped: 0, skipped: 0, next: 0, started: performance.now(), timer: null };
+    const tick = () => {
+        const scheduled = state.next * intervalMs;
+        const actual = performance.now() - state.started;
+        let value = null;
+        try { value = capture(); } catch (e) { value = null; }
+        if (state.buffer.length >= maxBuffer) { state.buffer.shift(); state.dropped += 1; }
+        state.buffer.push({ t: actual / 1000, scheduled: scheduled / 1000, value: value });
+        state.next += 1;
+        const behind = Math.floor((performance.now() - state.started) / intervalMs) - state.next;
+        if (behind > 0) { state.next += behind; state.skipped += behind; }
+        const delay = state.started + state.next * intervalMs - performance.now();
+        state.timer = setTimeout(tick, Math.max(0, delay));
+    };
+    window[key] = state;
+    tick();
+}"""
+
+_DRAIN_JS = """(key) => {
+    const state = window[key];
+    if (!state) return null;
+    const samples = state.buffer;
+    const dropped = state.dropped;
+    const skipped = state.skipped;
+    state.buffer = [];
+    state.dropped = 0;
+    state.skipped = 0;
+    return { samples: samples, dropped: dropped, skipped: skipped };
+}"""
+
+_STOP_JS = """(key) => {
+    const state = window[key];
+    if (state) clearTimeout(state.timer);
+    delete window[key];
+}"""
+
+def install_script(capture_js):
+    """Return the page-side install function for a capture expression."""
+    return _INSTALL_JS % capture_js
+
+class PageSampler:
+    """
+    Samples a page (or frame) from a timer running inside the browser.
+
+    The capture function runs every 1/rate_hz seconds in the page and pushes
+    {"t": seconds since start, "scheduled": its deadline, "value": ...} into
+    an in-page ring buffer; drain() fetches and clears the buffer in a single
+    round trip, so the IPC cost is per batch rather than per sample and
+    sample spacing does not depend on Python-side sleeps.
+    """
+
+    def __init__(self, target, capture_js, rate_hz: float = 10.0, max_buffer: int = 10000,
+                 key: str = "__telemetrySampler"):
+        """
+        :param target: Playwright Page or Frame to sample.
+        :param capture_js: JS function expression returning one sample.
+        :param rate_hz: Requested samples per second.
+        :param max_buffer: Oldest samples are dropped beyond this many undrained samples.
+        :param key: window property holding the sampler state.
+        """
+        self.target = target
+        self.capture_js = capture_js
+        self.rate_hz = rate_hz
+        self.max_buffer = max_buffer
+        self.key = key
+        self.collected = 0
+        self.dropped = 0
+        self.drains = 0
+        self.skipped = 0
+        self._prev_t = None  # Last sample time of the current install; None until its first sample
+        self._intervals = 0  # Sample intervals and the seconds they span, summed over installs
+        self._span_s = 0.0
+        self._lateness_total = 0.0
+        self._lateness_max = 0.0
+
+    def start(self):
+        """Install (or reinstall) the in-page timer."""
+        self._prev_t = None  # The new timer counts from its own start
+        self.target.evaluate(install_script(self.capture_js),
+                             [self.key, 1000.0 / self.rate_hz, self.max_buffer])
+
+    def drain(self) -> list:
+        """Return every sample captured since the last drain (one IPC call)."""
+        return self._record(self.target.evaluate(_DRAIN_JS, self.key))
+
+    def _record(self, batch) -> list:
+        """Update counters from one drained batch and return its samples."""
+        self.drains += 1
+        if batch is None:
+            # The page navigated or reloaded and lost the timer.
+            return []
+        samples = batch["samples"]
+        self.collected += len(samples)
+        self.dropped += batch["dropped"]
+        self.skipped += batch.get("skipped", 0)
+        for sample in samples:
+            lateness = sample["t"] - sample.get("scheduled", sample["t"])
+            self._lateness_total += lateness
+            self._lateness_max = max(self._lateness_max, lateness)
+            # A time going backwards is a timer reinstalled by the page itself
+            if self._prev_t is not None and sample["t"] >= self._prev_t:
+                self._intervals += 1
+                self._span_s += sample["t"] - self._prev_t
+            self._prev_t = sample["t"]
+        return samples
+
+    def stop(self) -> list:
+        """Drain what is left and remove the timer from the page."""
+        samples = self.drain()
+        self.target.evaluate(_STOP_JS, self.key)
+        return samples
+
+    def report(self) -> dict:
+        """Requested vs achieved sample rate and buffer statistics."""
+        # Per install, n samples span n - 1 intervals; the gap between installs is not counted.
+        achieved = self._intervals / self._span_s if self._span_s else 0.0
+        return {
+            "requested_hz": self.rate_hz,
+            "achieved_hz": round(achieved, 3),
+            "samples": self.collected,
+            "dropped": self.dropped,
+            "skipped": self.skipped,
+            "mean_lateness_s": round(self._lateness_total / self.collected, 4) if self.collected else None,
+            "max_lateness_s": round(self._lateness_max, 4),
+            "drains": self.drains,
+        }
+
+class AsyncPageSampler(PageSampler):
+    """PageSampler for playwright.async_api pages and frames."""
+
+    async def start(self):
+        """Install (or reinstall) the in-page timer."""
+        self._prev_t = None  # The new timer counts from its own start
+        await self.target.evaluate(install_script(self.capture_js),
+                                   [self.key, 1000.0 / self.rate_hz, self.max_buffer])
+
+    async def drain(self) -> list:
+        """Return every sample captured since the last drain (one IPC call)."""
+        return self._record(await self.target.evaluate(_DRAIN_JS, self.key))
+
+    async def stop(self) -> list:
+        """Drain what is left and remove the timer from the page."""
+        samples = await self.drain()
+        await self.target.evaluate(_STOP_JS, self.key)
+        return samples
@@ -0,0 +1,252 @@
+import argparse
+import ast
+import keyword
+import re
+
+# Receivers rooted at these names are Playwright pages/frames, whose locators are lazy
+_PAGE_NAME = re.compile(r"(page|frame)$")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of source text: identifiers, numbers and punctuation marks."""
+    return len(_TOKEN.findall(text))
+
+def _dump(node):
+    return ast.dump(node, annotate_fields=False)
+
+def _root_name(node):
+    while isinstance(node, (ast.Call, ast.Attribute, ast.Subscript)):
+        node = node.func if isinstance(node, ast.Call) else node.value
+    return node.id if isinstance(node, ast.Name) else None
+
+def _receivers(stmt):
+    """Locator sub-chains of an action statement such as page.locator("x").first.click()."""
+    if not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call)
+            and isinstance(stmt.value.func, ast.Attribute)):
+        return
+    root = _root_name(stmt.value)
+    if root is None or not _PAGE_NAME.search(root):
+        return
+    node = stmt.value.func.value
+    while isinstance(node, (ast.Call, ast.Attribute)):
+        # A bare bound method (page.locator) is not worth naming; calls and their properties are
+        if isinstance(node, ast.Call) or isinstance(node.value, ast.Call):
+            yield node
+        node = node.func if isinstance(node, ast.Call) else node.value
+
+def _variable_name(node, used):
+    """Readable, unused variable name for a locator expression."""
+    attribute = None
+    if isinstance(node, ast.Attribute):
+        attribute, node = node.attr, node.value
+    words = []
+    if isinstance(node, ast.Call):
+        args = [a.value for a in node.args if isinstance(a, ast.Constant) and isinstance(a.value, str)]
+        kwargs = [k.value.value for k in node.keywords
+                  if isinstance(k.value, ast.Constant) and isinstance(k.value.value, str)]
+        words = kwargs[:1] + args[:1] if kwargs else args[:1]
+    if attribute and attribute != "first":
+        words.append(attribute.replace("content_", ""))
+    slug = re.sub(r"\W+", "_", " ".join(words).lower(), flags=re.ASCII).strip("_")
+    slug = "_".join(slug.split("_")[:4]) or "locator"
+    if slug[0].isdigit():
+        slug = "el_" + slug
+    return _unused(slug, used)
+
+def _unused(base, used):
+    name, n = base, 2
+    while name in used or keyword.iskeyword(name):
+        name, n = f"{base}_{n}", n + 1
+    used.add(name)
+    return name
+
+class _Replace(ast.NodeTransformer):
+    def __init__(self, target, name):
+        self.target, self.name = target, name
+
+    def generic_visit(self, node):
+        if isinstance(node, ast.expr) and _dump(node) == self.target:
+            return ast.Name(id=self.name, ctx=ast.Load())
+        return super().generic_visit(node)
+
+def _rebound_names(stmts):
+    """Names a block may bind to different objects: all it stores except plain single assignments."""
+    stores = {}
+    for stmt in stmts:
+        for node in ast.walk(stmt):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                stores[node.id] = stores.get(node.id, 0) + 1
+    once = {t.id for s in stmts if isinstance(s, ast.Assign) for t in s.targets if isinstance(t, ast.Name)}
+    return {name for name, count in stores.items() if count > 1 or name not in once}
+
+def _hoist_locators(stmts, used, stats):
+    """Name locator chains that a block re-creates, and use the name instead."""
+    rebound = _rebound_names(stmts)
+    while True:
+        counts, examples = {}, {}
+        for stmt in stmts:
+            seen = set()
+            for receiver in _receivers(stmt):
+                key = _dump(receiver)
+                loaded = {n.id for n in ast.walk(receiver) if isinstance(n, ast.Name)}
+                # Only expressions whose inputs never change inside the block are safe to share
+                if key in seen or loaded & rebound:
+                    continue
+                seen.add(key)
+                counts[key] = counts.get(key, 0) + 1
+                examples[key] = receiver
+        # Name the chain that saves the most characters first; shorter chains it contains are recounted
+        savings = [((count - 1) * len(ast.unparse(examples[key])), key)
+                   for key, count in counts.items() if count >= 2]
+        if not savings:
+            return stmts
+        key = max(savings)[1]
+        name = _variable_name(examples[key], used)
+        first = next(i for i, stmt in enumerate(stmts) if any(_dump(r) == key for r in _receivers(stmt)))
+        replace = _Replace(key, name)
+        assignment = ast.Assign(targets=[ast.Name(id=name, ctx=ast.Store())], value=examples[key], lineno=0)
+        stmts = stmts[:first] + [assignment] + [replace.visit(s) for s in stmts[first:]]
+        stats["locators_hoisted"] += counts[key]
+
+def _collapse_repeats(stmts, min_repeat, stats, max_period=4):
+    """Turn runs of identical statements (or short identical sequences) into for-loops."""
+    dumps = [_dump(s) for s in stmts]
+    out, i = [], 0
+    while i < len(stmts):
+        best = None  # (statements saved, period, repeats)
+        for period in range(1, max_period + 1):
+            repeats = 1
+            while dumps[i + repeats * period:i + (repeats + 1) * period] == dumps[i:i + period]:
+                repeats += 1
+            if repeats >= (min_repeat if period == 1 else 2):
+                saved = (repeats - 1) * period - 1
+                if saved > 0 and (best is None or saved > best[0]):
+                    best = (saved, period, repeats)
+        if best is None:
+            out.append(stmts[i])
+            i += 1
+            continue
+        _, period, repeats = best
+        out.append(ast.For(target=ast.Name(id="_", ctx=ast.Store()),
+                           iter=ast.Call(func=ast.Name(id="range", ctx=ast.Load()),
+                                         args=[ast.Constant(repeats)], keywords=[]),
+                           body=stmts[i:i + period], orelse=[], lineno=0))
+        stats["statements_collapsed"] += repeats * period
+        i += repeats * period
+    return out
+
+def _constants(stmt):
+    return [n for n in ast.walk(stmt) if isinstance(n, ast.Constant) and isinstance(n.value, str)]
+
+def _masked(stmt):
+    return re.sub(r"Constant\('(?:[^'\\]|\\.)*'\)|Constant\(\"(?:[^\"\\]|\\.)*\"\)", "Constant(?)", _dump(stmt))
+
+def _collapse_variants(stmts, min_repeat, used, stats):
+    """
+    Turn runs of statements that differ only in one string literal, e.g. clicks on a
+    series of named elements, into a for-loop over the literals.
+    """
+    out, i = [], 0
+    while i < len(stmts):
+        stmt = stmts[i]
+        if not isinstance(stmt, ast.Expr):
+            out.append(stmt)
+            i += 1
+            continue
+        masked, values = _masked(stmt), [c.value for c in _constants(stmt)]
+        j, position = i + 1, None
+        while j < len(stmts) and isinstance(stmts[j], ast.Expr) and _masked(stmts[j]) == masked:
+            other = [c.value for c in _constants(stmts[j])]
+            differing = [k for k, (a, b) in enumerate(zip(values, other)) if a != b]
+            if len(differing) != 1 or (position is not None and differing[0] != position):
+                break
+            position = differing[0]
+            j += 1
+        if position is None or j - i < min_repeat:
+            out.append(stmt)
+            i += 1
+            continue
+        literals = [_constants(s)[position].value for s in stmts[i:j]]
+        # Name the loop variable after the keyword the literal is passed as, if any
+        keyword_name = next((k.arg for k in ast.walk(stmt) if isinstance(k, ast.keyword)
+                             and k.value is _constants(stmt)[position]), None)
+        name = _unused(keyword_name or "value", used)
+        body = ast.parse(ast.unparse(stmt)).body[0]
+        target = _constants(body)[position]
+        for node in ast.walk(body):
+            for field, value in ast.iter_fields(node):
+                if value is target:
+                    setattr(node, field, ast.Name(id=name, ctx=ast.Load()))
+                elif isinstance(value, list):
+                    setattr(node, field, [ast.Name(id=name, ctx=ast.Load()) if v is target else v for v in value])
+        out.append(ast.For(target=ast.Name(id=name, ctx=ast.Store()),
+                           iter=ast.List(elts=[ast.Constant(v) for v in literals], ctx=ast.Load()),
+                           body=[body], orelse=[], lineno=0))
+        stats["statements_collapsed"] += j - i
+        i = j
+    return out
+
+def _compact_block(stmts, min_repeat, used, stats):
+    for stmt in stmts:
+        for field in ("body", "orelse", "finalbody"):
+            block = getattr(stmt, field, None)
+            if isinstance(block, list) and block and isinstance(block[0], ast.stmt):
+                setattr(stmt, field, _compact_block(block, min_repeat, used, stats))
+        for handler in getattr(stmt, "handlers", []):
+            handler.body = _compact_block(handler.body, min_repeat, used, stats)
+    stmts = _hoist_locators(stmts, used, stats)
+    stmts = _collapse_repeats(stmts, min_repeat, stats)
+    return _collapse_variants(stmts, min_repeat, used, stats)
+
+def compact_recording(source: str, min_repeat: int = 3):
+    """
+    Shrink a Playwright codegen recording before it is pasted into a prompt.
+
+    Locator chains a block re-creates (page.locator("#movie_player") on
+    every key press) are assigned to a variable once; runs of min_repeat or
+    more identical statements, or of short identical sequences, become
+    `for _ in range(n)` loops; and runs of statements differing only in one
+    string literal become a loop over the literals. Locators are lazy, so
+    the result does the same thing. Comments are not kept. Returns
+    (compacted source, report); source that does not parse, or any source
+    on Python 3.8 (which has no ast.unparse), is returned unchanged.
+    """
+    stats = {"locators_hoisted": 0, "statements_collapsed": 0}
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        tree = None
+    if tree is None or not hasattr(ast, "unparse"):
+        compacted = source
+    else:
+        used = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+        tree.body = _compact_block(tree.body, min_repeat, used, stats)
+        compacted = ast.unparse(ast.fix_missing_locations(tree)) + "\n"
+        if estimate_tokens(compacted) >= estimate_tokens(source):
+            compacted = source
+    before, after = estimate_tokens(source), estimate_tokens(compacted)
+    report = {
+        **stats,
+        "lines_before": source.count("\n"),
+        "lines_after": compacted.count("\n"),
+        "tokens_before": before,
+        "tokens_after": after,
+        "tokens_saved_pct": round(100 * (before - after) / before, 1) if before else 0.0,
+    }
+    return compacted, report
+
+def main():
+    """Command-line entry point: print a compacted recording and its token savings."""
+    parser = argparse.ArgumentParser(description="Compact a Playwright codegen recording for prompting.")
+    parser.add_argument("recording")
+    parser.add_argument("--min-repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with open(args.recording, "r", encoding="utf-8") as f:
+        compacted, report = compact_recording(f.read(), args.min_repeat)
+    print(compacted)
+    print(f"# {report['lines_before']} -> {report['lines_after']} lines, ~{report['tokens_before']} -> "
+          f"~{report['tokens_after']} tokens ({report['tokens_saved_pct']}% saved)")
+
+if __name__ == "__main__":
+    main()
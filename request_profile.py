@@ -0,0 +1,148 @@
+import time
+import weakref
+from contextlib import contextmanager
+
+# 1x1 transparent GIF used to stub images so layouts and onload handlers still fire.
+_BLANK_GIF = (b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\x00\x00\x00!\xf9\x04\x01\x00"
+              b"\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;")
+
+# Playwright resource types and what to do with them on the search step:
+# "stub" answers locally with an empty placeholder, "abort" fails the request.
+DEFAULT_RESOURCE_ACTIONS = {
+    "image": "stub",
+    "font": "abort",
+    "media": "abort",
+}
+
+# Ad and analytics endpoints, matched as URL substrings. Beacons are stubbed
+# with 204 so page scripts see success and do not retry.
+DEFAULT_BLOCKED_URL_PATTERNS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googleadservices.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "youtube.com/pagead/",
+    "youtube.com/ptracking",
+    "youtube.com/api/stats/",
+    "youtube.com/generate_204",
+)
+
+class InterceptionProfile:
+    """
+    Playwright routing profile that trims page-load cost on the search step.
+
+    On "search" navigations, requests for unneeded resource classes and
+    ad/analytics hosts are stubbed or aborted. On "watch" navigations the
+    route is removed entirely, so video segments never pass through Python
+    and the collected network metrics are unaffected. Every navigation is
+    measured (bytes received, wall time); every baseline_every-th search runs
+    unblocked to give the baseline that bytes/time saved are computed from.
+    Received bytes are the encoded body sizes of finished responses, so
+    chunked and compressed responses count what went over the wire, and
+    responses stubbed here are not counted.
+    """
+
+    def __init__(self, resource_actions: dict = None, blocked_url_patterns=DEFAULT_BLOCKED_URL_PATTERNS,
+                 baseline_every: int = 10):
+        """
+        :param resource_actions: {resource_type: "stub" | "abort"} applied on the search step.
+        :param blocked_url_patterns: URL substrings stubbed with 204 on the search step.
+        :param baseline_every: Run every n-th search without blocking to measure savings (0 disables).
+        """
+        self.resource_actions = DEFAULT_RESOURCE_ACTIONS if resource_actions is None else resource_actions
+        self.blocked_url_patterns = tuple(blocked_url_patterns)
+        self.baseline_every = baseline_every
+        self.navigations = []
+        self._routed_pages = weakref.WeakSet()
+        self._search_count = 0
+        self._blocked = 0
+        self._stubbed = set()  # Requests answered by _handle_route during the current measure()
+
+    def _handle_route(self, route):
+        request = route.request
+        url = request.url
+        if any(pattern in url for pattern in self.blocked_url_patterns):
+            self._blocked += 1
+            self._stubbed.add(request)
+            route.fulfill(status=204, body="")
+            return
+        action = self.resource_actions.get(request.resource_type)
+        if action == "stub":
+            self._blocked += 1
+            self._stubbed.add(request)
+            route.fulfill(status=200, content_type="image/gif", body=_BLANK_GIF)
+        elif action == "abort":
+            self._blocked += 1
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    def _set_routing(self, page, enabled):
+        """Install or remove the route on page, without re-registering it."""
+        if enabled and page not in self._routed_pages:
+            page.route("**/*", self._handle_route)
+            self._routed_pages.add(page)
+        elif not enabled and page in self._routed_pages:
+            page.unroute("**/*", self._handle_route)
+            self._routed_pages.discard(page)
+
+    @contextmanager
+    def measure(self, page, phase: str, url: str):
+        """
+        Measure one navigation; blocking applies only when phase is "search".
+        Yields the navigation record, which is filled in when the block exits.
+        """
+        baseline = False
+        if phase == "search":
+            self._search_count += 1
+            baseline = bool(self.baseline_every) and (self._search_count - 1) % self.baseline_every == 0
+        self._set_routing(page, phase == "search" and not baseline)
+
+        record = {"phase": phase, "url": url, "baseline": baseline}
+        received = {"bytes": 0, "responses": 0}
+
+        def on_finished(request):
+            if request in self._stubbed:
+                return
+            received["responses"] += 1
+            try:
+                # Body bytes as transferred (encoded), which Content-Length misses on chunked responses
+                received["bytes"] += max(0, request.sizes()["responseBodySize"])
+            except Exception:
+                pass  # The page closed before the sizes could be read
+
+        self._blocked = 0
+        self._stubbed = set()
+        page.on("requestfinished", on_finished)
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = round(time.perf_counter() - started, 3)
+            page.remove_listener("requestfinished", on_finished)
+            record.update(received)
+            record["blocked"] = self._blocked
+            self.navigations.append(record)
+
+    def report(self) -> dict:
+        """Average bytes/time per phase and the savings against unblocked baselines."""
+        def mean(records, key):
+            return sum(r[key] for r in records) / len(records) if records else None
+
+        summary = {}
+        for phase in ("search", "watch"):
+            records = [r for r in self.navigations if r["phase"] == phase and not r["baseline"]]
+            summary[phase] = {
+                "navigations": len(records),
+                "avg_seconds": mean(records, "seconds"),
+                "avg_bytes": mean(records, "bytes"),
+                "blocked_requests": sum(r["blocked"] for r in records),
+            }
+        baselines = [r for r in self.navigations if r["baseline"]]
+        profiled = summary["search"]
+        if baselines and profiled["navigations"]:
+            profiled["baseline_navigations"] = len(baselines)
+            profiled["bytes_saved_per_nav"] = mean(baselines, "bytes") - profiled["avg_bytes"]
+            profiled["seconds_saved_per_nav"] = mean(baselines, "seconds") - profiled["avg_seconds"]
+        return summary
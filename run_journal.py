@@ -0,0 +1,110 @@
+import json
+import os
+import random
+
+JOURNAL_SUFFIX = ".journal"
+
+class RunJournal:
+    """
+    Append-only checkpoint for a collection run, kept next to its output.
+
+    The first line holds the run config and RNG seed; each finished video
+    adds {"video": id, "size": output bytes after its record}, and a clean
+    finish adds {"finished": true}. Every video draws its randomness from
+    random.seed("<seed>:<id>"), so a resumed run makes the same choices for
+    the videos it has left as the original run would have. Resuming reads
+    only these short lines and truncates the output to the last journaled
+    size, dropping any record written after the final checkpoint; it never
+    re-reads the output itself.
+    """
+
+    def __init__(self, path, config: dict, seed, completed=(), output_size: int = 0,
+                 finished: bool = False, valid_bytes: int = 0):
+        self.path = str(path)
+        self.config = config
+        self.seed = seed
+        self.completed = set(completed)
+        self.output_size = output_size
+        self.finished = finished
+        self.resumed = False
+        self._valid_bytes = valid_bytes
+        self._f = None
+
+    @staticmethod
+    def path_for(output_path) -> str:
+        """Journal file belonging to an output file."""
+        return str(output_path) + JOURNAL_SUFFIX
+
+    @classmethod
+    def load(cls, path):
+        """Read a journal, or return None when there is none."""
+        if not os.path.exists(path):
+            return None
+        completed, output_size, finished = [], 0, False
+        with open(path, "rb") as f:
+            header = f.readline()
+            valid_bytes = len(header)
+            header = json.loads(header)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # A line cut short by the crash; everything before it is valid
+                entry = json.loads(line)
+                valid_bytes += len(line)
+                if entry.get("finished"):
+                    finished = True
+                else:
+                    completed.append(entry["video"])
+                    output_size = entry["size"]
+        return cls(path, header["config"], header["seed"], completed, output_size, finished, valid_bytes)
+
+    @classmethod
+    def begin(cls, output_path, config: dict, seed=None, resume: bool = False):
+        """
+        Open the journal for a run writing to output_path.
+
+        With resume=True and an unfinished journal present, its config, seed
+        and completed videos are returned for the caller to continue from;
+        otherwise a new journal is started with config and seed (random when
+        None).
+        """
+        path = cls.path_for(output_path)
+        journal = cls.load(path) if resume else None
+        if journal is not None and not journal.finished:
+            journal.resumed = True
+            # Drop a torn last line so new checkpoints start on a line of their own
+            os.truncate(path, journal._valid_bytes)
+            journal._f = open(path, "a", encoding="utf-8")
+            return journal
+        seed = seed if seed is not None else random.randrange(2 ** 32)
+        journal = cls(path, config, seed)
+        journal._f = open(path, "w", encoding="utf-8")
+        journal._write({"config": config, "seed": seed})
+        return journal
+
+    def _write(self, entry):
+        self._f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def seed_video(self, video):
+        """Seed the random module for one video, independent of the videos before it."""
+        random.seed(f"{self.seed}:{video}")
+
+    def record(self, video, output_size: int):
+        """Checkpoint a video whose record is in the output, which is now output_size bytes."""
+        self.completed.add(video)
+        self.output_size = output_size
+        self._write({"video": video, "size": output_size})
+
+    def close(self, finished: bool = False):
+        """Close the journal, marking the run complete when finished is True."""
+        if finished:
+            self._write({"finished": True})
+            self.finished = True
+        self._f.close()
+
+def unfinished_run(output_path):
+    """Return (videos done, videos planned) of an interrupted run writing to output_path, or None."""
+    journal = RunJournal.load(RunJournal.path_for(output_path))
+    if journal is None or journal.finished:
+        return None
+    return len(journal.completed), journal.config.get("num_videos")
@@ -0,0 +1,96 @@
+import heapq
+import itertools
+import time
+
+class SampleScheduler:
+    """
+    Fires periodic events (sampling, drains, user actions) at fixed deadlines
+    on a monotonic clock.
+
+    The k-th tick of an event is due at first + k * interval after run()
+    starts, so slow callbacks make individual ticks late but never shift the
+    ones after them. Ticks that are already a full interval overdue are
+    skipped (and counted) rather than fired in a burst. When two events are
+    due together the one with the lower priority value runs first, so
+    samples can be kept ahead of actions. Every tick is logged with its
+    scheduled time, actual time and lateness, in seconds since the start.
+
+    Callbacks run one after another on the calling thread, so a callback
+    that blocks (a Playwright click can wait seconds) still delays every
+    tick that falls due meanwhile. Next to samples read from Python, offset
+    such actions between sample ticks (first=) and bound them with a
+    timeout shorter than the gap to the next sample.
+    """
+
+    def __init__(self, clock=time.monotonic, sleep=time.sleep):
+        """
+        :param clock: Monotonic time source in seconds.
+        :param sleep: Blocking sleep taking seconds.
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self.log = []
+        self.skipped = {}
+        self._events = []
+        self._order = itertools.count()
+
+    def every(self, interval: float, callback, name: str, priority: int = 0, first: float = None):
+        """
+        Schedule callback(tick) every interval seconds.
+        :param name: Event name used in the log and report.
+        :param priority: Lower values run first when events are due together.
+        :param first: Offset of the first tick (defaults to one interval in).
+        """
+        event = {"name": name, "interval": interval, "callback": callback, "priority": priority,
+                 "first": interval if first is None else first, "index": 0}
+        self.skipped.setdefault(name, 0)
+        heapq.heappush(self._events, (event["first"], priority, next(self._order), event))
+
+    def run(self, duration: float) -> list:
+        """
+        Run every event until duration seconds have passed, then return the tick log.
+        Returns at the end of duration even if the last callback finished early.
+        """
+        start = self.clock()
+        while self._events:
+            deadline, priority, _, event = self._events[0]
+            # Tolerate float error so a tick due exactly at the end still fires
+            if deadline > duration + 1e-9:
+                break
+            delay = start + deadline - self.clock()
+            if delay > 0:
+                self.sleep(delay)
+            heapq.heappop(self._events)
+
+            actual = self.clock() - start
+            tick = {"event": event["name"], "index": event["index"], "scheduled": round(deadline, 4),
+                    "actual": round(actual, 4), "lateness": round(actual - deadline, 4)}
+            self.log.append(tick)
+            event["callback"](tick)
+
+            # Next deadline comes from the tick index, never from when this one ran
+            event["index"] += 1
+            behind = int((self.clock() - start - event["first"]) / event["interval"]) - event["index"]
+            if behind > 0:
+                event["index"] += behind
+                self.skipped[event["name"]] += behind
+            next_deadline = event["first"] + event["index"] * event["interval"]
+            heapq.heappush(self._events, (next_deadline, priority, next(self._order), event))
+
+        remaining = start + duration - self.clock()
+        if remaining > 0:
+            self.sleep(remaining)
+        return self.log
+
+    def report(self) -> dict:
+        """Ticks, skipped deadlines and mean/max lateness per event."""
+        summary = {}
+        for name, skipped in self.skipped.items():
+            lateness = [tick["lateness"] for tick in self.log if tick["event"] == name]
+            summary[name] = {
+                "ticks": len(lateness),
+                "skipped": skipped,
+                "mean_lateness_s": round(sum(lateness) / len(lateness), 4) if lateness else None,
+                "max_lateness_s": max(lateness) if lateness else None,
+            }
+        return summary
@@ -0,0 +1,176 @@
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+TRACEBACK_HEADER = "Traceback (most recent call last):"
+# Answer given to every input() prompt of an unattended run: a valid count for the
+# "How many videos/seconds/samples" prompts the collectors ask, and not "n" for resume
+SCRIPTED_ANSWER = "1"
+
+def scripted_input(prompts: int = 100) -> str:
+    """stdin text answering up to `prompts` input() calls with SCRIPTED_ANSWER."""
+    return (SCRIPTED_ANSWER + "\n") * prompts
+
+class _TailBuffer:
+    """Keeps the last max_bytes of a stream's lines; counts what it drops."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.lines = deque()
+        self.size = 0
+        self.dropped_bytes = 0
+
+    def append(self, line):
+        self.lines.append(line)
+        self.size += len(line)
+        while self.size > self.max_bytes and len(self.lines) > 1:
+            dropped = self.lines.popleft()
+            self.size -= len(dropped)
+            self.dropped_bytes += len(dropped)
+
+    def text(self):
+        prefix = f"[... {self.dropped_bytes} bytes of earlier output dropped ...]\n" if self.dropped_bytes else ""
+        return prefix + "".join(self.lines)
+
+def kill_process_group(proc, grace_s: float = 5.0):
+    """Stop a process started with start_new_session=True and everything it spawned (e.g. browsers)."""
+    for sig, wait_s in ((signal.SIGTERM, grace_s), (signal.SIGKILL, None)):
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            proc.wait(wait_s)
+            return
+        except subprocess.TimeoutExpired:
+            pass
+
+def parse_traceback(output: str, max_message_lines: int = 15) -> str:
+    """
+    The last Python traceback in output: its frames and the exception message,
+    including continuation lines such as Playwright's "Call log:". Empty when
+    the output has no traceback.
+    """
+    lines = output.splitlines()
+    starts = [i for i, line in enumerate(lines) if line.startswith(TRACEBACK_HEADER)]
+    if not starts:
+        return ""
+    end = starts[-1] + 1
+    while end < len(lines) and (lines[end].startswith(" ") or not lines[end].strip()):
+        end += 1  # Frames are indented
+    message = []
+    for line in lines[end:end + max_message_lines]:
+        if not line.strip():
+            break
+        message.append(line)
+    return "\n".join(lines[starts[-1]:end] + message)
+
+def run_script(script: str, args=(), timeout_s: float = None, cwd: str = None, echo: bool = True,
+               max_output_bytes: int = 256 * 1024, log_path: str = None, stop=None, python: str = None,
+               input_text: str = None) -> dict:
+    """
+    Run a Python script as a managed subprocess in its own process group.
+
+    stdout and stderr are read line by line as they arrive, echoed to this
+    process's own streams (when echo is set) and to log_path, and kept in
+    bounded buffers holding the last max_output_bytes of each. When
+    timeout_s passes or stop (a threading.Event) is set, the script and its
+    children are terminated, then killed.
+    :param input_text: Text written to the script's stdin, which is then closed (so further
+                       input() calls raise EOFError). None lets the script read this
+                       process's stdin, so an interactive run can prompt the user.
+    :return: exit_code (None if it was ended), timed_out, stopped, seconds,
+             stdout, stderr (the kept tails), traceback (the last one in stderr)
+    """
+    started = time.monotonic()
+    proc = subprocess.Popen([python or sys.executable, "-u", script, *args], cwd=cwd,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            stdin=None if input_text is None else subprocess.PIPE,
+                            text=True, errors="replace", bufsize=1, start_new_session=True)
+    buffers = {"stdout": _TailBuffer(max_output_bytes), "stderr": _TailBuffer(max_output_bytes)}
+    log = open(log_path, "w", encoding="utf-8") if log_path else None
+    log_lock = threading.Lock()
+
+    def pump(name, pipe, echo_to):
+        # Reads are capped so one huge unterminated line cannot grow without bound
+        for line in iter(lambda: pipe.readline(64 * 1024), ""):
+            buffers[name].append(line)
+            if echo:
+                echo_to.write(line)
+                echo_to.flush()
+            if log:
+                with log_lock:
+                    log.write(line)
+        pipe.close()
+
+    def feed():
+        try:
+            proc.stdin.write(input_text)
+            proc.stdin.close()
+        except (BrokenPipeError, OSError):
+            pass  # The script exited without reading all of it
+
+    readers = [threading.Thread(target=pump, args=("stdout", proc.stdout, sys.stdout), daemon=True),
+               threading.Thread(target=pump, args=("stderr", proc.stderr, sys.stderr), daemon=True)]
+    if input_text is not None:
+        readers.append(threading.Thread(target=feed, daemon=True))
+    for reader in readers:
+        reader.start()
+    timed_out = stopped = False
+    try:
+        while proc.poll() is None:
+            if stop is not None and stop.is_set():
+                stopped = True
+                break
+            if timeout_s is not None and time.monotonic() - started > timeout_s:
+                timed_out = True
+                break
+            time.sleep(0.1)
+    finally:
+        kill_process_group(proc)
+        for reader in readers:
+            reader.join(5)
+        if log:
+            log.close()
+    stderr = buffers["stderr"].text()
+    return {
+        "script": script,
+        "exit_code": None if timed_out or stopped else proc.returncode,
+        "timed_out": timed_out,
+        "stopped": stopped,
+        "seconds": round(time.monotonic() - started, 1),
+        "stdout": buffers["stdout"].text(),
+        "stderr": stderr,
+        "traceback": parse_traceback(stderr),
+    }
+
+def run_scripts(scripts, max_workers: int = None, log_paths=None, **kwargs) -> list:
+    """
+    Run several scripts (or the same script several times) concurrently with run_script;
+    output is not echoed unless echo=True is passed. Results are in the order of scripts.
+    Concurrent runs cannot share the terminal, so unless input_text is given, each script's
+    input() prompts are answered with scripted_input().
+    :param log_paths: One log file per script, as run_script's log_path.
+    """
+    kwargs.setdefault("echo", False)
+    kwargs.setdefault("input_text", scripted_input())
+    scripts = list(scripts)
+    log_paths = list(log_paths) if log_paths else [None] * len(scripts)
+    with ThreadPoolExecutor(max_workers or len(scripts) or 1) as pool:
+        return list(pool.map(lambda job: run_script(job[0], log_path=job[1], **kwargs), zip(scripts, log_paths)))
+
+def failure_summary(result: dict, tail_lines: int = 20) -> str:
+    """Why a run failed, for the feedback prompt: its traceback, or the end of its stderr."""
+    if result["timed_out"]:
+        reason = f"Timed out after {result['seconds']}s and was killed."
+    elif result["stopped"]:
+        reason = "Stopped before finishing."
+    else:
+        reason = f"Exited with code {result['exit_code']}."
+    detail = result["traceback"] or "\n".join(result["stderr"].splitlines()[-tail_lines:])
+    return f"{reason}\n{detail}".strip()
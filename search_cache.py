@@ -0,0 +1,91 @@
+import json
+import os
+import time
+
+class SearchCache:
+    """
+    Persistent query -> search results cache for the YouTube collector.
+
+    One search stores every result href of the page. take() hands them out
+    in result order, so the first use of a query gets the same video as
+    clicking the first result, and later uses get the next results without
+    loading the search page. Entries expire ttl_s seconds after their
+    search, are dropped once every href has been used, and the least
+    recently used entries are evicted beyond max_entries. The cache is
+    rewritten atomically (temp file + rename) after every change.
+    """
+
+    def __init__(self, path: str = "youtube_search_cache.json", ttl_s: float = 24 * 3600,
+                 max_entries: int = 1000):
+        """
+        :param path: JSON file holding the cache between runs.
+        :param ttl_s: Seconds after a search before its results are considered stale.
+        :param max_entries: Queries kept at most; least recently used ones are evicted.
+        """
+        self.path = path
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0, "search_s_saved": 0.0}
+        self.entries = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}  # A damaged cache is only a lost optimisation
+
+    def take(self, query: str):
+        """Return the next unused cached href for query, or None on a miss."""
+        entry = self.entries.get(query)
+        if entry is not None and time.time() - entry["fetched"] > self.ttl_s:
+            del self.entries[query]
+            self.stats["expired"] += 1
+            entry = None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        href = entry["hrefs"][entry["next"]]
+        entry["next"] += 1
+        entry["last_used"] = time.time()
+        if entry["next"] >= len(entry["hrefs"]):
+            del self.entries[query]
+        self.stats["hits"] += 1
+        self.stats["search_s_saved"] += entry["search_s"]
+        self.save()
+        return href
+
+    def put(self, query: str, hrefs, search_s: float):
+        """
+        Store the results of one search page.
+        :param hrefs: Result hrefs in page order.
+        :param search_s: Seconds the search took, credited as saved on every later hit.
+        """
+        hrefs = list(dict.fromkeys(h for h in hrefs if h))
+        if not hrefs:
+            return
+        now = time.time()
+        self.entries[query] = {"hrefs": hrefs, "next": 0, "fetched": now, "last_used": now,
+                               "search_s": round(search_s, 3)}
+        if len(self.entries) > self.max_entries:
+            by_use = sorted(self.entries, key=lambda q: self.entries[q]["last_used"])
+            for stale in by_use[:len(self.entries) - self.max_entries]:
+                del self.entries[stale]
+                self.stats["evicted"] += 1
+        self.save()
+
+    def save(self):
+        """Write the cache to disk atomically."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def report(self) -> dict:
+        """Hit rate, search time saved and eviction counts for this run."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "hit_rate": round(self.stats["hits"] / lookups, 3) if lookups else None,
+            **self.stats,
+            "search_s_saved": round(self.stats["search_s_saved"], 1),
+            "entries": len(self.entries),
+        }
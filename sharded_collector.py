@@ -0,0 +1,203 @@
+import argparse
+import os
+import random
+import socket
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from youtube_parser import RecordWriter, iter_videos
+
+# A worker counts as a straggler when it takes this much longer than the median.
+STRAGGLER_FACTOR = 1.5
+
+def shard(items, worker, workers):
+    """Return worker's round-robin share of items."""
+    return items[worker::workers]
+
+def shard_vocabulary(vocabulary, worker, workers):
+    """
+    Return worker's share of a {language: [words]} vocabulary: a round-robin slice of
+    every language's words, deduplicated across languages first (a word stays under the
+    first language listing it, as in VideoSampler), so shards are disjoint and each
+    keeps every language for the language-weighted draw.
+    """
+    seen, shares = set(), {}
+    for language, words in vocabulary.items():
+        unique = [word for word in dict.fromkeys(words) if word not in seen]
+        seen.update(unique)
+        share = shard(unique, worker, workers)
+        if share:
+            shares[language] = share
+    return shares
+
+def split_count(total, workers):
+    """Split total videos as evenly as possible across workers."""
+    return [total // workers + (1 if worker < total % workers else 0) for worker in range(workers)]
+
+def _youtube_worker(worker, num_videos, queries, output_path, seed, headless, browser_type, language_weights,
+                    urls=None):
+    """Worker process: run the YouTube collector on one shard of the query space."""
+    from generated_test.youtube1_gen import YouTubeVideoPlayerTest
+
+    random.seed(seed)
+    started = time.monotonic()
+    runner = YouTubeVideoPlayerTest(headless=headless, browser_type=browser_type, queries=queries,
+                                    language_weights=language_weights)
+    if urls:
+        runner.BASE_URL, runner.SEARCH_URL_TEMPLATE = urls
+    runner.run_tests(num_videos, browser_type=browser_type, headless=headless, output_filename=output_path,
+                     seed=seed)
+    return {"worker": worker, "pid": os.getpid(), "videos": runner.sink.videos,
+            "seconds": time.monotonic() - started, "output": output_path}
+
+def _twitch_worker(worker, num_videos, collection_seconds, output_path, seed, headless, browser_executable,
+                   start_url=None):
+    """Worker process: run the Twitch collector for its share of the videos."""
+    from generated_test.twitch1_gen import run_twitch_test
+
+    random.seed(seed)
+    started = time.monotonic()
+    options = {"start_url": start_url} if start_url else {}
+    run_twitch_test(num_videos, collection_seconds, output_filename=output_path, seed=seed,
+                    headless=headless, browser_executable=browser_executable, **options)
+    videos = sum(1 for _ in _read_records(output_path))
+    return {"worker": worker, "pid": os.getpid(), "videos": videos,
+            "seconds": time.monotonic() - started, "output": output_path}
+
+def _read_records(path):
+    """Yield a worker output's records; a torn last line (the worker died mid-write) is dropped."""
+    if not os.path.exists(path):
+        return
+    try:
+        yield from iter_videos(path)
+    except ValueError:
+        print(f"  ⚠️ Dropped a truncated record at the end of {path}")
+
+def merge_outputs(results, output_path):
+    """
+    Merge per-worker outputs into one, tagging each record with its worker.
+    The merged file is NDJSON like the collectors' own output, unless output_path ends in
+    ".json" (a JSON array). Records of a failed worker are kept, with its error in the tag.
+    """
+    host = socket.gethostname()
+    with RecordWriter(output_path, ndjson=not str(output_path).endswith(".json")) as writer:
+        for result in sorted(results, key=lambda r: r["worker"]):
+            for record in _read_records(result["output"]):
+                record["provenance"] = {"worker": result["worker"], "pid": result["pid"], "host": host}
+                if result.get("error"):
+                    record["provenance"]["worker_error"] = result["error"]
+                writer.write(record)
+    return writer.count
+
+def report(results, elapsed):
+    """Print per-worker throughput and flag stragglers."""
+    finished = [r for r in results if not r.get("error")]
+    median = statistics.median(r["seconds"] for r in finished) if finished else 0.0
+    print("\n=== Worker Summary ===")
+    for r in sorted(results, key=lambda r: r["worker"]):
+        if r.get("error"):
+            print(f"  worker {r['worker']}: ❌ failed ({r['error']}); {r['videos']} videos of partial output kept")
+            continue
+        per_hour = r["videos"] / r["seconds"] * 3600 if r["seconds"] else 0.0
+        straggler = median and r["seconds"] > STRAGGLER_FACTOR * median
+        flag = "  🐢 straggler" if straggler else ""
+        print(f"  worker {r['worker']} (pid {r['pid']}): {r['videos']} videos in {r['seconds']:.1f}s "
+              f"({per_hour:.1f} videos/hour){flag}")
+    total = sum(r["videos"] for r in results)
+    print(f"💾 {total} videos from {len(results)} workers in {elapsed:.1f}s "
+          f"({total / elapsed * 3600 if elapsed else 0.0:.1f} videos/hour overall)")
+
+def run_sharded(site, num_videos, workers, output_path, seed=None, headless=True,
+                browser_type="chromium", collection_seconds=10, language_weights=None,
+                browser_executable="auto", youtube_urls=None, twitch_url=None):
+    """
+    Run one collector per worker process, each with its own browser and shard.
+
+    YouTube workers each get a disjoint round-robin slice of every language's
+    nouns, drawn with language_weights ({language: weight}) as in a single
+    run; Twitch workers split the video count and launch browser_executable
+    ("auto": the twitch collector's Chrome path if it exists, else
+    Playwright's Chromium; None: always Playwright's Chromium). youtube_urls ((base URL, search URL
+    template)) and twitch_url point the workers at another site, such as the
+    benchmark's mock. Per-worker outputs are written next
+    to output_path and merged into it with a provenance tag per record.
+    Returns the per-worker result dicts; a failed worker's has its "error".
+    """
+    seed = seed if seed is not None else random.randrange(2 ** 32)
+    parts_dir = Path(output_path).parent / f"{Path(output_path).stem}_workers"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    counts = split_count(num_videos, workers)
+    if site == "youtube":
+        from generated_test.youtube1_gen import NOUNS_BY_LANGUAGE
+    elif browser_executable == "auto":
+        from generated_test.twitch1_gen import CHROME_PATH
+        browser_executable = CHROME_PATH if os.path.exists(CHROME_PATH) else None
+
+    started = time.monotonic()
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        for worker, count in enumerate(counts):
+            if not count:
+                continue
+            part = str(parts_dir / f"worker_{worker}.ndjson")
+            if site == "youtube":
+                future = pool.submit(_youtube_worker, worker, count,
+                                     shard_vocabulary(NOUNS_BY_LANGUAGE, worker, workers),
+                                     part, seed + worker, headless, browser_type, language_weights,
+                                     youtube_urls)
+            else:
+                future = pool.submit(_twitch_worker, worker, count, collection_seconds, part, seed + worker,
+                                     headless, browser_executable, twitch_url)
+            futures[future] = (worker, part)
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                worker, part = futures[future]
+                # Its records so far are still merged, tagged with the error
+                result = {"worker": worker, "pid": None, "videos": sum(1 for _ in _read_records(part)),
+                          "seconds": time.monotonic() - started, "output": part, "error": f"{type(e).__name__}: {e}"}
+                results.append(result)
+                print(f"  ❌ worker {worker} failed: {result['error']} "
+                      f"({result['videos']} videos of partial output kept)")
+                continue
+            results.append(result)
+            print(f"  ✅ worker {result['worker']} finished: {result['videos']} videos "
+                  f"in {result['seconds']:.1f}s ({len(results)}/{len(futures)} done)")
+    elapsed = time.monotonic() - started
+
+    merged = merge_outputs(results, output_path)
+    report(results, elapsed)
+    print(f"Merged {merged} records into {output_path} (seed {seed})")
+    return results
+
+def main():
+    """Command-line entry point for sharded collection runs."""
+    parser = argparse.ArgumentParser(description="Run YouTube or Twitch collectors across worker processes.")
+    parser.add_argument("site", choices=("youtube", "twitch"))
+    parser.add_argument("--videos", type=int, required=True, help="Total videos across all workers.")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="Worker processes.")
+    parser.add_argument("-o", "--output", help="Merged output file (default: <site>_telemetry.ndjson).")
+    parser.add_argument("--seed", type=int, help="Base RNG seed; worker k uses seed + k.")
+    parser.add_argument("--browser", default="chromium", help="YouTube browser type.")
+    parser.add_argument("--headful", action="store_true", help="Show browser windows.")
+    parser.add_argument("--seconds", type=int, default=10, help="Twitch stats seconds per video.")
+    parser.add_argument("--browser-executable", default="auto",
+                        help="Chrome binary for Twitch workers ('auto': the collector's Chrome path if it "
+                             "exists, else Playwright's Chromium).")
+    parser.add_argument("--language-weight", action="append", default=[], metavar="LANGUAGE=WEIGHT",
+                        help="Weight of a language's nouns for YouTube queries (repeatable; default 1).")
+    args = parser.parse_args()
+
+    weights = {language: float(weight) for language, weight in
+               (item.split("=", 1) for item in args.language_weight)} or None
+    run_sharded(args.site, args.videos, args.workers, args.output or f"{args.site}_telemetry.ndjson",
+                seed=args.seed, headless=not args.headful, browser_type=args.browser,
+                collection_seconds=args.seconds, language_weights=weights,
+                browser_executable=args.browser_executable)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import json
+import os
+import time
+
+PARTIAL_SUFFIX = ".partial"
+
+def read_partial(partial_path) -> dict:
+    """Return the samples left in a partial file as {video: [entries]}, in write order."""
+    recovered = {}
+    if not os.path.exists(partial_path):
+        return recovered
+    with open(partial_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                item = json.loads(line)
+            except ValueError:
+                break  # Cut short by the crash
+            recovered.setdefault(item["video"], []).append(item["sample"])
+    return recovered
+
+class TelemetrySink:
+    """
+    Append-only NDJSON output for the collectors.
+
+    Each finished video is written as one line of `path` (readable by
+    youtube_parser.iter_videos and telemetry_store). Samples of videos in
+    progress are appended to `path + ".partial"` as they are taken; when a
+    video is written, the partial file is rewritten with only the samples of
+    videos still in progress (kept in memory until then), so with several
+    videos in flight it stays small, and after a crash it holds exactly the
+    samples the main file is missing. Writes go through a userspace
+    buffer that is flushed after every video, and both files are fsync'd at
+    most every fsync_interval seconds (and on close), so a crash loses at
+    most the last interval of data without an fsync per record.
+    """
+
+    def __init__(self, path, append: bool = False, truncate_to: int = None,
+                 fsync_interval: float = 5.0, buffer_size: int = 1 << 16):
+        """
+        :param path: NDJSON file receiving one record per video.
+        :param append: Continue an existing file instead of truncating it. Samples left in
+                       its partial file are read into `recovered` ({video: [entries]}).
+        :param truncate_to: With append, first cut the file back to this many bytes.
+        :param fsync_interval: Seconds between fsyncs (0 syncs after every video).
+        :param buffer_size: Userspace write buffer per file, in bytes.
+        """
+        self.path = str(path)
+        self.partial_path = self.path + PARTIAL_SUFFIX
+        self.fsync_interval = fsync_interval
+        self.recovered = read_partial(self.partial_path) if append else {}
+        if append and truncate_to is not None and os.path.exists(self.path) \
+                and os.path.getsize(self.path) > truncate_to:
+            os.truncate(self.path, truncate_to)
+        self._initial_size = os.path.getsize(self.path) if append and os.path.exists(self.path) else 0
+        self._out = open(self.path, "a" if append else "w", encoding="utf-8", buffering=buffer_size)
+        self._partial = open(self.partial_path, "w", encoding="utf-8", buffering=buffer_size)
+        self._pending = {}  # video -> its partial-file lines, while in progress
+        self._last_sync = time.monotonic()
+        self.started = time.monotonic()
+        self.videos = 0
+        self.errors = 0
+        self.samples = 0
+        self.bytes_written = 0
+
+    def write_sample(self, video, entry):
+        """
+        Record one sample of the video in progress.
+        :param video: Identifier of the video the sample belongs to (e.g. its iteration).
+        :param entry: The sample as stored in the video record.
+        """
+        line = json.dumps({"video": video, "sample": entry}, ensure_ascii=False) + "\n"
+        self._partial.write(line)
+        self._pending.setdefault(video, []).append(line)
+        self.samples += 1
+
+    def write_video(self, video, record):
+        """
+        Write one finished video record.
+        :param video: The identifier its samples were written under.
+        :param record: The video record, including its samples.
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self._out.write(line)
+        self._out.flush()
+        self.bytes_written += len(line.encode("utf-8"))
+        self.videos += 1
+        if "error" in record:
+            self.errors += 1
+        # The finished video's samples are now in the main file; keep only the others'
+        if self._pending.pop(video, None) is not None:
+            self._partial.seek(0)
+            self._partial.truncate()
+            for lines in self._pending.values():
+                self._partial.writelines(lines)
+        self._maybe_sync()
+
+    def _maybe_sync(self, force=False):
+        now = time.monotonic()
+        if force or now - self._last_sync >= self.fsync_interval:
+            for f in (self._out, self._partial):
+                f.flush()
+                os.fsync(f.fileno())
+            self._last_sync = now
+
+    @property
+    def size(self) -> int:
+        """Bytes in the output file, including records from before an append."""
+        return self._initial_size + self.bytes_written
+
+    def progress(self, done: int, total: int) -> str:
+        """One compact status line: position, errors, throughput and output size."""
+        elapsed = time.monotonic() - self.started
+        per_hour = self.videos / elapsed * 3600 if elapsed > 0 else 0.0
+        return (f"[{done}/{total}] {self.videos} videos written ({self.errors} errors), "
+                f"{self.samples} samples, {per_hour:.1f} videos/hour, "
+                f"{self.bytes_written / 2 ** 20:.1f} MB -> {self.path}")
+
+    def close(self):
+        """Sync and close both files; an empty partial file is removed."""
+        self._maybe_sync(force=True)
+        empty = self._partial.tell() == 0
+        self._out.close()
+        self._partial.close()
+        if empty:
+            os.remove(self.partial_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
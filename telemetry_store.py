@@ -0,0 +1,297 @@
+import argparse
+import json
+import mmap
+import os
+import sys
+from array import array
+from pathlib import Path
+
+from youtube_parser import iter_videos, parse_stats_block, type_stats
+
+# On-disk layout of a store directory:
+#   meta.json       format version, byte order, row/video counts, column types,
+#                   and the category table of every categorical column
+#   offsets.bin     int64[videos + 1]; samples of video i are rows
+#                   offsets[i]:offsets[i + 1] of every column
+#   videos.ndjson   one line of metadata per video (url, query, duration...)
+#   <column>.bin    one contiguous native-endian array per metric
+FORMAT_VERSION = 1
+
+# Column kinds map to array typecodes: float64 ("d", NaN when missing),
+# int64 ("q", MISSING_INT when missing) and categorical int32 codes ("i",
+# -1 when missing) that index into the column's category list.
+FLOAT, INT, CATEGORY = "d", "q", "i"
+MISSING_INT = -(2 ** 63)
+MISSING_CATEGORY = -1
+
+YOUTUBE_COLUMNS = {
+    "timestamp_watched": FLOAT,
+    "lateness": FLOAT,
+    "dropped_frames": INT,
+    "total_frames": INT,
+    "current_width": INT,
+    "current_height": INT,
+    "current_fps": INT,
+    "optimal_width": INT,
+    "optimal_height": INT,
+    "optimal_fps": INT,
+    "connection_speed_kbps": INT,
+    "network_activity_bytes": INT,
+    "buffer_health_s": FLOAT,
+    "date_epoch": FLOAT,
+    "codecs": CATEGORY,
+    "audio_codec": CATEGORY,
+    "live_mode": CATEGORY,
+}
+
+TWITCH_COLUMNS = {
+    "sample_time_s": FLOAT,
+    "download_width": INT,
+    "download_height": INT,
+    "render_width": INT,
+    "render_height": INT,
+    "viewport_width": INT,
+    "viewport_height": INT,
+    "download_bitrate_kbps": INT,
+    "bandwidth_estimate_kbps": INT,
+    "fps": INT,
+    "skipped_frames": INT,
+    "buffer_size_s": FLOAT,
+    "latency_to_broadcaster_s": FLOAT,
+    "codecs": CATEGORY,
+    "protocol": CATEGORY,
+    "latency_mode": CATEGORY,
+    "render_surface": CATEGORY,
+    "backend_version": CATEGORY,
+}
+
+_MISSING = {FLOAT: float("nan"), INT: MISSING_INT, CATEGORY: MISSING_CATEGORY}
+
+class StoreWriter:
+    """Append videos and their samples to a columnar store on disk.
+
+    Columns are flushed per video, so memory is bounded by one video's
+    samples regardless of the store size.
+    """
+
+    def __init__(self, path, columns):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.columns = dict(columns)
+        self.rows = 0
+        self._offsets = array("q", [0])
+        self._categories = {name: {} for name, kind in self.columns.items() if kind == CATEGORY}
+        self._files = {name: open(self.path / f"{name}.bin", "wb") for name in self.columns}
+        self._videos = open(self.path / "videos.ndjson", "w", encoding="utf-8")
+
+    def _encode(self, name, value):
+        kind = self.columns[name]
+        if value is None:
+            return _MISSING[kind]
+        if kind == CATEGORY:
+            categories = self._categories[name]
+            return categories.setdefault(value, len(categories))
+        return value
+
+    def append_video(self, metadata, samples):
+        """Write one video's metadata and its list of {column: value} samples."""
+        for name, kind in self.columns.items():
+            values = array(kind, (self._encode(name, sample.get(name)) for sample in samples))
+            values.tofile(self._files[name])
+        self.rows += len(samples)
+        self._offsets.append(self.rows)
+        self._videos.write(json.dumps(metadata, ensure_ascii=False) + "\n")
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._videos.close()
+        with open(self.path / "offsets.bin", "wb") as f:
+            self._offsets.tofile(f)
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": self.rows,
+            "videos": len(self._offsets) - 1,
+            "columns": self.columns,
+            "categories": {name: list(values) for name, values in self._categories.items()},
+        }
+        with open(self.path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TelemetryStore:
+    """Read-only, memory-mapped view of a columnar store.
+
+    column() maps only the requested metric file and returns a zero-copy
+    memoryview of its typed values, e.g. buffer health across every sample
+    without touching any other column (numpy.frombuffer works on it too).
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported store format {self.meta['format_version']}")
+        if self.meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"Store was written {self.meta['byteorder']}-endian; this host is {sys.byteorder}")
+        self.columns = self.meta["columns"]
+        self._maps = {}
+        self._offsets = self._map("offsets", INT)
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    @property
+    def num_videos(self):
+        return self.meta["videos"]
+
+    def _map(self, name, kind):
+        if name not in self._maps:
+            with open(self.path / f"{name}.bin", "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    self._maps[name] = (None, None, memoryview(array(kind)))
+                else:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    raw = memoryview(mapped)
+                    self._maps[name] = (mapped, raw, raw.cast(kind))
+        return self._maps[name][2]
+
+    def column(self, name):
+        """Return the whole column as a typed memoryview."""
+        if name not in self.columns:
+            raise KeyError(f"Unknown column '{name}'; available: {', '.join(self.columns)}")
+        return self._map(name, self.columns[name])
+
+    def categories(self, name):
+        """Return the category list that a categorical column's codes index."""
+        return self.meta["categories"][name]
+
+    def video_rows(self, index):
+        """Return the (start, end) row range of one video."""
+        return self._offsets[index], self._offsets[index + 1]
+
+    def video_column(self, name, index):
+        """Return one video's slice of a column."""
+        start, end = self.video_rows(index)
+        return self.column(name)[start:end]
+
+    def videos(self):
+        """Yield the per-video metadata records in store order."""
+        with open(self.path / "videos.ndjson", "r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def close(self):
+        """Unmap every column; views handed out earlier must not be used after this."""
+        for mapped, raw, view in self._maps.values():
+            view.release()
+            if mapped is not None:
+                raw.release()
+                mapped.close()
+        self._maps.clear()
+
+def _youtube_sample(entry):
+    """Flatten one stats_collections entry into a YOUTUBE_COLUMNS row."""
+    stats = entry.get("stats")
+    if isinstance(stats, str):
+        stats = parse_stats_block(stats, typed=True)
+    elif stats and "connection_speed_kbps" not in stats:
+        stats = type_stats(stats)
+    sample = dict(stats or {})
+    sample["timestamp_watched"] = entry.get("timestamp_watched")
+    sample["lateness"] = entry.get("lateness")
+    return sample
+
+def youtube_to_store(json_path, store_path):
+    """Convert youtube_telemetry(_parsed).json into a columnar store."""
+    with StoreWriter(store_path, YOUTUBE_COLUMNS) as writer:
+        for video in iter_videos(json_path):
+            samples = [_youtube_sample(entry) for entry in video.pop("stats_collections", [])]
+            writer.append_video(video, samples)
+    return writer.rows
+
+def _twitch_number(value, cast):
+    try:
+        return cast(value.split(" ", 1)[0])
+    except (AttributeError, ValueError):
+        return None
+
+def _twitch_kbps(value):
+    """'291 Mbps' / '3654 Kbps' -> Kbps; a bare number is taken as Kbps."""
+    amount = _twitch_number(value, float)
+    if amount is None:
+        return None
+    _, _, unit = value.partition(" ")
+    return int(amount * 1000) if unit.startswith("M") else int(amount)
+
+def _twitch_size(value):
+    width, _, height = (value or "").partition("x")
+    try:
+        return int(width), int(height)
+    except ValueError:
+        return None, None
+
+def _twitch_sample(raw):
+    """Flatten one Twitch stats table sample into a TWITCH_COLUMNS row."""
+    sample = {
+        "download_bitrate_kbps": _twitch_kbps(raw.get("Download Bitrate")),
+        "bandwidth_estimate_kbps": _twitch_kbps(raw.get("Bandwidth Estimate")),
+        "fps": _twitch_number(raw.get("FPS"), int),
+        "skipped_frames": _twitch_number(raw.get("Skipped Frames"), int),
+        "buffer_size_s": _twitch_number(raw.get("Buffer Size"), float),
+        "latency_to_broadcaster_s": _twitch_number(raw.get("Latency To Broadcaster"), float),
+        "codecs": raw.get("Codecs"),
+        "protocol": raw.get("Protocol"),
+        "latency_mode": raw.get("Latency Mode"),
+        "render_surface": raw.get("Render Surface"),
+        "backend_version": raw.get("Backend Version"),
+    }
+    for prefix, label in (("download", "Download Resolution"), ("render", "Render Resolution"),
+                          ("viewport", "Viewport Resolution")):
+        sample[f"{prefix}_width"], sample[f"{prefix}_height"] = _twitch_size(raw.get(label))
+    return sample
+
+def twitch_to_store(json_path, store_path):
+    """Convert twitch_telemetry.json into a columnar store."""
+    with StoreWriter(store_path, TWITCH_COLUMNS) as writer:
+        for video in iter_videos(json_path):
+            samples = [_twitch_sample(raw) for raw in video.pop("stats_samples", [])]
+            # Older collector output has no per-sample times
+            for sample, sample_time in zip(samples, video.pop("sample_times", [])):
+                sample["sample_time_s"] = sample_time
+            writer.append_video(video, samples)
+    return writer.rows
+
+def main():
+    """Command-line entry point: convert JSON telemetry or describe a store."""
+    parser = argparse.ArgumentParser(description="Columnar, memory-mappable telemetry store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name in ("youtube", "twitch"):
+        convert = commands.add_parser(name, help=f"Convert {name} telemetry JSON into a store.")
+        convert.add_argument("input")
+        convert.add_argument("store")
+    info = commands.add_parser("info", help="Describe an existing store.")
+    info.add_argument("store")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        store = TelemetryStore(args.store)
+        print(f"{args.store}: {store.num_videos} videos, {len(store)} samples")
+        for name, kind in store.columns.items():
+            print(f"  {name:<26} {kind}")
+        store.close()
+        return
+
+    convert = youtube_to_store if args.command == "youtube" else twitch_to_store
+    rows = convert(args.input, args.store)
+    print(f"✅ Wrote {rows} samples to {args.store}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import browser_pool
+
+# A stand-in driver: started with "run-driver" like Playwright's, it launches one "browser"
+_DRIVER = ("import subprocess, sys, time\n"
+           "subprocess.Popen([sys.executable, '-c', 'x = [0] * (8 << 20); import time; time.sleep(30)'])\n"
+           "time.sleep(30)\n")
+
+def test_rss_counts_only_the_drivers_browsers():
+    other = subprocess.Popen([sys.executable, "-c", "x = [0] * (32 << 20); import time; time.sleep(30)"])
+    driver = subprocess.Popen([sys.executable, "-c", _DRIVER, "run-driver"], start_new_session=True)
+    try:
+        time.sleep(1.5)
+        rss = browser_pool.process_tree_rss()
+        # The browser's 64 MB, not the other child's 256 MB or the driver's interpreter on top
+        assert 64 << 20 <= rss < 128 << 20
+    finally:
+        other.kill()
+        os.killpg(driver.pid, signal.SIGKILL)  # The driver and its browser
+        other.wait()
+        driver.wait()
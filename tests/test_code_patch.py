@@ -0,0 +1,35 @@
+import pytest
+
+from code_patch import NO_CHANGES, PatchError, apply_edit_blocks, parse_edit_blocks
+
+SCRIPT = "import time\n\ndef main():\n    time.sleep(1)\n    print('done')\n"
+
+def test_blocks_are_parsed_and_applied_in_order():
+    response = (
+        "Fix the wait:\n```python\n"
+        "<<<<<<< SEARCH\n    time.sleep(1)\n=======\n    time.sleep(2)\n>>>>>>> REPLACE\n"
+        "<<<<<<< SEARCH\n    time.sleep(2)\n    print('done')\n=======\n    time.sleep(2)\n    print('ok')\n"
+        ">>>>>>> REPLACE\n```\n"
+    )
+    blocks = parse_edit_blocks(response)
+    assert len(blocks) == 2
+    assert apply_edit_blocks(SCRIPT, blocks) == "import time\n\ndef main():\n    time.sleep(2)\n    print('ok')\n"
+
+def test_search_text_tolerates_dropped_trailing_whitespace():
+    script = "x = 1   \ny = 2\n"
+    assert apply_edit_blocks(script, [("x = 1\ny = 2\n", "x = 3\ny = 4\n")]) == "x = 3\ny = 4\n"
+
+def test_empty_search_appends():
+    assert apply_edit_blocks("x = 1\n\n", [("", "main()\n")]) == "x = 1\nmain()\n"
+
+def test_no_changes_response_gives_no_blocks():
+    assert parse_edit_blocks(f"```\n{NO_CHANGES}\n```") == []
+
+def test_response_without_blocks_is_an_error():
+    with pytest.raises(PatchError, match="no SEARCH/REPLACE blocks"):
+        parse_edit_blocks("Here is the full script:\nimport time\n")
+
+@pytest.mark.parametrize("search, matches", [("    time.sleep(3)\n", 0), ("time", 2)])
+def test_search_text_must_match_exactly_once(search, matches):
+    with pytest.raises(PatchError, match=f"matches {matches} places"):
+        apply_edit_blocks(SCRIPT, [(search, "x\n")])
@@ -0,0 +1,30 @@
+from code_stream import CodeFenceExtractor
+
+def _stream(text, size):
+    extractor = CodeFenceExtractor()
+    lines = []
+    for start in range(0, len(text), size):
+        lines += extractor.feed(text[start:start + size])
+    return lines + extractor.finish()
+
+def test_fenced_block_is_extracted_from_the_response():
+    response = "\n```python\nimport time\n\n\ndef main():\n    pass\n\n```\nIt loops forever.\n"
+    assert CodeFenceExtractor.extract(response) == "import time\n\n\ndef main():\n    pass"
+
+def test_chunks_split_inside_fences_give_the_same_code():
+    response = "```python\nimport time\n\n\ndef main():\n    pass\n```\nNotes: use ``` to fence.\n"
+    expected = CodeFenceExtractor.extract(response).split("\n")
+    for size in range(1, len(response) + 1):
+        assert _stream(response, size) == expected, size
+
+def test_lines_are_returned_as_soon_as_they_are_complete():
+    extractor = CodeFenceExtractor()
+    assert extractor.feed("``") == []
+    assert extractor.feed("`py") == []
+    assert extractor.feed("thon\nimport ti") == []
+    assert extractor.feed("me\nx = 1\n`") == ["import time", "x = 1"]
+    assert extractor.feed("``\nprint('explanation')\n") == []
+    assert extractor.state == "after"
+
+def test_response_without_fence_is_all_code():
+    assert CodeFenceExtractor.extract("\n\nimport time\nx = 1\n\n") == "import time\nx = 1"
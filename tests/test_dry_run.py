@@ -0,0 +1,78 @@
+import textwrap
+
+from dry_run import dry_run
+
+# Just enough of playwright.sync_api for the harness to patch: pages send each
+# navigation through the context's route handler, which fetches from the stand-in
+FAKE_SYNC_API = '''
+import contextlib
+import urllib.request
+
+class _Route:
+    def __init__(self, url):
+        self.request = type("Request", (), {"url": url})()
+    def continue_(self):
+        urllib.request.urlopen(self.request.url).read()
+    def fetch(self, url):
+        return urllib.request.urlopen(url).read()
+    def fulfill(self, response):
+        pass
+    def abort(self):
+        pass
+
+class _Context:
+    handler = None
+    def route(self, pattern, handler):
+        self.handler = handler
+
+class _Page:
+    def __init__(self):
+        self.context = _Context()
+    def goto(self, url):
+        self.context.handler(_Route(url))
+
+class Browser:
+    def new_page(self, **kwargs):
+        return _Page()
+    def new_context(self, **kwargs):
+        return _Context()
+
+class BrowserType:
+    def launch(self, **kwargs):
+        assert kwargs["headless"] is True
+        return Browser()
+    def launch_persistent_context(self, user_data_dir, **kwargs):
+        return _Context()
+
+def sync_playwright():
+    return contextlib.nullcontext(type("Playwright", (), {"chromium": BrowserType()})())
+'''
+
+PROMPTING_CANDIDATE = '''
+from playwright.sync_api import sync_playwright
+
+n = int(input("How many random videos should I process? "))
+seconds = int(input("How many seconds of stats to collect per video? "))
+with sync_playwright() as p:
+    page = p.chromium.launch(headless=False).new_page()
+    for _ in range(n):
+        page.goto("https://www.youtube.com/watch?v=abc")
+        page.goto("https://www.youtube.com/videoplayback?range=0-1023")
+print("processed", n, "videos for", seconds, "s")
+'''
+
+def test_prompting_candidate_runs_unattended(tmp_path, monkeypatch):
+    fake = tmp_path / "fake" / "playwright"
+    fake.mkdir(parents=True)
+    (fake / "__init__.py").write_text("")
+    (fake / "sync_api.py").write_text(textwrap.dedent(FAKE_SYNC_API))
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path / "fake"))
+    script = tmp_path / "candidate.py"
+    script.write_text(PROMPTING_CANDIDATE)
+
+    result = dry_run(str(script), timeout_s=30, work_dir=str(tmp_path))
+
+    assert result["passed"], (result["reason"], open(result["log"]).read())
+    assert result["exit_code"] == 0
+    assert result["pages"] == 1 and result["media_requests"] == 1
+    assert "processed 1 videos for 1 s" in open(result["log"]).read()
@@ -0,0 +1,17 @@
+import pytest
+
+from network_capture import classify_url
+
+@pytest.mark.parametrize("url, url_class", [
+    ("https://rr1.googlevideo.com/videoplayback?itag=137&range=0-1000", "youtube_media"),
+    ("https://video-edge.example.net/v1/segment/480p/12.ts?token=x", "hls_segment"),
+    ("https://video-edge.example.net/v1/playlist/index.m3u8", "hls_playlist"),
+    ("https://cdn.example.com/dash/chunk-5.m4s", "dash_segment"),
+    ("https://cdn.example.com/clip.mp4?t=10", "progressive_media"),
+    ("https://www.twitch.tv/stats?id=.ts", None),
+    ("https://static.example.com/tsconfig.json", None),
+    ("https://static.example.com/app.tsx", None),
+    ("https://static.example.com/bundle.ts.js", None),
+])
+def test_media_classes_match_on_path(url, url_class):
+    assert classify_url(url) == url_class
@@ -0,0 +1,37 @@
+import json
+import time
+
+import pytest
+
+from packet_capture import PacketCapture
+
+def _fake_tcpdump(tmp_path, body):
+    script = tmp_path / "tcpdump"
+    script.write_text("#!/bin/sh\n" + body)
+    script.chmod(0o755)
+    return str(script)
+
+def test_start_times_out_when_tcpdump_stays_silent(tmp_path):
+    capture = PacketCapture(tmp_path / "cap.pcap", tcpdump=_fake_tcpdump(tmp_path, "exec sleep 30\n"))
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="did not start capturing"):
+        capture.start(timeout=1.0)
+    assert time.monotonic() - started < 5
+
+def test_fresh_run_truncates_tags_and_restart_appends(tmp_path):
+    tcpdump = _fake_tcpdump(tmp_path, "echo 'listening on any' >&2\nexec sleep 30\n")
+    tags = tmp_path / "cap.pcap.tags"
+    tags.write_text(json.dumps({"video": 9, "event": "start", "t": 0, "pcap": "old.pcap"}) + "\n")
+
+    capture = PacketCapture(tmp_path / "cap.pcap", tcpdump=tcpdump)
+    for video in (1, 2):
+        capture.start()
+        capture.begin(video)
+        capture.stop(timeout=1.0)
+    assert [json.loads(line)["video"] for line in tags.read_text().splitlines()] == [1, 1, 2, 2]
+
+    resumed = PacketCapture(tmp_path / "cap.pcap", tcpdump=tcpdump, append=True)
+    resumed.start()
+    resumed.begin(3)
+    resumed.stop(timeout=1.0)
+    assert [json.loads(line)["video"] for line in tags.read_text().splitlines()] == [1, 1, 2, 2, 3, 3]
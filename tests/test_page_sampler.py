@@ -0,0 +1,39 @@
+from page_sampler import PageSampler
+
+class FakeTarget:
+    """Page stand-in whose in-page buffer is filled by the test."""
+
+    def __init__(self):
+        self.batches = []
+
+    def evaluate(self, script, arg):
+        if isinstance(arg, str) and "state.buffer = []" in script:
+            return self.batches.pop(0)
+        return None
+
+def _batch(times):
+    return {"samples": [{"t": t, "scheduled": t, "value": 1} for t in times], "dropped": 0, "skipped": 0}
+
+def test_achieved_rate_spans_each_install_separately():
+    target = FakeTarget()
+    sampler = PageSampler(target, "() => 1", rate_hz=10)
+    sampler.start()
+    target.batches.append(_batch([0.0, 0.1, 0.2, 0.3, 0.4]))
+    sampler.drain()
+    # Navigated: the timer is reinstalled and its times restart at 0
+    sampler.start()
+    target.batches.append(_batch([0.0, 0.1, 0.2]))
+    sampler.drain()
+    report = sampler.report()
+    assert report["samples"] == 8
+    assert report["achieved_hz"] == 10.0
+
+def test_achieved_rate_across_drains_of_one_install():
+    target = FakeTarget()
+    sampler = PageSampler(target, "() => 1", rate_hz=10)
+    sampler.start()
+    target.batches += [_batch([0.0, 0.2]), _batch([0.4, 0.6]), None]
+    sampler.drain()
+    sampler.drain()
+    sampler.drain()  # Page lost the timer
+    assert sampler.report()["achieved_hz"] == 5.0
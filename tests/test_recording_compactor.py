@@ -0,0 +1,16 @@
+import ast
+
+from recording_compactor import compact_recording
+
+RECORDING = 'page.locator("#movie_player").press("l")\n' * 5
+
+def test_repeated_actions_become_a_loop():
+    compacted, report = compact_recording(RECORDING)
+    assert "for _ in range(5)" in compacted
+    assert report["tokens_after"] < report["tokens_before"]
+
+def test_recording_is_kept_as_is_without_ast_unparse(monkeypatch):
+    monkeypatch.delattr(ast, "unparse")  # Python 3.8
+    compacted, report = compact_recording(RECORDING)
+    assert compacted == RECORDING
+    assert report["tokens_saved_pct"] == 0.0
@@ -0,0 +1,64 @@
+from request_profile import InterceptionProfile
+
+class FakeRequest:
+    def __init__(self, url, resource_type, body_size):
+        self.url = url
+        self.resource_type = resource_type
+        self.body_size = body_size
+
+    def sizes(self):
+        return {"responseBodySize": self.body_size}
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+
+    def fulfill(self, **kwargs):
+        pass
+
+    def continue_(self):
+        pass
+
+class FakePage:
+    def __init__(self):
+        self.listeners = {}
+        self.handler = None
+
+    def route(self, pattern, handler):
+        self.handler = handler
+
+    def unroute(self, pattern, handler):
+        self.handler = None
+
+    def on(self, event, listener):
+        self.listeners[event] = listener
+
+    def remove_listener(self, event, listener):
+        del self.listeners[event]
+
+    def load(self, request):
+        """Route request (when routed) and report it finished."""
+        if self.handler:
+            self.handler(FakeRoute(request))
+        self.listeners["requestfinished"](request)
+
+def test_search_bytes_count_transferred_bodies_but_not_stubs():
+    profile = InterceptionProfile(baseline_every=0)
+    page = FakePage()
+    with profile.measure(page, "search", "https://www.youtube.com/results") as record:
+        # A chunked HTML page (no Content-Length), a stubbed image and a stubbed beacon
+        page.load(FakeRequest("https://www.youtube.com/results", "document", 180_000))
+        page.load(FakeRequest("https://i.ytimg.com/vi/x/hq.jpg", "image", 43))
+        page.load(FakeRequest("https://www.youtube.com/api/stats/qoe", "xhr", 0))
+    assert record["bytes"] == 180_000
+    assert record["responses"] == 1
+    assert record["blocked"] == 2
+
+def test_baseline_every_n_includes_the_first_search():
+    for every, expected in ((1, [True, True, True]), (2, [True, False, True]), (0, [False, False, False])):
+        profile = InterceptionProfile(baseline_every=every)
+        page = FakePage()
+        for _ in range(3):
+            with profile.measure(page, "search", "https://www.youtube.com/results"):
+                pass
+        assert [record["baseline"] for record in profile.navigations] == expected, every
@@ -0,0 +1,47 @@
+import random
+
+from run_journal import RunJournal, unfinished_run
+from telemetry_sink import TelemetrySink
+
+def test_resume_continues_from_last_checkpoint_and_truncates_output(tmp_path):
+    output = tmp_path / "out.ndjson"
+    journal = RunJournal.begin(output, {"num_videos": 3}, seed=7)
+    output.write_text('{"video": 0}\n')
+    journal.record(0, output.stat().st_size)
+    # Crash: a record written after the last checkpoint and a torn journal line
+    output.write_text('{"video": 0}\n{"video": 1, "samp')
+    journal._f.write('{"video": 1, "si')
+    journal._f.close()
+
+    assert unfinished_run(output) == (1, 3)
+    resumed = RunJournal.begin(output, {"num_videos": 99}, resume=True)
+    assert resumed.resumed
+    assert (resumed.config, resumed.seed, resumed.completed) == ({"num_videos": 3}, 7, {0})
+    TelemetrySink(output, append=True, truncate_to=resumed.output_size).close()
+    assert output.read_text() == '{"video": 0}\n'
+
+    # New checkpoints start on a line of their own after the torn one is dropped
+    with open(output, "a") as f:
+        f.write('{"video": 1}\n')
+    resumed.record(1, output.stat().st_size)
+    resumed.close(finished=True)
+    finished = RunJournal.load(RunJournal.path_for(output))
+    assert finished.completed == {0, 1} and finished.finished
+    assert unfinished_run(output) is None
+
+def test_finished_journal_starts_a_new_run(tmp_path):
+    output = tmp_path / "out.ndjson"
+    RunJournal.begin(output, {"num_videos": 1}, seed=1).close(finished=True)
+    journal = RunJournal.begin(output, {"num_videos": 2}, seed=2, resume=True)
+    assert not journal.resumed
+    assert (journal.config, journal.seed, journal.completed) == ({"num_videos": 2}, 2, set())
+    journal.close()
+
+def test_video_seeds_do_not_depend_on_earlier_videos():
+    journal = RunJournal("unused", {}, seed=5)
+    journal.seed_video(3)
+    first = random.random()
+    journal.seed_video(1)
+    random.random()
+    journal.seed_video(3)
+    assert random.random() == first
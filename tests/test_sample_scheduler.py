@@ -0,0 +1,52 @@
+from sample_scheduler import SampleScheduler
+
+class FakeClock:
+    """Monotonic clock that only advances when the scheduler sleeps or a callback spends time."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def test_ticks_keep_fixed_deadlines_and_report_lateness():
+    clock = FakeClock()
+    scheduler = SampleScheduler(clock=clock, sleep=clock.sleep)
+    scheduler.every(1.0, lambda tick: clock.sleep(0.25 if tick["index"] == 1 else 0), "sample")
+    log = scheduler.run(4.0)
+
+    assert [tick["scheduled"] for tick in log] == [1.0, 2.0, 3.0, 4.0]
+    # The slow second tick does not shift the ones after it
+    assert [tick["lateness"] for tick in log] == [0.0, 0.0, 0.0, 0.0]
+    assert clock.now == 104.0
+    assert scheduler.report()["sample"] == {"ticks": 4, "skipped": 0, "mean_lateness_s": 0.0,
+                                            "max_lateness_s": 0.0}
+
+def test_blocking_callback_makes_ticks_late_and_skips_overdue_ones():
+    clock = FakeClock()
+    scheduler = SampleScheduler(clock=clock, sleep=clock.sleep)
+    scheduler.every(1.0, lambda tick: None, "sample")
+    scheduler.every(1.0, lambda tick: clock.sleep(2.5 if tick["index"] == 0 else 0), "action",
+                    priority=1, first=0.5)
+    scheduler.run(5.0)
+
+    samples = [tick for tick in scheduler.log if tick["event"] == "sample"]
+    # The action at 0.5 blocks until 3.0: the sample due at 1.0 fires 2 s late, 2.0 is skipped
+    assert [(tick["scheduled"], tick["lateness"]) for tick in samples] == [(1.0, 2.0), (3.0, 0.0), (4.0, 0.0),
+                                                                          (5.0, 0.0)]
+    report = scheduler.report()
+    assert report["sample"]["skipped"] == 1
+    assert report["sample"]["max_lateness_s"] == 2.0
+    # 1.5 is a full interval overdue and skipped; 2.5 is less so and fires late
+    assert report["action"]["skipped"] == 1
+
+def test_samples_run_before_actions_due_at_the_same_time():
+    clock = FakeClock()
+    scheduler = SampleScheduler(clock=clock, sleep=clock.sleep)
+    scheduler.every(1.0, lambda tick: None, "action", priority=1)
+    scheduler.every(1.0, lambda tick: None, "sample")
+    scheduler.run(2.0)
+    assert [tick["event"] for tick in scheduler.log] == ["sample", "action", "sample", "action"]
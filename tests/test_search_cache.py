@@ -0,0 +1,51 @@
+import search_cache
+from search_cache import SearchCache
+
+class FakeTime:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_results_are_handed_out_in_order_then_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_cache.time, "time", FakeTime())
+    cache = SearchCache(str(tmp_path / "cache.json"))
+    assert cache.take("cat") is None
+    cache.put("cat", ["/watch?v=a", None, "/watch?v=b", "/watch?v=a"], search_s=2.0)
+    assert [cache.take("cat"), cache.take("cat"), cache.take("cat")] == ["/watch?v=a", "/watch?v=b", None]
+    assert cache.report()["hit_rate"] == 0.5
+    assert cache.report()["search_s_saved"] == 4.0
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(search_cache.time, "time", clock)
+    cache = SearchCache(str(tmp_path / "cache.json"), ttl_s=60)
+    cache.put("cat", ["/watch?v=a", "/watch?v=b"], search_s=1.0)
+    clock.now += 61
+    assert cache.take("cat") is None
+    assert cache.stats["expired"] == 1
+
+def test_least_recently_used_entry_is_evicted_and_cache_persists(tmp_path, monkeypatch):
+    clock = FakeTime()
+    monkeypatch.setattr(search_cache.time, "time", clock)
+    path = str(tmp_path / "cache.json")
+    cache = SearchCache(path, max_entries=2)
+    for query in ("a", "b"):
+        clock.now += 1
+        cache.put(query, [f"/watch?v={query}1", f"/watch?v={query}2"], search_s=1.0)
+    clock.now += 1
+    cache.take("a")  # "b" is now the least recently used
+    clock.now += 1
+    cache.put("c", ["/watch?v=c1"], search_s=1.0)
+    assert set(cache.entries) == {"a", "c"}
+    assert cache.stats["evicted"] == 1
+
+    reloaded = SearchCache(path, max_entries=2)
+    assert reloaded.take("a") == "/watch?v=a2"
+
+def test_damaged_cache_file_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text('{"cat": {"hrefs": [')
+    assert SearchCache(str(path)).entries == {}
+    assert path.read_text() == '{"cat": {"hrefs": ['  # Not rewritten until the cache changes
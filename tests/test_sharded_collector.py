@@ -0,0 +1,29 @@
+import json
+
+from sharded_collector import merge_outputs
+
+def _write_part(path, records, torn_tail=""):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + torn_tail)
+    return str(path)
+
+def test_merge_writes_ndjson_with_provenance_including_failed_workers(tmp_path):
+    results = [
+        {"worker": 1, "pid": 11, "output": _write_part(tmp_path / "worker_1.ndjson", [{"video": "b"}])},
+        {"worker": 0, "pid": 10, "output": _write_part(tmp_path / "worker_0.ndjson", [{"video": "a"}, {"video": "c"}])},
+        # Died mid-write: its complete record is kept, the torn one dropped
+        {"worker": 2, "pid": None, "error": "BrokenProcessPool: worker died",
+         "output": _write_part(tmp_path / "worker_2.ndjson", [{"video": "d"}], torn_tail='{"video": "e", "st')},
+    ]
+    merged = tmp_path / "youtube_telemetry.ndjson"
+    assert merge_outputs(results, merged) == 4
+
+    records = [json.loads(line) for line in merged.read_text().splitlines()]
+    assert [(r["video"], r["provenance"]["worker"]) for r in records] == [("a", 0), ("c", 0), ("b", 1), ("d", 2)]
+    assert records[-1]["provenance"]["worker_error"] == "BrokenProcessPool: worker died"
+    assert "worker_error" not in records[0]["provenance"]
+
+def test_merge_into_json_path_writes_an_array(tmp_path):
+    results = [{"worker": 0, "pid": 10, "output": _write_part(tmp_path / "worker_0.ndjson", [{"video": "a"}])}]
+    merged = tmp_path / "merged.json"
+    merge_outputs(results, merged)
+    assert [r["video"] for r in json.loads(merged.read_text())] == ["a"]
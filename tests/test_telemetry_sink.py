@@ -0,0 +1,26 @@
+import json
+
+from telemetry_sink import TelemetrySink, read_partial
+
+def test_partial_file_keeps_only_overlapping_videos_in_progress(tmp_path):
+    path = tmp_path / "out.ndjson"
+    sink = TelemetrySink(path, fsync_interval=0)
+    sink.write_sample(1, {"t": 0})
+    sink.write_sample(2, {"t": 0})
+    sink.write_sample(1, {"t": 1})
+    sink.write_sample(2, {"t": 1})
+    sink.write_video(1, {"video": 1, "samples": [{"t": 0}, {"t": 1}]})
+    sink._partial.flush()
+    # Video 2 is still playing: only its samples remain, not a second copy of video 1's
+    assert read_partial(sink.partial_path) == {2: [{"t": 0}, {"t": 1}]}
+
+    sink.write_sample(3, {"t": 0})
+    sink.write_sample(2, {"t": 2})
+    sink.write_video(2, {"video": 2, "samples": [{"t": 0}, {"t": 1}, {"t": 2}]})
+    sink._partial.flush()
+    assert read_partial(sink.partial_path) == {3: [{"t": 0}]}
+
+    sink.write_video(3, {"video": 3, "samples": [{"t": 0}]})
+    sink.close()
+    assert not (tmp_path / "out.ndjson.partial").exists()
+    assert [json.loads(line)["video"] for line in path.read_text().splitlines()] == [1, 2, 3]
@@ -0,0 +1,8 @@
+from telemetry_store import _twitch_kbps
+
+def test_twitch_kbps_units():
+    assert _twitch_kbps("291 Mbps") == 291000
+    assert _twitch_kbps("3654 Kbps") == 3654
+    assert _twitch_kbps("3654") == 3654  # No unit: Kbps
+    assert _twitch_kbps(None) is None
+    assert _twitch_kbps("n/a") is None
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from video_sampler import BloomFilter, VideoSampler, video_id
+
+def test_bloom_filter_round_trips_through_save_and_load(tmp_path):
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(500):
+        bloom.add(f"video{i}")
+    assert not bloom.add("video1")  # Already present
+    path = tmp_path / "seen.bloom"
+    bloom.save(path)
+
+    loaded = BloomFilter.load(path)
+    assert (loaded.num_bits, loaded.num_hashes, loaded.count) == (bloom.num_bits, bloom.num_hashes, 500)
+    assert all(f"video{i}" in loaded for i in range(500))
+
+def test_bloom_filter_load_rejects_other_and_truncated_files(tmp_path):
+    path = tmp_path / "seen.bloom"
+    BloomFilter(capacity=1000).save(path)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match="truncated"):
+        BloomFilter.load(path)
+    path.write_bytes(b"not a filter at all, but long enough")
+    with pytest.raises(ValueError, match="not a Bloom filter"):
+        BloomFilter.load(path)
+
+def test_bloom_filter_false_positive_rate_at_capacity():
+    bloom = BloomFilter(capacity=10_000, error_rate=0.01)
+    for i in range(10_000):
+        bloom.add(f"seen{i}")
+    false_positives = sum(f"new{i}" in bloom for i in range(20_000)) / 20_000
+    assert false_positives < 0.02
+    assert bloom.false_positive_rate() == pytest.approx(0.01, rel=0.2)
+
+def test_vocabulary_is_deduplicated_and_weighted_by_language():
+    sampler = VideoSampler({"en": ["cat", "dog", "dog"], "fr": ["chat", "dog"], "de": ["Hund"]},
+                           weights={"fr": 3, "de": 0})
+    assert sampler.vocabulary == {"en": ["cat", "dog"], "fr": ["chat"]}
+    random.seed(0)
+    queries = [sampler.query() for _ in range(4000)]
+    # fr weighs 3 to en's 1, although it lists fewer words
+    assert 0.7 < queries.count("chat") / len(queries) < 0.8
+
+def test_seen_videos_persist_and_are_skipped(tmp_path):
+    path = str(tmp_path / "seen.bloom")
+    VideoSampler(["cat"], seen_path=path).mark_seen("https://www.youtube.com/watch?v=abc&t=1")
+    sampler = VideoSampler(["cat"], seen_path=path)
+    assert sampler.first_unseen(["/watch?v=abc", "/watch?v=def"]) == "/watch?v=def"
+    assert sampler.stats["duplicates_skipped"] == 1
+    assert video_id("/watch?v=def") == "def" and video_id("/shorts/x") is None
+
+def test_first_unseen_passes_over_excluded_videos():
+    sampler = VideoSampler(["cat"])
+    hrefs = ["/watch?v=a", "/watch?v=b"]
+    assert sampler.first_unseen(hrefs, exclude={"a"}) == "/watch?v=b"
+    assert sampler.first_unseen(hrefs, exclude={"a", "b"}) is None
@@ -0,0 +1,170 @@
+import hashlib
+import math
+import os
+import random
+import struct
+import time
+from urllib.parse import parse_qs, urlparse
+
+_BLOOM_MAGIC = b"BLM1"
+_BLOOM_HEADER = struct.Struct("<4sQII")  # magic, bits, hashes, items added
+
+def video_id(href):
+    """Return the v= id of a /watch?v=... link (absolute or relative), or None."""
+    if not href:
+        return None
+    ids = parse_qs(urlparse(href).query).get("v")
+    return ids[0] if ids else None
+
+class BloomFilter:
+    """
+    Fixed-size set of strings with no false negatives and a bounded false
+    positive rate, stored as a flat bit array (about 1.2 MB per million
+    items at 1%). Persisted as a small header followed by the raw bits.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        :param capacity: Items the filter is sized for.
+        :param error_rate: False positive rate once capacity items have been added.
+        """
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item) -> bool:
+        """Add item; returns False when it was (probably) already present."""
+        new = False
+        for p in self._positions(item):
+            if not self.bits[p >> 3] & (1 << (p & 7)):
+                self.bits[p >> 3] |= 1 << (p & 7)
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def false_positive_rate(self) -> float:
+        """Expected false positive rate at the current fill."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def save(self, path):
+        """Write the filter atomically."""
+        tmp_path = str(path) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a filter written by save()."""
+        with open(path, "rb") as f:
+            magic, num_bits, num_hashes, count = _BLOOM_HEADER.unpack(f.read(_BLOOM_HEADER.size))
+            if magic != _BLOOM_MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            bloom = cls.__new__(cls)
+            bloom.num_bits, bloom.num_hashes, bloom.count = num_bits, num_hashes, count
+            bloom.bits = bytearray(f.read())
+        if len(bloom.bits) != (num_bits + 7) // 8:
+            raise ValueError(f"{path} is truncated")
+        return bloom
+
+class VideoSampler:
+    """
+    Picks search queries and filters out videos that were already collected.
+
+    The vocabulary is deduplicated (a word listed under several languages is
+    kept once, under the first), and a query is drawn by first choosing a
+    language by weight and then a word uniformly within it, so a language's
+    share of queries no longer depends on how many words it lists. Video ids
+    that have been watched are kept in a Bloom filter persisted at seen_path,
+    so duplicates are skipped across runs before any watch time is spent.
+    """
+
+    def __init__(self, vocabulary, weights: dict = None, seen_path: str = None,
+                 capacity: int = 1_000_000, error_rate: float = 0.01):
+        """
+        :param vocabulary: {language: [words]} or a plain list of words.
+        :param weights: {language: weight}; unlisted languages weigh 1, weight 0 disables one.
+        :param seen_path: File persisting the seen-video filter (None keeps it in memory only).
+        :param capacity: Videos the filter is sized for when it is created.
+        :param error_rate: Chance a new video is mistaken for a seen one at full capacity.
+        """
+        if not isinstance(vocabulary, dict):
+            vocabulary = {"all": list(vocabulary)}
+        weights = weights or {}
+        seen_words = set()
+        self.vocabulary = {}
+        for language, words in vocabulary.items():
+            unique = [w for w in dict.fromkeys(words) if w not in seen_words]
+            seen_words.update(unique)
+            if unique and weights.get(language, 1) > 0:
+                self.vocabulary[language] = unique
+        if not self.vocabulary:
+            raise ValueError("No words left to sample from after deduplication and weighting.")
+        self.languages = list(self.vocabulary)
+        self.weights = [weights.get(language, 1) for language in self.languages]
+
+        self.seen_path = seen_path
+        if seen_path and os.path.exists(seen_path):
+            self.seen = BloomFilter.load(seen_path)
+        else:
+            self.seen = BloomFilter(capacity, error_rate)
+        self.stats = {"queries": 0, "unique_videos": 0, "duplicates_skipped": 0}
+        self.started = time.monotonic()
+
+    def query(self) -> str:
+        """Draw a query: a language by weight, then a word uniformly within it."""
+        language = random.choices(self.languages, weights=self.weights)[0]
+        self.stats["queries"] += 1
+        return random.choice(self.vocabulary[language])
+
+    def is_seen(self, href) -> bool:
+        """True if the video behind href was (probably) collected before; counts the skip."""
+        vid = video_id(href)
+        if vid is not None and vid in self.seen:
+            self.stats["duplicates_skipped"] += 1
+            return True
+        return False
+
+    def first_unseen(self, hrefs, exclude=()):
+        """
+        Return the first href in hrefs whose video has not been collected, or None.
+        :param exclude: Video ids to pass over too, e.g. ones other tasks are watching.
+        """
+        for href in hrefs:
+            if video_id(href) in exclude:
+                continue
+            if not self.is_seen(href):
+                return href
+        return None
+
+    def mark_seen(self, href):
+        """Record a collected video and persist the filter."""
+        vid = video_id(href)
+        if vid is None:
+            return
+        if self.seen.add(vid):
+            self.stats["unique_videos"] += 1
+        if self.seen_path:
+            self.seen.save(self.seen_path)
+
+    def report(self) -> dict:
+        """Unique videos per hour of collection, duplicates skipped and filter fill."""
+        hours = (time.monotonic() - self.started) / 3600
+        return {
+            **self.stats,
+            "unique_per_hour": round(self.stats["unique_videos"] / hours, 1) if hours else 0.0,
+            "seen_total": self.seen.count,
+            "false_positive_rate": round(self.seen.false_positive_rate(), 6),
+        }
@@ -1,9 +1,19 @@
+import argparse
+import ast
 import os
 import json
+import threading
 import time
 import google.generativeai as genai
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
+from generation_cache import GenerationCache
+from code_stream import CodeFenceExtractor
+from recording_compactor import compact_recording
+from dry_run import dry_run
+from script_runner import failure_summary, run_script, run_scripts
+from code_patch import DIVIDER, NO_CHANGES, REPLACE, SEARCH, PatchError, apply_edit_blocks, parse_edit_blocks
 
 # Load environment variables from .env file
 load_dotenv()
@@ -14,9 +24,45 @@ if not GEMINI_API_KEY:
     raise ValueError("GEMINI_API_KEY not found in environment variables. Please check your .env file.")
 genai.configure(api_key=GEMINI_API_KEY)
 
+MODEL_NAME = 'gemini-2.5-flash-preview-05-20'
+# Bump a template's version whenever its prompt text changes, so cached
+# responses to the old wording are no longer used
+GENERALIZE_TEMPLATE_VERSION = 1
+FEEDBACK_TEMPLATE_VERSION = 1
+PATCH_TEMPLATE_VERSION = 1
+
 class WorkflowGenerator:
-    def __init__(self):
-        self.model = genai.GenerativeModel('gemini-2.5-flash-preview-05-20')
+    def __init__(self, use_cache=True, cache_dir="generation_cache", stream=True, compact=True, patch=True,
+                 candidates=1, dry_run_timeout=60.0, test_timeout=900.0, validation_runs=1):
+        """
+        :param use_cache: Reuse stored responses for byte-identical requests (False bypasses
+                          the cache for reads; fresh responses are still stored).
+        :param cache_dir: Directory of the persistent generation cache.
+        :param stream: Stream responses, writing the script to its _gen.py file line by
+                       line as it is generated instead of after the whole response.
+        :param compact: Compact the recording (repeated actions as loops, re-created
+                        locators as variables) before pasting it into prompts.
+        :param patch: Ask for feedback updates as search/replace edits to the current script,
+                      regenerating the whole script only when the edits cannot be applied.
+        :param candidates: Scripts to request concurrently for the first generation; above 1,
+                           each is dry-run headless against the local stand-in site and the
+                           first to pass is used.
+        :param dry_run_timeout: Seconds each candidate's dry run may take.
+        :param test_timeout: Seconds a test run may take before it is killed (None: no limit).
+        :param validation_runs: Runs of the script per test step, run concurrently; the test
+                                passes only if every run does.
+        """
+        self.model = genai.GenerativeModel(MODEL_NAME)
+        self.use_cache = use_cache
+        self.cache = GenerationCache(cache_dir)
+        self.stream = stream
+        self.compact = compact
+        self.patch = patch
+        self.candidates = candidates
+        self.dry_run_timeout = dry_run_timeout
+        self.test_timeout = test_timeout
+        self.validation_runs = validation_runs
+        self.timings = [] # Per model call: time to first line and total latency
         # Create directories if they don't exist
         os.makedirs("playwright_test", exist_ok=True)
         os.makedirs("generated_test", exist_ok=True)
@@ -82,8 +128,13 @@ class WorkflowGenerator:
             print(f"Error reading guidelines file {path}: {e}")
             return ""
 
-    def prompt_gemini_for_generalization(self, original_code, guidelines):
-        """Step 5: Send recorded code and user guidelines to Gemini to generate a comprehensive test"""
+    def prompt_gemini_for_generalization(self, original_code, guidelines, output_file=None, candidate=0):
+        """
+        Step 5: Send recorded code and user guidelines to Gemini to generate a comprehensive test
+        :param output_file: When streaming, the script is written here as it is generated.
+        :param candidate: Index of the candidate in best-of-N generation; each index is its own
+                          cache entry, so candidates are not all the same cached response.
+        """
         print("\nSending code and guidelines to Gemini for comprehensive test generation...")
         
         prompt = f"""
@@ -111,19 +162,165 @@ Requirements:
 Return only the complete Python script.
 Start with ```python
 """
+        inputs = {"original_code": original_code, "guidelines": guidelines}
+        if candidate:
+            inputs["candidate"] = candidate
         try:
-            response = self.model.generate_content(prompt)
-            generated_code = response.text
-            # Strip markdown fences if present
-            if generated_code.startswith("```python"):
-                generated_code = generated_code.split("```python")[1].split("```")[0].strip()
-            elif generated_code.startswith("```"):
-                generated_code = generated_code.split("```")[1].split("```")[0].strip()
-            return generated_code
+            # Streaming only pays off when there is a file to write (candidates are used whole)
+            return self.generate(prompt, GENERALIZE_TEMPLATE_VERSION, inputs, output_file,
+                                 stream=None if output_file else False)
         except Exception as e:
             print(f"Error calling Gemini API: {e}")
             return None
 
+    def generate(self, prompt, template_version, inputs, output_file=None, extract=True, stream=None):
+        """
+        Return the code block of the model's response to prompt, from the generation cache
+        when an identical request (same model, template version and inputs) was answered before.
+        :param template_version: Version of the prompt template that built prompt.
+        :param inputs: Every value interpolated into the template.
+        :param output_file: When streaming, the code is written here line by line as it arrives.
+        :param extract: False returns the whole response text instead of its code block.
+        :param stream: Overrides the generator's stream setting for this call.
+        """
+        finish = CodeFenceExtractor.extract if extract else str
+        key = GenerationCache.key(MODEL_NAME, template_version, inputs)
+        if self.use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                print("Using cached Gemini response (identical request seen before).")
+                return finish(cached)
+        started = time.monotonic()
+        if self.stream if stream is None else stream:
+            text, first_line_s, lines = self._generate_streaming(prompt, output_file, started)
+        else:
+            text = self.model.generate_content(prompt).text
+            first_line_s, lines = None, None
+        total_s = time.monotonic() - started
+        self.timings.append({"first_line_s": first_line_s, "total_s": total_s, "lines": lines})
+        first_line = f"first line after {first_line_s:.1f}s, " if first_line_s is not None else ""
+        print(f"Gemini call: {first_line}{total_s:.1f}s in total.")
+        self.cache.put(key, text, MODEL_NAME, total_s)
+        return finish(text)
+
+    def _generate_streaming(self, prompt, output_file, started):
+        """
+        Stream a response, extracting its code block as chunks arrive and appending each
+        completed line to output_file. If the stream fails, output_file is restored.
+        :return: (full response text, seconds to the first code line, number of code lines)
+        """
+        previous = self.read_generated_code(output_file) if output_file and os.path.exists(output_file) else None
+        out = open(output_file, 'w', encoding='utf-8') if output_file else None
+        extractor = CodeFenceExtractor()
+        parts, lines, first_line_s = [], 0, None
+
+        def write(code):
+            nonlocal lines, first_line_s
+            if not code:
+                return
+            if first_line_s is None:
+                first_line_s = time.monotonic() - started
+                print(f"  First line after {first_line_s:.1f}s" + (f", writing to {output_file}" if out else ""))
+            if out:
+                # Lines are joined rather than terminated, so the file matches the final code exactly
+                out.write(("\n" if lines else "") + "\n".join(code))
+                out.flush()
+            lines += len(code)
+            print(f"\r  {lines} lines received...", end="", flush=True)
+
+        try:
+            for chunk in self.model.generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue # A chunk without text (e.g. only safety metadata)
+                parts.append(text)
+                write(extractor.feed(text))
+            write(extractor.finish())
+            print()
+        except BaseException:
+            if out:
+                out.close()
+                out = None
+                if previous is not None:
+                    with open(output_file, 'w', encoding='utf-8') as f:
+                        f.write(previous)
+                else:
+                    os.remove(output_file)
+            raise
+        finally:
+            if out:
+                out.close()
+        return "".join(parts), first_line_s, lines
+
+    def generate_best_of_n(self, original_code, guidelines, filename):
+        """
+        Step 5 (best-of-N): Request self.candidates scripts concurrently and dry-run each
+        headless against the local stand-in site as soon as it arrives. The first candidate
+        to pass wins and the other dry runs are stopped. Criteria and per-candidate timings
+        are printed and saved to generated_test/<filename>_candidates.json.
+        :return: The winning script, or the first candidate that parsed if none passed.
+        """
+        print(f"\nRequesting {self.candidates} candidate scripts from Gemini in parallel...")
+        started = time.monotonic()
+        winner_found = threading.Event()
+
+        def build(i):
+            t0 = time.monotonic()
+            code = self.prompt_gemini_for_generalization(original_code, guidelines, candidate=i)
+            entry = {"candidate": i, "generate_s": round(time.monotonic() - t0, 1), "code": code}
+            if not code:
+                return {**entry, "passed": False, "reason": "generation failed"}
+            path = f"generated_test/{filename}_candidate{i}.py"
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(code)
+            if winner_found.is_set():
+                return {**entry, "script": path, "passed": False, "reason": "not validated (winner already found)"}
+            return {**entry, **dry_run(path, self.dry_run_timeout, stop=winner_found)}
+
+        pool = ThreadPoolExecutor(self.candidates)
+        futures = [pool.submit(build, i) for i in range(self.candidates)]
+        results, winner = [], None
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                result["finished_s"] = round(time.monotonic() - started, 1)
+                results.append(result)
+                status = "PASS" if result["passed"] else "fail"
+                print(f"  Candidate {result['candidate']}: {status} ({result['reason']}), generated in "
+                      f"{result['generate_s']}s, dry run {result.get('seconds', 0.0)}s, "
+                      f"{result.get('pages', 0)} pages / {result.get('media_requests', 0)} media requests")
+                if result["passed"]:
+                    winner = result
+                    winner_found.set()
+                    break
+        finally:
+            # Dry runs still going stop on winner_found; late generations are not waited for
+            winner_found.set()
+            for future in futures:
+                future.cancel()  # Candidates not started yet (cancel_futures= needs Python 3.9)
+            pool.shutdown(wait=False)
+
+        wall_s = round(time.monotonic() - started, 1)
+        log_file = f"generated_test/{filename}_candidates.json"
+        with open(log_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "criteria": "parses; exits 0 or still running after the dry-run time limit; loads a "
+                            "stand-in page and fetches media through it; first candidate to pass wins",
+                "dry_run_timeout_s": self.dry_run_timeout,
+                "wall_s": wall_s,
+                "winner": winner["candidate"] if winner else None,
+                "candidates": [{k: v for k, v in r.items() if k != "code"} for r in results],
+            }, f, indent=2)
+        if winner:
+            print(f"Selected candidate {winner['candidate']} after {wall_s}s (log: {log_file}).")
+            return winner["code"]
+        fallback = next((r["code"] for r in sorted(results, key=lambda r: r["candidate"])
+                         if r["code"] and not r["reason"].startswith("does not parse")), None)
+        print(f"No candidate passed its dry run after {wall_s}s (log: {log_file})"
+              + ("; continuing with the first one that parses." if fallback else "."))
+        return fallback
+
     def save_generalized_code(self, code, filename):
         """Step 5 (continued): Save the generated code to a new file"""
         output_file = f"generated_test/{filename}_gen.py"
@@ -137,22 +334,37 @@ Start with ```python
             return None
 
     def run_test(self, test_file):
-        """Step 6: Run the generated test directly so headless=False browser can show"""
+        """
+        Step 6: Run the generated test as a subprocess (headless=False browsers still show),
+        killing it after self.test_timeout seconds. A single run reads this terminal, so the
+        script's input() prompts reach the user. With several validation runs they run
+        concurrently, each logging to <test_file>.run<N>.log instead of the console, and
+        their prompts are answered with script_runner.SCRIPTED_ANSWER.
+        :return: (success, stdout, error) where error is the failing run's final traceback
+                 (or the end of its stderr), ready for update_code_with_feedback
+        """
         print(f"\nLaunching test script: {test_file}")
-        cmd = f"python3 {test_file}"
-        print(f"Executing: {cmd}")
         try:
-            exit_code = os.system(cmd)
-            print(f"Test script exited with code: {exit_code}")
-            if exit_code == 0:
-                print("Test executed successfully.")
-                return True, "", ""
+            if self.validation_runs > 1:
+                print(f"Running {self.validation_runs} validation runs concurrently...")
+                results = run_scripts([test_file] * self.validation_runs, timeout_s=self.test_timeout,
+                                      log_paths=[f"{test_file}.run{i}.log" for i in range(self.validation_runs)])
             else:
-                print("Test completed with non-zero exit code; inspect browser window for details.")
-                return False, "", f"Exit code {exit_code}"
+                results = [run_script(test_file, timeout_s=self.test_timeout)]
         except Exception as e:
             print(f"Exception occurred while launching test: {e}")
             return False, "", str(e)
+        for i, result in enumerate(results):
+            status = "timed out" if result["timed_out"] else f"exit code {result['exit_code']}"
+            run = f"Run {i}" if len(results) > 1 else "Test script"
+            print(f"{run}: {status} after {result['seconds']}s")
+        failed = [r for r in results if r["exit_code"] != 0]
+        if not failed:
+            print("Test executed successfully.")
+            return True, results[0]["stdout"], ""
+        error = failure_summary(failed[0])
+        print(f"{len(failed)}/{len(results)} run(s) failed. Error passed to the next feedback round:\n{error}")
+        return False, failed[0]["stdout"], error
 
     def get_feedback_from_file(self):
         """Step 7: Ask for a feedback file path and read its contents"""
@@ -168,9 +380,71 @@ Start with ```python
             print(f"Error reading feedback file {path}: {e}")
             return None
 
+    def patch_code_with_feedback(self, current_code, feedback, original_code, error_message):
+        """
+        Step 8 (patch mode): Ask Gemini for search/replace edits implementing the feedback
+        and apply them to current_code. Output is a few edited lines instead of the whole script.
+        :return: The patched code, or None when the edits are missing, do not apply or do not parse.
+        """
+        error_section = f"\nHere is the error message from the last run:\n{error_message}\n" if error_message else ""
+        prompt = f"""
+You are an expert Playwright test automation engineer. 
+
+Below is the current test code:
+{current_code}
+
+Here is the original recorded code:
+{original_code}
+
+User Feedback:
+{feedback}
+{error_section}
+Change the current test code to incorporate the user feedback and fix any error above, keeping all
+existing functionality unless explicitly asked to remove it. Do not return the whole script. Return
+only edits, as one or more blocks of this exact form:
+
+{SEARCH}
+lines copied exactly from the current test code, including indentation
+{DIVIDER}
+the lines that replace them
+{REPLACE}
+
+Rules:
+- The SEARCH lines must occur exactly once in the current test code; add surrounding lines if needed.
+- To insert code, SEARCH for the adjacent lines and repeat them in the replacement together with the new code.
+- Keep each block small; use several blocks for changes in different places.
+- Blocks are applied in order, each to the result of the previous ones.
+- If nothing needs to change, return only {NO_CHANGES}.
+"""
+        try:
+            response = self.generate(prompt, PATCH_TEMPLATE_VERSION,
+                                     {"current_code": current_code, "original_code": original_code,
+                                      "feedback": feedback, "error_message": error_message}, extract=False)
+            blocks = parse_edit_blocks(response)
+            patched = apply_edit_blocks(current_code, blocks)
+            ast.parse(patched)
+        except (PatchError, SyntaxError) as e:
+            print(f"Patch could not be applied ({type(e).__name__}: {e}).")
+            return None
+        except Exception as e:
+            print(f"Error requesting patch from Gemini: {e}")
+            return None
+        changed = sum(len(search.splitlines()) + len(replace.splitlines()) for search, replace in blocks)
+        print(f"Patch applied: {len(blocks)} edit(s), {changed} lines exchanged.")
+        return patched
+
     def update_code_with_feedback(self, current_code, feedback, original_code, error_message, filename):
         """Step 8: Send feedback (and any error details) back to Gemini to update the test code"""
         print("\nUpdating code based on feedback file...")
+        output_file = f"generated_test/{filename}_gen.py"
+        if self.patch:
+            patched = self.patch_code_with_feedback(current_code, feedback, original_code, error_message)
+            if patched is not None:
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(patched)
+                print(f"Code updated and saved to {output_file}")
+                return patched
+            print("Falling back to regenerating the whole script...")
         error_section = f"\n\nIf the last run failed, here is the error message:\n{error_message}" if error_message else ""
         prompt = f"""
 You are an expert Playwright test automation engineer. 
@@ -199,14 +473,9 @@ Return only the complete updated Python script.
 Start with ```python
 """
         try:
-            response = self.model.generate_content(prompt)
-            updated_code = response.text
-            # Strip markdown fences if present
-            if updated_code.startswith("```python"):
-                updated_code = updated_code.split("```python")[1].split("```")[0].strip()
-            elif updated_code.startswith("```"):
-                updated_code = updated_code.split("```")[1].split("```")[0].strip()
-            output_file = f"generated_test/{filename}_gen.py"
+            updated_code = self.generate(prompt, FEEDBACK_TEMPLATE_VERSION,
+                                         {"current_code": current_code, "original_code": original_code,
+                                          "feedback": feedback, "error_message": error_message}, output_file)
             with open(output_file, 'w', encoding='utf-8') as f:
                 f.write(updated_code)
             print(f"Code updated and saved to {output_file}")
@@ -234,10 +503,20 @@ Start with ```python
             if not original_code:
                 print("Failed to read recorded code. Exiting workflow.")
                 return
+            if self.compact:
+                # Both prompts paste the recording, so it is compacted once here
+                original_code, report = compact_recording(original_code)
+                print(f"Compacted recording: {report['lines_before']} -> {report['lines_after']} lines, "
+                      f"~{report['tokens_before']} -> ~{report['tokens_after']} tokens "
+                      f"({report['tokens_saved_pct']}% saved)")
             # Step 4: Ask user for guidelines via file
             guidelines = self.get_test_guidelines()
             # Step 5: Generate a comprehensive test via Gemini
-            generalized_code = self.prompt_gemini_for_generalization(original_code, guidelines)
+            if self.candidates > 1:
+                generalized_code = self.generate_best_of_n(original_code, guidelines, filename)
+            else:
+                generalized_code = self.prompt_gemini_for_generalization(original_code, guidelines,
+                                                                         f"generated_test/{filename}_gen.py")
             if not generalized_code:
                 print("Failed to generate comprehensive test. Exiting workflow.")
                 return
@@ -263,9 +542,38 @@ Start with ```python
             print("\nWorkflow interrupted by user.")
         except Exception as e:
             print(f"\nUnexpected error in workflow: {e}")
+        finally:
+            if self.timings:
+                firsts = [t["first_line_s"] for t in self.timings if t["first_line_s"] is not None]
+                print(f"Gemini calls: {len(self.timings)}, "
+                      + (f"mean time to first line {sum(firsts) / len(firsts):.1f}s, " if firsts else "")
+                      + f"mean total {sum(t['total_s'] for t in self.timings) / len(self.timings):.1f}s")
+            cache = self.cache.report()
+            print(f"Generation cache: {cache['hits']} hits / {cache['misses']} misses"
+                  f"{'' if self.use_cache else ' (bypassed)'}, {cache['seconds_saved']}s of generation saved, "
+                  f"{cache['evicted']} evicted -> {self.cache.directory}")
 
 def main():
     """Entry point for the workflow"""
+    parser = argparse.ArgumentParser(description="Generate and refine Playwright tests with Gemini.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always call the model instead of reusing responses to identical requests.")
+    parser.add_argument("--cache-dir", default="generation_cache")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Wait for each whole response instead of writing the script as it streams in.")
+    parser.add_argument("--no-compact", action="store_true",
+                        help="Paste the recording into prompts verbatim instead of compacting it.")
+    parser.add_argument("--no-patch", action="store_true",
+                        help="Regenerate the whole script on feedback instead of asking for edits.")
+    parser.add_argument("--candidates", type=int, default=1,
+                        help="Generate this many scripts in parallel and keep the first that passes a dry run.")
+    parser.add_argument("--dry-run-timeout", type=float, default=60.0,
+                        help="Seconds each candidate's headless dry run may take.")
+    parser.add_argument("--test-timeout", type=float, default=900.0,
+                        help="Seconds a test run may take before it is killed (0 for no limit).")
+    parser.add_argument("--validation-runs", type=int, default=1,
+                        help="Run the generated script this many times concurrently at each test step.")
+    args = parser.parse_args()
     print("Checking prerequisites...")
     # Check if Playwright is installed via os.system
     exit_code = os.system("playwright --version > /dev/null 2>&1")
@@ -276,7 +584,10 @@ def main():
         print("  pip install playwright && playwright install")
         return
     # Start the workflow
-    workflow = WorkflowGenerator()
+    workflow = WorkflowGenerator(use_cache=not args.no_cache, cache_dir=args.cache_dir, stream=not args.no_stream,
+                                 compact=not args.no_compact, patch=not args.no_patch,
+                                 candidates=args.candidates, dry_run_timeout=args.dry_run_timeout,
+                                 test_timeout=args.test_timeout or None, validation_runs=args.validation_runs)
     workflow.run_workflow()
 
 if __name__ == "__main__":
@@ -1,8 +1,184 @@
+import argparse
+import glob
 import json
+import os
 import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 
-def parse_stats_block(stats_text):
-    """Extract individual metrics from a stats-for-nerds block."""
+# Field order of the dict returned by parse_stats_block.
+STAT_FIELDS = (
+    "video_id", "viewport", "dropped_frames", "current_res", "optimal_res",
+    "volume", "normalized_volume", "codecs", "audio_codec", "connection_speed",
+    "network_activity", "buffer_health", "live_mode", "mystery_text", "date",
+)
+
+# Line rules keyed by the first word of a stats-for-nerds line. Each rule is
+# (full label prefix, [(field, compiled pattern or None for "rest of line",
+# needs a following newline)]). The patterns are the legacy ones below with the
+# label stripped off, matched against the remainder of a single line.
+_LINE_RULES = {
+    "Video": ("Video ID / sCPN ", (
+        ("video_id", re.compile(r"([\w-]+) /"), False),
+    )),
+    "Viewport": ("Viewport / Frames ", (
+        ("viewport", re.compile(r"([\dx]+(?:\*\d\.\d+)?)"), False),
+        ("dropped_frames", re.compile(r".*? / (\d+ dropped of \d+|\-)"), False),
+    )),
+    "Current": ("Current / Optimal Res ", (
+        ("current_res", re.compile(r"([\dx@]+)"), False),
+        ("optimal_res", re.compile(r"[\dx@]+ / ([\dx@]+)"), False),
+    )),
+    "Volume": ("Volume / Normalized ", (
+        ("volume", re.compile(r"([\d%]+)"), False),
+        ("normalized_volume", re.compile(r"[\d%]+ / ([\w\s().%-]+)$"), True),
+    )),
+    "Codecs": ("Codecs ", (
+        ("codecs", re.compile(r"(.*?) /"), False),
+        ("audio_codec", re.compile(r".*? / (.*)"), True),
+    )),
+    "Connection": ("Connection Speed ", (
+        ("connection_speed", re.compile(r"([\d,]+ Kbps)"), False),
+    )),
+    "Network": ("Network Activity ", (
+        ("network_activity", re.compile(r"([\d.]+ [KM]B)"), False),
+    )),
+    "Buffer": ("Buffer Health ", (
+        ("buffer_health", re.compile(r"([\d.]+ s)"), False),
+    )),
+    "Live": ("Live Mode ", (
+        ("live_mode", None, True),
+    )),
+    "Mystery": ("Mystery Text ", (
+        ("mystery_text", None, True),
+    )),
+    "Date": ("Date ", (
+        ("date", None, False),
+    )),
+}
+
+def _apply_line(line, terminated, result):
+    """Fill the fields of one stats line into result (first occurrence wins)."""
+    rule = _LINE_RULES.get(line.partition(" ")[0])
+    if rule is None:
+        return
+    prefix, fields = rule
+    if not line.startswith(prefix):
+        return
+    rest = line[len(prefix):]
+    for field, pattern, needs_newline in fields:
+        if result[field] is not None or (needs_newline and not terminated):
+            continue
+        if pattern is None:
+            result[field] = rest.strip()
+        else:
+            found = pattern.match(rest)
+            if found:
+                result[field] = found.group(1).strip()
+
+def parse_stats_block(stats_text, typed=False):
+    """Extract individual metrics from a stats-for-nerds block.
+
+    Splits the block into lines once and dispatches each line on its label,
+    so every precompiled pattern only ever sees one short line. Produces the
+    same dict as parse_stats_block_legacy for YouTube's panel layout, where
+    each metric sits at the start of its own line. With typed=True the
+    numeric metrics are returned as numbers (see type_stats).
+    """
+    result = dict.fromkeys(STAT_FIELDS)
+    lines = stats_text.split("\n")
+    # The legacy patterns for some fields required a trailing newline, so the
+    # last line is only allowed to fill fields that did not.
+    last = lines.pop()
+    for line in lines:
+        _apply_line(line, True, result)
+    _apply_line(last, False, result)
+    return type_stats(result) if typed else result
+
+_UNIT_BYTES = {"KB": 1024, "MB": 1024 * 1024}
+_MONTHS = {name: number for number, name in enumerate(
+    ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+def _split_resolution(res):
+    """'1280x720@30' -> (1280, 720, 30); missing parts become None."""
+    if not res:
+        return None, None, None
+    size, _, fps = res.partition("@")
+    width, _, height = size.partition("x")
+    try:
+        return int(width), int(height), int(fps) if fps else None
+    except ValueError:
+        return None, None, None
+
+def _date_to_epoch(date):
+    """'Fri May 30 2025 20:17:47 GMT-0700 (...)' -> POSIX timestamp."""
+    try:
+        _, month, day, year, clock, zone = date.split(" ", 6)[:6]
+        hour, minute, second = clock.split(":")
+        offset = int(zone[4:6]) * 60 + int(zone[6:8])
+        tz = timezone(timedelta(minutes=-offset if zone[3] == "-" else offset))
+        return datetime(int(year), _MONTHS[month], int(day), int(hour), int(minute),
+                        int(second), tzinfo=tz).timestamp()
+    except (AttributeError, KeyError, IndexError, ValueError):
+        return None
+
+def type_stats(stats):
+    """Convert a parse_stats_block dict into numeric fields.
+
+    Connection speed is Kbps (int), buffer health seconds (float), network
+    activity bytes (int, KB/MB as 1024-based), frames and resolutions ints,
+    and the panel date a POSIX timestamp. Text fields are passed through;
+    anything missing or unparseable is None.
+    """
+    def number(value, cast):
+        try:
+            return cast(value.split(" ", 1)[0].replace(",", ""))
+        except (AttributeError, ValueError):
+            return None
+
+    dropped = total = None
+    frames = stats["dropped_frames"]
+    if frames and frames != "-":
+        dropped, _, total = frames.partition(" dropped of ")
+        dropped, total = int(dropped), int(total)
+
+    network_bytes = None
+    activity = stats["network_activity"]
+    if activity:
+        amount, _, unit = activity.partition(" ")
+        network_bytes = int(float(amount) * _UNIT_BYTES[unit])
+
+    current_width, current_height, current_fps = _split_resolution(stats["current_res"])
+    optimal_width, optimal_height, optimal_fps = _split_resolution(stats["optimal_res"])
+
+    return {
+        "video_id": stats["video_id"],
+        "viewport": stats["viewport"],
+        "dropped_frames": dropped,
+        "total_frames": total,
+        "current_width": current_width,
+        "current_height": current_height,
+        "current_fps": current_fps,
+        "optimal_width": optimal_width,
+        "optimal_height": optimal_height,
+        "optimal_fps": optimal_fps,
+        "volume": stats["volume"],
+        "normalized_volume": stats["normalized_volume"],
+        "codecs": stats["codecs"],
+        "audio_codec": stats["audio_codec"],
+        "connection_speed_kbps": number(stats["connection_speed"], int),
+        "network_activity_bytes": network_bytes,
+        "buffer_health_s": number(stats["buffer_health"], float),
+        "live_mode": stats["live_mode"],
+        "mystery_text": stats["mystery_text"],
+        "date_epoch": _date_to_epoch(stats["date"]),
+    }
+
+def parse_stats_block_legacy(stats_text):
+    """Original multi-regex parser, kept for benchmarking and cross-checks."""
     def match(pattern):
         found = re.search(pattern, stats_text)
         return found.group(1).strip() if found else None
@@ -25,26 +201,274 @@ def parse_stats_block(stats_text):
         "date": match(r"Date (.*)")
     }
 
-def parse_file(filepath):
+def parse_video(video, typed=False):
+    """Parse every stats block of one video record in place."""
+    for stat_entry in video.get("stats_collections", []):
+        stats_raw = stat_entry.get("stats", "")
+        stat_entry["stats"] = parse_stats_block(stats_raw, typed)
+    return video
+
+def parse_file(filepath, typed=False):
     """Load the JSON and parse each stats block."""
     with open(filepath, "r", encoding="utf-8") as f:
         data = json.load(f)
 
     for video in data:
-        for stat_entry in video.get("stats_collections", []):
-            stats_raw = stat_entry.get("stats", "")
-            stat_entry["stats"] = parse_stats_block(stats_raw)
+        parse_video(video, typed)
 
     return data
 
-# Example usage
-if __name__ == "__main__":
-    input_path = "generated_test/youtube_telemetry.json"  # replace with actual path
-    output_path = "generated_test/youtube_telemetry_parsed.json"
+_CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\r\n"
+_DECODER = json.JSONDecoder()
+
+def _iter_json_array(f, chunk_size):
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    buf, pos, eof, started = "", 0, False, False
+    read_size = chunk_size
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError("Unexpected end of file inside JSON array")
+            chunk = f.read(read_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        if not started:
+            if buf[pos] != "[":
+                raise ValueError("Expected a JSON array of video records")
+            started = True
+            pos += 1
+            continue
+        if buf[pos] == "]":
+            return
+        if buf[pos] == ",":
+            pos += 1
+            continue
+
+        try:
+            record, end = _DECODER.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            end = None
+        if end is None or (end == len(buf) and not eof):
+            if eof:
+                raise ValueError(f"Malformed JSON array element at offset {pos}")
+            # Record spans past the buffer: grow the read so one huge record
+            # costs O(n) reads rather than O(n^2) re-decodes.
+            read_size = max(chunk_size, len(buf) - pos)
+            chunk = f.read(read_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+
+        read_size = chunk_size
+        yield record
+        buf, pos = buf[end:], 0
+
+def iter_videos(filepath, chunk_size=_CHUNK_SIZE):
+    """Yield video records one at a time from a JSON-array or NDJSON file."""
+    with open(filepath, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first and first in _WHITESPACE:
+            first = f.read(1)
+        f.seek(0)
+
+        if first == "[":
+            yield from _iter_json_array(f, chunk_size)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
-    parsed_data = parse_file(input_path)
+class RecordWriter:
+    """Write video records incrementally as a JSON array or as NDJSON.
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(parsed_data, f, indent=2, ensure_ascii=False)
+    The JSON-array output is byte-identical to json.dump(records, indent=2,
+    ensure_ascii=False) over the same records.
+    """
 
-    print(f"✅ Parsed telemetry saved to {output_path}")
+    def __init__(self, output_path, ndjson=False):
+        self.ndjson = ndjson
+        self.count = 0
+        self._out = open(output_path, "w", encoding="utf-8")
+
+    @staticmethod
+    def encode(record, ndjson=False):
+        """Encode one record the way write() lays it out, minus separators."""
+        if ndjson:
+            return json.dumps(record, ensure_ascii=False)
+        # Nested lines of an indent=2 element are shifted by one level;
+        # JSON strings never contain raw newlines, so this is safe.
+        return json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+
+    def write(self, record):
+        self.write_encoded(self.encode(record, self.ndjson))
+
+    def write_encoded(self, text):
+        if self.ndjson:
+            self._out.write(text + "\n")
+        else:
+            self._out.write((",\n  " if self.count else "[\n  ") + text)
+        self.count += 1
+
+    def close(self):
+        if not self.ndjson:
+            self._out.write("\n]" if self.count else "[]")
+        self._out.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def parse_file_streaming(input_path, output_path, ndjson=False, typed=False):
+    """Parse a telemetry file video by video, writing results as it goes.
+
+    Peak memory is bounded by the largest single video record. The default
+    output is byte-identical to json.dump(parse_file(input_path), indent=2);
+    with ndjson=True one compact record is written per line instead.
+    Returns (videos, samples) processed.
+    """
+    samples = 0
+    with RecordWriter(output_path, ndjson) as writer:
+        for video in iter_videos(input_path):
+            parse_video(video, typed)
+            writer.write(video)
+            samples += len(video.get("stats_collections", []))
+    return writer.count, samples
+
+TELEMETRY_SUFFIXES = (".json", ".ndjson", ".jsonl")
+PARSED_SUFFIX = "_parsed"
+
+def find_telemetry_files(patterns):
+    """Expand directories and glob patterns into a sorted list of input files."""
+    found = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = (p for p in path.iterdir() if p.suffix in TELEMETRY_SUFFIXES)
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern))
+        for candidate in candidates:
+            # Skip our own outputs so re-running over a directory is idempotent.
+            if candidate.is_file() and not candidate.stem.endswith(PARSED_SUFFIX):
+                found.add(candidate)
+    return sorted(found)
+
+def parsed_output_path(input_path, output_dir=None, ndjson=False):
+    """Return where the parsed copy of input_path is written."""
+    input_path = Path(input_path)
+    suffix = ".ndjson" if ndjson else ".json"
+    return Path(output_dir or input_path.parent) / f"{input_path.stem}{PARSED_SUFFIX}{suffix}"
+
+def _parse_chunk(videos, ndjson, typed):
+    """Worker: parse a chunk of video records and return them encoded."""
+    return [RecordWriter.encode(parse_video(video, typed), ndjson) for video in videos]
+
+def _iter_video_chunks(videos, chunk_samples):
+    """Group consecutive videos until they hold at least chunk_samples samples."""
+    batch, samples = [], 0
+    for video in videos:
+        batch.append(video)
+        samples += len(video.get("stats_collections", []))
+        if samples >= chunk_samples:
+            yield batch, samples
+            batch, samples = [], 0
+    if batch:
+        yield batch, samples
+
+def parse_batch(input_files, output_dir=None, workers=None, chunk_samples=2000, ndjson=False,
+                typed=False):
+    """Parse many telemetry files across a process pool.
+
+    Videos are shipped to workers in chunks of about chunk_samples samples,
+    so a single large file still spreads over every core; workers both parse
+    and encode, leaving the parent to split the input and write. Results are
+    written back in input order, giving the same output as
+    parse_file_streaming run serially on each file. Returns a list of
+    per-file summary dicts.
+    """
+    workers = workers or os.cpu_count() or 1
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    max_in_flight = workers * 2
+    files = []
+    pending = deque()  # (file state, future) in submission order
+
+    def finish(state):
+        state["writer"].close()
+        state["seconds"] = time.perf_counter() - state["started"]
+
+    def drain(limit):
+        while len(pending) > limit:
+            state, future = pending.popleft()
+            for text in future.result():
+                state["writer"].write_encoded(text)
+            state["chunks_left"] -= 1
+            if state["submitted"] and not state["chunks_left"]:
+                finish(state)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for input_path in input_files:
+            output_path = parsed_output_path(input_path, output_dir, ndjson)
+            state = {"input": str(input_path), "output": str(output_path), "videos": 0,
+                     "samples": 0, "seconds": 0.0, "started": time.perf_counter(),
+                     "writer": RecordWriter(output_path, ndjson), "chunks_left": 0,
+                     "submitted": False}
+            files.append(state)
+            for videos, samples in _iter_video_chunks(iter_videos(input_path), chunk_samples):
+                state["videos"] += len(videos)
+                state["samples"] += samples
+                state["chunks_left"] += 1
+                pending.append((state, pool.submit(_parse_chunk, videos, ndjson, typed)))
+                drain(max_in_flight)
+            # The next file's chunks go out while this one's are still in flight;
+            # its writer is closed when the last chunk has been written.
+            state["submitted"] = True
+            if not state["chunks_left"]:
+                finish(state)
+        drain(0)
+
+    return [{key: state[key] for key in ("input", "output", "videos", "samples", "seconds")}
+            for state in files]
+
+def main():
+    """Command-line entry point for single-file and batch parsing."""
+    parser = argparse.ArgumentParser(description="Parse YouTube stats-for-nerds telemetry files.")
+    parser.add_argument("inputs", nargs="*", default=["generated_test/youtube_telemetry.json"],
+                        help="Telemetry files, directories, or glob patterns.")
+    parser.add_argument("-o", "--output-dir", help="Directory for *_parsed files (default: next to each input).")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes (default: all cores).")
+    parser.add_argument("--chunk-samples", type=int, default=2000,
+                        help="Samples per work unit sent to a worker.")
+    parser.add_argument("--ndjson", action="store_true", help="Write newline-delimited JSON output.")
+    parser.add_argument("--typed", action="store_true",
+                        help="Emit numeric fields (Kbps, seconds, bytes, epoch) instead of panel strings.")
+    args = parser.parse_args()
+
+    input_files = find_telemetry_files(args.inputs)
+    if not input_files:
+        print("No telemetry files matched.")
+        return
+
+    started = time.perf_counter()
+    summaries = parse_batch(input_files, args.output_dir, args.workers, args.chunk_samples,
+                            args.ndjson, args.typed)
+    elapsed = time.perf_counter() - started
+
+    for summary in summaries:
+        rate = summary["samples"] / summary["seconds"] if summary["seconds"] else 0.0
+        print(f"  {summary['input']}: {summary['videos']} videos, {summary['samples']} samples "
+              f"in {summary['seconds']:.2f}s ({rate:,.0f} samples/s) -> {summary['output']}")
+    total_samples = sum(summary["samples"] for summary in summaries)
+    print(f"✅ Parsed {total_samples} samples from {len(summaries)} files in {elapsed:.2f}s "
+          f"({total_samples / elapsed if elapsed else 0.0:,.0f} samples/s, {args.workers} workers)")
+
+if __name__ == "__main__":
+    main()